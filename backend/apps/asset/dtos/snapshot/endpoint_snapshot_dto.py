@@ -1,16 +1,22 @@
 """EndpointSnapshot DTO"""
 
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, fields
+from itertools import starmap
+from operator import attrgetter
+from typing import Iterable, Iterator, List, Optional
 
+from apps.asset.dtos.asset.endpoint_dto import EndpointDTO
 
-@dataclass
+
+@dataclass(slots=True)
 class EndpointSnapshotDTO:
     """
     端点快照 DTO
     
     注意：target_id 只用于传递数据和转换为资产 DTO，不会保存到快照表中。
     快照只属于 scan。
+    
+    使用 slots：扫描时每批创建数万个实例，省去每个实例的 __dict__。
     """
     scan_id: int
     target_id: int  # 必填，用于同步到资产表
@@ -38,24 +44,25 @@ class EndpointSnapshotDTO:
         """
         转换为资产 DTO（用于同步到资产表）
         
+        按 EndpointDTO 字段顺序一次性取值并按位置传参，
+        避免每条记录构造关键字参数字典。
+        
         Returns:
             EndpointDTO: 资产表 DTO（移除 scan_id）
         """
-        from apps.asset.dtos.asset import EndpointDTO
+        return EndpointDTO(*_get_asset_fields(self))
+    
+    @staticmethod
+    def bulk_to_asset_dto(items: Iterable['EndpointSnapshotDTO']) -> Iterator[EndpointDTO]:
+        """
+        批量转换为资产 DTO（惰性迭代器）
         
-        return EndpointDTO(
-            target_id=self.target_id,
-            url=self.url,
-            host=self.host,
-            title=self.title,
-            status_code=self.status_code,
-            content_length=self.content_length,
-            webserver=self.webserver,
-            response_body=self.response_body,
-            content_type=self.content_type,
-            tech=self.tech if self.tech else [],
-            vhost=self.vhost,
-            location=self.location,
-            matched_gf_patterns=self.matched_gf_patterns if self.matched_gf_patterns else [],
-            response_headers=self.response_headers,
-        )
+        与逐条调用 to_asset_dto() 结果相同，但整批只做一次 map，
+        省去每条记录的方法查找和绑定；资产 DTO 在消费时逐个生成，
+        不会与快照 DTO 列表同时完整驻留内存。
+        """
+        return starmap(EndpointDTO, map(_get_asset_fields, items))
+
+
+# EndpointDTO 的全部字段快照 DTO 中都有，按其定义顺序取值即可按位置构造
+_get_asset_fields = attrgetter(*(f.name for f in fields(EndpointDTO)))
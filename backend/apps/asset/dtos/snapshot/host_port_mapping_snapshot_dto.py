@@ -1,7 +1,11 @@
 """HostPortMappingSnapshot DTO"""
 
 from dataclasses import dataclass
-from typing import Optional
+from itertools import starmap
+from operator import attrgetter
+from typing import Iterator, Optional, Sequence
+
+from apps.asset.dtos.asset.host_port_mapping_dto import HostPortMappingDTO
 
 
 @dataclass
@@ -20,8 +24,6 @@ class HostPortMappingSnapshotDTO:
         Returns:
             HostPortMappingDTO: 资产表 DTO（移除 scan_id）
         """
-        from apps.asset.dtos.asset import HostPortMappingDTO
-        
         if self.target_id is None:
             raise ValueError("target_id 不能为 None，无法同步到资产表")
         
@@ -31,3 +33,22 @@ class HostPortMappingSnapshotDTO:
             ip=self.ip,
             port=self.port
         )
+    
+    @staticmethod
+    def bulk_to_asset_dto(items: Sequence['HostPortMappingSnapshotDTO']) -> Iterator[HostPortMappingDTO]:
+        """
+        批量转换为资产 DTO（惰性迭代器）
+        
+        先整批检查 target_id，再按 (target_id, host, ip, port) 位置构造，
+        省去逐条的方法调用和关键字参数字典；资产 DTO 在消费时逐个生成。
+        
+        Raises:
+            ValueError: 任一记录的 target_id 为 None
+        """
+        if any(item.target_id is None for item in items):
+            raise ValueError("target_id 不能为 None，无法同步到资产表")
+        return starmap(HostPortMappingDTO, map(_get_asset_fields, items))
+
+
+# 按 HostPortMappingDTO 的字段顺序取值
+_get_asset_fields = attrgetter('target_id', 'host', 'ip', 'port')
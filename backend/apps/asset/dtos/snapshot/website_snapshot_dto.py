@@ -3,14 +3,18 @@
 from dataclasses import dataclass
 from typing import List, Optional
 
+from apps.asset.dtos.asset.website_dto import WebSiteDTO
 
-@dataclass
+
+@dataclass(slots=True)
 class WebsiteSnapshotDTO:
     """
     网站快照 DTO
     
     注意：target_id 只用于传递数据和转换为资产 DTO，不会保存到快照表中。
     快照只属于 scan，target 信息通过 scan.target 获取。
+    
+    使用 slots：扫描时每批创建数万个实例，省去每个实例的 __dict__。
     """
     scan_id: int
     target_id: int  # 必填，用于同步到资产表
@@ -35,11 +39,12 @@ class WebsiteSnapshotDTO:
         """
         转换为资产 DTO（用于同步到资产表）
         
+        显式列出复制的字段并按关键字传参，不依赖两个 DTO 的字段声明顺序；
+        created_at 不复制（快照没有该字段，由数据库填充）。
+        
         Returns:
             WebSiteDTO: 资产表 DTO（移除 scan_id）
         """
-        from apps.asset.dtos.asset import WebSiteDTO
-        
         return WebSiteDTO(
             target_id=self.target_id,
             url=self.url,
@@ -50,7 +55,7 @@ class WebsiteSnapshotDTO:
             location=self.location,
             webserver=self.webserver,
             content_type=self.content_type,
-            tech=self.tech if self.tech else [],
+            tech=self.tech,
             response_body=self.response_body,
             vhost=self.vhost,
             response_headers=self.response_headers,
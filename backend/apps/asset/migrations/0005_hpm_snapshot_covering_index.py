@@ -0,0 +1,34 @@
+"""
+为 host_port_mapping_snapshot 添加 (scan_id, ip, host, port) INCLUDE (created_at) 覆盖索引
+
+服务以下按扫描的查询，使其可以走 Index-Only Scan：
+- stream_csv_export（CSV 导出）: WHERE scan_id = ? ORDER BY ip, host, port
+- get_ips_for_export: WHERE scan_id = ? 的 DISTINCT ip
+- get_ip_aggregation_by_scan: WHERE scan_id = ? GROUP BY ip
+
+使用 CONCURRENTLY 创建，避免在大表上长时间锁写。
+"""
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY 不能在事务中执行
+    atomic = False
+
+    dependencies = [
+        ('asset', '0004_add_status_code_to_screenshot'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='hostportmappingsnapshot',
+            index=models.Index(
+                fields=['scan', 'ip', 'host', 'port'],
+                include=['created_at'],
+                name='hpm_snap_scan_ip_cover_idx'
+            ),
+        ),
+    ]
@@ -0,0 +1,45 @@
+"""
+删除资产搜索增量物化视图（pg_ivm IMMV）
+
+asset_search_view / endpoint_search_view 只是 website / endpoint 的 1:1 列投影
+（无 JOIN、无聚合），IVM 在每次 INSERT/UPDATE 时都要计算并回放增量，
+对包含 response_body、response_headers 等宽列的表写放大明显。
+
+搜索改为直接查询原表，原表已具备同样的索引：
+- host / url / title / status_code / created_at DESC（B-tree）
+- url / title / response_headers（pg_trgm GIN）
+
+回滚时复用 0002 的 SQL 重新创建 IMMV 及其索引（pg_ivm 扩展未被删除）。
+"""
+
+from importlib import import_module
+
+from django.db import migrations
+
+
+def _create_search_views_sql() -> list:
+    """0002 中创建 IMMV 与索引的 SQL（跳过第一步的 CREATE EXTENSION）"""
+    operations = import_module('apps.asset.migrations.0002_create_search_views').Migration.operations
+    statements = []
+    for operation in operations[1:]:
+        sql = operation.sql
+        statements.extend([sql] if isinstance(sql, str) else sql)
+    return statements
+
+
+class Migration(migrations.Migration):
+    """删除资产搜索 IMMV，搜索直接走原表索引"""
+
+    dependencies = [
+        ('asset', '0005_hpm_snapshot_covering_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                "DROP TABLE IF EXISTS asset_search_view CASCADE;",
+                "DROP TABLE IF EXISTS endpoint_search_view CASCADE;",
+            ],
+            reverse_sql=_create_search_views_sql(),
+        ),
+    ]
@@ -0,0 +1,112 @@
+"""
+创建目标级资产计数表 target_asset_stats，并用触发器维护
+
+- website / endpoint 上各创建 AFTER INSERT / AFTER DELETE 语句级触发器，
+  通过过渡表（transition table）按 target_id 聚合增减计数，与写入处于同一事务
+- INSERT ... ON CONFLICT DO UPDATE 中被更新的行不会出现在 INSERT 过渡表中，计数不会重复累加
+- 迁移时对已有数据做一次回填
+"""
+
+from django.db import migrations, models
+
+
+# (资产表, 计数列)
+COUNTED_TABLES = [
+    ('website', 'website_count'),
+    ('endpoint', 'endpoint_count'),
+]
+
+
+def _trigger_sql(table: str, column: str) -> str:
+    """生成维护某个计数列的触发器函数和触发器"""
+    return f"""
+        CREATE OR REPLACE FUNCTION target_asset_stats_{table}_ins() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO target_asset_stats (target_id, {column})
+            SELECT target_id, COUNT(*) FROM new_rows GROUP BY target_id
+            ON CONFLICT (target_id) DO UPDATE
+                SET {column} = target_asset_stats.{column} + EXCLUDED.{column};
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE OR REPLACE FUNCTION target_asset_stats_{table}_del() RETURNS trigger AS $$
+        BEGIN
+            UPDATE target_asset_stats s
+            SET {column} = s.{column} - d.cnt
+            FROM (SELECT target_id, COUNT(*) AS cnt FROM old_rows GROUP BY target_id) d
+            WHERE s.target_id = d.target_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER target_asset_stats_{table}_ins_trg
+            AFTER INSERT ON {table}
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION target_asset_stats_{table}_ins();
+
+        CREATE TRIGGER target_asset_stats_{table}_del_trg
+            AFTER DELETE ON {table}
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION target_asset_stats_{table}_del();
+    """
+
+
+def _drop_trigger_sql(table: str) -> str:
+    return f"""
+        DROP TRIGGER IF EXISTS target_asset_stats_{table}_ins_trg ON {table};
+        DROP TRIGGER IF EXISTS target_asset_stats_{table}_del_trg ON {table};
+        DROP FUNCTION IF EXISTS target_asset_stats_{table}_ins();
+        DROP FUNCTION IF EXISTS target_asset_stats_{table}_del();
+    """
+
+
+BACKFILL_SQL = """
+    INSERT INTO target_asset_stats (target_id, website_count, endpoint_count)
+    SELECT target_id, SUM(website_count), SUM(endpoint_count)
+    FROM (
+        SELECT target_id, COUNT(*) AS website_count, 0 AS endpoint_count
+        FROM website GROUP BY target_id
+        UNION ALL
+        SELECT target_id, 0, COUNT(*)
+        FROM endpoint GROUP BY target_id
+    ) counts
+    GROUP BY target_id
+    ON CONFLICT (target_id) DO UPDATE
+        SET website_count = EXCLUDED.website_count,
+            endpoint_count = EXCLUDED.endpoint_count;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset', '0006_drop_search_immvs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TargetAssetStats',
+            fields=[
+                ('target_id', models.IntegerField(help_text='目标 ID', primary_key=True, serialize=False)),
+                ('website_count', models.IntegerField(default=0, help_text='网站数量')),
+                ('endpoint_count', models.IntegerField(default=0, help_text='端点数量')),
+            ],
+            options={
+                'verbose_name': '目标资产计数',
+                'verbose_name_plural': '目标资产计数',
+                'db_table': 'target_asset_stats',
+            },
+        ),
+        *[
+            migrations.RunSQL(
+                sql=_trigger_sql(table, column),
+                reverse_sql=_drop_trigger_sql(table),
+            )
+            for table, column in COUNTED_TABLES
+        ],
+        migrations.RunSQL(
+            sql=BACKFILL_SQL,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,152 @@
+"""
+将 host_port_mapping_snapshot / website_snapshot 改为按 scan_id HASH 分区
+
+这两张快照表的查询/写入/删除全部以 scan_id 为条件，分区后 PostgreSQL 只访问
+scan_id 所在的一个分区（partition pruning），索引深度与 VACUUM 范围随之缩小。
+
+迁移步骤（每张表）：
+1. 记录原表上的索引与约束定义（pg_get_indexdef / pg_get_constraintdef）
+2. 原表改名为 {table}_unpartitioned，按原结构创建 PARTITION BY HASH (scan_id) 的新表
+   以及 PARTITION_COUNT 个分区
+3. 主键改为 (id, scan_id)（分区表的主键/唯一约束必须包含分区键），
+   唯一约束本身已包含 scan_id，可原样重建
+4. 复制数据，校正自增序列，删除原表，重建索引与约束（在父表上创建，自动下发到各分区）
+
+注意：
+- Django 模型状态不变（仍以 id 为主键），ORM 按 id 的查询/删除照常工作
+- 分区表不支持 CREATE INDEX CONCURRENTLY，后续给这两张表加索引不要使用 AddIndexConcurrently
+- 迁移在单个事务中执行：从 RENAME 开始到提交为止两张表持有 ACCESS EXCLUSIVE 锁，
+  读写全部阻塞，耗时随快照行数线性增长（全表复制 + 重建全部索引），
+  复制期间需要约一倍的额外磁盘空间。大库请在维护窗口内执行
+- 回滚（unpartition_snapshot_tables）按相同步骤把数据复制回普通表、主键恢复为 (id)，
+  锁与耗时同上
+"""
+
+from django.db import migrations
+
+
+PARTITIONED_TABLES = ['host_port_mapping_snapshot', 'website_snapshot']
+
+# 分区数量
+PARTITION_COUNT = 16
+
+
+def partition_snapshot_tables(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for table in PARTITIONED_TABLES:
+            old_table = f'{table}_unpartitioned'
+
+            # 1. 记录独立索引（不含约束自带的索引）与约束定义
+            cursor.execute(
+                """
+                SELECT pg_get_indexdef(i.indexrelid)
+                FROM pg_index i
+                WHERE i.indrelid = %s::regclass
+                  AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+                """,
+                [table]
+            )
+            index_defs = [row[0] for row in cursor.fetchall()]
+
+            cursor.execute(
+                """
+                SELECT conname, pg_get_constraintdef(oid)
+                FROM pg_constraint
+                WHERE conrelid = %s::regclass AND contype IN ('u', 'f', 'c')
+                """,
+                [table]
+            )
+            constraint_defs = cursor.fetchall()
+
+            # 2. 创建分区父表与分区
+            cursor.execute(f'ALTER TABLE {table} RENAME TO {old_table}')
+            cursor.execute(
+                f'CREATE TABLE {table} '
+                f'(LIKE {old_table} INCLUDING DEFAULTS INCLUDING IDENTITY) '
+                f'PARTITION BY HASH (scan_id)'
+            )
+            cursor.execute(f'ALTER TABLE {table} ADD PRIMARY KEY (id, scan_id)')
+            for remainder in range(PARTITION_COUNT):
+                cursor.execute(
+                    f'CREATE TABLE {table}_p{remainder} PARTITION OF {table} '
+                    f'FOR VALUES WITH (MODULUS {PARTITION_COUNT}, REMAINDER {remainder})'
+                )
+
+            # 3. 复制数据并校正序列
+            cursor.execute(
+                f'INSERT INTO {table} OVERRIDING SYSTEM VALUE SELECT * FROM {old_table}'
+            )
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"COALESCE(MAX(id), 0) + 1, false) FROM {table}"
+            )
+            cursor.execute(f'DROP TABLE {old_table}')
+
+            # 4. 重建约束与索引（名称与 Django 生成的一致）
+            for name, definition in constraint_defs:
+                cursor.execute(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}')
+            for definition in index_defs:
+                cursor.execute(definition)
+
+
+def unpartition_snapshot_tables(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for table in PARTITIONED_TABLES:
+            old_table = f'{table}_partitioned'
+
+            # 1. 记录父表上的索引与约束定义（主键单独恢复为 (id)）
+            cursor.execute(
+                """
+                SELECT pg_get_indexdef(i.indexrelid)
+                FROM pg_index i
+                WHERE i.indrelid = %s::regclass
+                  AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+                """,
+                [table]
+            )
+            # 分区父表的索引定义形如 CREATE INDEX ... ON ONLY table ...，普通表去掉 ONLY
+            index_defs = [row[0].replace(' ON ONLY ', ' ON ', 1) for row in cursor.fetchall()]
+
+            cursor.execute(
+                """
+                SELECT conname, pg_get_constraintdef(oid)
+                FROM pg_constraint
+                WHERE conrelid = %s::regclass AND contype IN ('u', 'f', 'c')
+                """,
+                [table]
+            )
+            constraint_defs = cursor.fetchall()
+
+            # 2. 创建普通表并复制数据
+            cursor.execute(f'ALTER TABLE {table} RENAME TO {old_table}')
+            cursor.execute(
+                f'CREATE TABLE {table} '
+                f'(LIKE {old_table} INCLUDING DEFAULTS INCLUDING IDENTITY)'
+            )
+            cursor.execute(f'ALTER TABLE {table} ADD PRIMARY KEY (id)')
+            cursor.execute(
+                f'INSERT INTO {table} OVERRIDING SYSTEM VALUE SELECT * FROM {old_table}'
+            )
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"COALESCE(MAX(id), 0) + 1, false) FROM {table}"
+            )
+            # 删除父表时各分区一并删除
+            cursor.execute(f'DROP TABLE {old_table}')
+
+            # 3. 重建约束与索引
+            for name, definition in constraint_defs:
+                cursor.execute(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}')
+            for definition in index_defs:
+                cursor.execute(definition)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset', '0007_target_asset_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_snapshot_tables, unpartition_snapshot_tables),
+    ]
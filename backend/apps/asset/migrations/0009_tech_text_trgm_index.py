@@ -0,0 +1,58 @@
+"""
+为 website / endpoint 的 tech 数组添加 pg_trgm 表达式索引
+
+tech="xx" 模糊搜索需要对数组元素做子串匹配，原先只能逐行 unnest + ILIKE 全表扫描。
+这里创建 IMMUTABLE 函数 asset_tech_text(tech) 把数组拼接为文本，
+并在其上建立 gin_trgm_ops 索引；搜索时先用
+asset_tech_text(t.tech) ILIKE '%xx%' 走索引粗筛，再用 unnest 精确校验元素。
+
+（array_to_string 本身是 STABLE，不能直接用于索引表达式，因此需要包装函数。）
+
+使用 CONCURRENTLY 创建索引，避免在大表上长时间锁写。
+"""
+
+import django.contrib.postgres.indexes
+import django.db.models.expressions
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+def tech_text_index(name):
+    return django.contrib.postgres.indexes.GinIndex(
+        django.contrib.postgres.indexes.OpClass(
+            django.db.models.expressions.Func(
+                'tech', function='asset_tech_text', output_field=models.TextField()
+            ),
+            name='gin_trgm_ops'
+        ),
+        name=name
+    )
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY 不能在事务中执行
+    atomic = False
+
+    dependencies = [
+        ('asset', '0008_partition_snapshots_by_scan'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE OR REPLACE FUNCTION asset_tech_text(varchar[]) RETURNS text
+                AS $$ SELECT array_to_string($1, ' ') $$
+                LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+            """,
+            reverse_sql="DROP FUNCTION IF EXISTS asset_tech_text(varchar[]);",
+        ),
+        AddIndexConcurrently(
+            model_name='website',
+            index=tech_text_index('website_tech_text_trgm_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='endpoint',
+            index=tech_text_index('endpoint_tech_text_trgm_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+"""
+为 website / endpoint 的 host 添加 pg_trgm GIN 索引
+
+资产搜索的 host="xx"（含裸文本搜索）使用 ILIKE '%xx%'，B-tree 索引无法使用，
+只能全表扫描。url / title / response_headers 已有 trgm 索引，这里补齐 host；
+pg_trgm 对 3 个字符以上的模式自动加速 ILIKE，查询无需改写。
+
+response_body 不建 trgm 索引：响应体是最大的列，且两张表每次扫描都会 upsert，
+GIN trgm 索引的写放大和膨胀代价远高于 body="xx" 搜索的收益。
+
+使用 CONCURRENTLY 创建，避免在大表上长时间锁写。
+"""
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY 不能在事务中执行
+    atomic = False
+
+    dependencies = [
+        ('asset', '0009_tech_text_trgm_index'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='website',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['host'], name='website_host_trgm_idx', opclasses=['gin_trgm_ops']
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='endpoint',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['host'], name='endpoint_host_trgm_idx', opclasses=['gin_trgm_ops']
+            ),
+        ),
+    ]
@@ -0,0 +1,42 @@
+"""
+为 website / endpoint 添加反转主机名的 B-tree 表达式索引
+
+资产搜索的 host="*.example.com" 表示后缀匹配（子域名搜索），查询改写为
+reverse(lower(host)) LIKE 'moc.elpmaxe.%'，后缀匹配变成前缀匹配，
+text_pattern_ops 索引可直接做范围扫描，无需构建 trgm 位图。
+
+使用表达式索引而不是新增 host_rev 列：写入路径（COPY upsert）无需改动。
+使用 CONCURRENTLY 创建，避免在大表上长时间锁写。
+"""
+
+from django.contrib.postgres.indexes import OpClass
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+from django.db.models.functions import Lower, Reverse
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY 不能在事务中执行
+    atomic = False
+
+    dependencies = [
+        ('asset', '0010_host_trgm_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='website',
+            index=models.Index(
+                OpClass(Reverse(Lower('host')), name='text_pattern_ops'),
+                name='website_host_rev_idx'
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='endpoint',
+            index=models.Index(
+                OpClass(Reverse(Lower('host')), name='text_pattern_ops'),
+                name='endpoint_host_rev_idx'
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+"""
+为 website / endpoint 添加 (status_code, created_at DESC) 复合索引
+
+资产搜索和列表的常见筛选是状态码（status=="200" / statusCode=200），结果按
+created_at DESC 分页。单列 status_code 索引只能取出全部匹配行再排序；
+复合索引按排序顺序返回匹配行，LIMIT 读到 N 行即可停止。
+
+复合索引的前导列就是 status_code，完全覆盖原单列索引的用途，因此创建后删除
+原索引，写入时维护的索引数量不变。
+
+使用 CONCURRENTLY 创建/删除，避免在大表上长时间锁写。
+"""
+
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE/DROP INDEX CONCURRENTLY 不能在事务中执行
+    atomic = False
+
+    dependencies = [
+        ('asset', '0011_host_reverse_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='website',
+            index=models.Index(fields=['status_code', '-created_at'], name='website_status_created_idx'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='website',
+            name='website_status__51663d_idx',
+        ),
+        AddIndexConcurrently(
+            model_name='endpoint',
+            index=models.Index(fields=['status_code', '-created_at'], name='endpoint_status_created_idx'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='endpoint',
+            name='endpoint_status__5d4fdd_idx',
+        ),
+    ]
@@ -0,0 +1,35 @@
+"""
+为 vulnerability 添加 (target_id, url text_pattern_ops) 复合索引
+
+资产搜索为每个 website 关联漏洞时，把 (target_id, 前缀下界, 前缀上界) 作为 VALUES
+与 vulnerability 做 JOIN，条件为 v.target_id = ? AND v.url ~>=~ 下界 AND v.url ~<~ 上界。
+~>=~ / ~<~ 是按字节比较的 text_pattern_ops 操作符，默认 collation 下的普通 B-tree
+索引不支持，此索引可让每个前缀走 target_id 等值 + url 范围扫描（嵌套循环逐行探测）。
+
+使用 CONCURRENTLY 创建，避免在大表上长时间锁写。
+"""
+
+from django.contrib.postgres.indexes import OpClass
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY 不能在事务中执行
+    atomic = False
+
+    dependencies = [
+        ('asset', '0012_status_created_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='vulnerability',
+            index=models.Index(
+                'target',
+                OpClass('url', name='text_pattern_ops'),
+                name='vuln_target_url_pattern_idx'
+            ),
+        ),
+    ]
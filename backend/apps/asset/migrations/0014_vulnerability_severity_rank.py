@@ -0,0 +1,35 @@
+"""
+为 vulnerability 添加 severity_rank 生成列
+
+资产搜索关联漏洞时按严重性排序，原先每行都要计算 CASE severity WHEN ... 表达式；
+改为 STORED 生成列后，排序直接比较 smallint，写入路径无需改动（由数据库计算）。
+
+注意：添加 STORED 生成列会重写 vulnerability 表。
+"""
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset', '0013_vulnerability_url_pattern_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vulnerability',
+            name='severity_rank',
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Case(
+                    models.When(severity='critical', then=models.Value(1)),
+                    models.When(severity='high', then=models.Value(2)),
+                    models.When(severity='medium', then=models.Value(3)),
+                    models.When(severity='low', then=models.Value(4)),
+                    default=models.Value(5),
+                ),
+                output_field=models.SmallIntegerField(),
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+"""
+创建资产搜索缓存版本号序列
+
+搜索结果缓存在 Redis 中，但 Worker 无法直连 Redis，扫描写入资产后无法递增
+Redis 中的版本号。改用 PostgreSQL 序列保存版本号：Server 与 Worker 都能访问数据库，
+写入方 nextval() 递增（非事务性，不加行锁），读取方查询 last_value 拼入缓存键。
+"""
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset', '0014_vulnerability_severity_rank'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            # 先调用一次 nextval：未调用过的序列 last_value 与首次 nextval 的返回值相同
+            sql="""
+                CREATE SEQUENCE IF NOT EXISTS asset_search_cache_version;
+                SELECT nextval('asset_search_cache_version');
+            """,
+            reverse_sql="DROP SEQUENCE IF EXISTS asset_search_cache_version;",
+        ),
+    ]
@@ -0,0 +1,29 @@
+"""
+为 target_asset_stats 的计数列添加数据库默认值
+
+0007 中的触发器只插入当前表对应的计数列（website_count 或 endpoint_count），
+而 default=0 只在 Django 端生效，数据库中两列均为 NOT NULL 且无默认值，
+导致新目标（或回填时没有资产的目标）首次写入网站/端点时违反非空约束。
+"""
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset', '0015_search_cache_version_sequence'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='targetassetstats',
+            name='website_count',
+            field=models.IntegerField(db_default=0, help_text='网站数量'),
+        ),
+        migrations.AlterField(
+            model_name='targetassetstats',
+            name='endpoint_count',
+            field=models.IntegerField(db_default=0, help_text='端点数量'),
+        ),
+    ]
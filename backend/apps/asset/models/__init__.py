@@ -27,7 +27,7 @@ from .screenshot_models import (
 )
 
 # 统计模型
-from .statistics_models import AssetStatistics, StatisticsHistory
+from .statistics_models import AssetStatistics, StatisticsHistory, TargetAssetStats
 
 # 导出所有模型供外部导入
 __all__ = [
@@ -51,4 +51,5 @@ __all__ = [
     # 统计模型
     'AssetStatistics',
     'StatisticsHistory',
+    'TargetAssetStats',
 ]
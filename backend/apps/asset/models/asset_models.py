@@ -1,7 +1,8 @@
 
 from django.db import models
+from django.db.models.functions import Lower, Reverse
 from django.contrib.postgres.fields import ArrayField
-from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
@@ -141,7 +142,9 @@ class Endpoint(models.Model):
             models.Index(fields=['target']),       # 优化从 target_id快速查找下面的端点（主关联字段）
             models.Index(fields=['url']),          # URL索引，优化查询性能
             models.Index(fields=['host']),         # host索引，优化根据主机名查询
-            models.Index(fields=['status_code']),  # 状态码索引，优化筛选
+            # 状态码 + 创建时间复合索引：status=="200" 之类的筛选按 created_at DESC 顺序直接读取前 N 行，
+            # 无需取出全部匹配行再排序（见迁移 0012，替代原 status_code 单列索引）
+            models.Index(fields=['status_code', '-created_at'], name='endpoint_status_created_idx'),
             models.Index(fields=['title']),        # title索引，优化智能过滤搜索
             GinIndex(fields=['tech']),             # GIN索引，优化 tech 数组字段的 __contains 查询
             # pg_trgm GIN 索引，支持 LIKE '%keyword%' 模糊搜索
@@ -160,6 +163,24 @@ class Endpoint(models.Model):
                 fields=['title'],
                 opclasses=['gin_trgm_ops']
             ),
+            GinIndex(
+                name='endpoint_host_trgm_idx',
+                fields=['host'],
+                opclasses=['gin_trgm_ops']
+            ),
+            # tech 数组拼接后的 pg_trgm 索引，加速 tech="xx" 子串匹配（见迁移 0009）
+            GinIndex(
+                OpClass(
+                    models.Func('tech', function='asset_tech_text', output_field=models.TextField()),
+                    name='gin_trgm_ops'
+                ),
+                name='endpoint_tech_text_trgm_idx'
+            ),
+            # 反转主机名的 B-tree 索引，host="*.example.com" 后缀搜索走前缀范围扫描（见迁移 0011）
+            models.Index(
+                OpClass(Reverse(Lower('host')), name='text_pattern_ops'),
+                name='endpoint_host_rev_idx'
+            ),
         ]
         constraints = [
             # 普通唯一约束：url + target 组合唯一
@@ -255,7 +276,9 @@ class WebSite(models.Model):
             models.Index(fields=['host']),  # host索引，优化根据主机名查询
             models.Index(fields=['target']),     # 优化从 target_id快速查找下面的站点
             models.Index(fields=['title']),      # title索引，优化智能过滤搜索
-            models.Index(fields=['status_code']),  # 状态码索引，优化智能过滤搜索
+            # 状态码 + 创建时间复合索引：status=="200" 之类的筛选按 created_at DESC 顺序直接读取前 N 行，
+            # 无需取出全部匹配行再排序（见迁移 0012，替代原 status_code 单列索引）
+            models.Index(fields=['status_code', '-created_at'], name='website_status_created_idx'),
             GinIndex(fields=['tech']),  # GIN索引，优化 tech 数组字段的 __contains 查询
             # pg_trgm GIN 索引，支持 LIKE '%keyword%' 模糊搜索
             GinIndex(
@@ -273,6 +296,24 @@ class WebSite(models.Model):
                 fields=['title'],
                 opclasses=['gin_trgm_ops']
             ),
+            GinIndex(
+                name='website_host_trgm_idx',
+                fields=['host'],
+                opclasses=['gin_trgm_ops']
+            ),
+            # tech 数组拼接后的 pg_trgm 索引，加速 tech="xx" 子串匹配（见迁移 0009）
+            GinIndex(
+                OpClass(
+                    models.Func('tech', function='asset_tech_text', output_field=models.TextField()),
+                    name='gin_trgm_ops'
+                ),
+                name='website_tech_text_trgm_idx'
+            ),
+            # 反转主机名的 B-tree 索引，host="*.example.com" 后缀搜索走前缀范围扫描（见迁移 0011）
+            models.Index(
+                OpClass(Reverse(Lower('host')), name='text_pattern_ops'),
+                name='website_host_rev_idx'
+            ),
         ]
         constraints = [
             # 普通唯一约束：url + target 组合唯一
@@ -471,6 +512,19 @@ class Vulnerability(models.Model):
     description = models.TextField(blank=True, default='', help_text='漏洞描述')
     raw_output = models.JSONField(blank=True, default=dict, help_text='工具原始输出')
     
+    # 严重性排序值（数据库生成列，critical=1 … 其他=5），按严重性排序时直接比较整数
+    severity_rank = models.GeneratedField(
+        expression=models.Case(
+            models.When(severity=VulnSeverity.CRITICAL, then=models.Value(1)),
+            models.When(severity=VulnSeverity.HIGH, then=models.Value(2)),
+            models.When(severity=VulnSeverity.MEDIUM, then=models.Value(3)),
+            models.When(severity=VulnSeverity.LOW, then=models.Value(4)),
+            default=models.Value(5),
+        ),
+        output_field=models.SmallIntegerField(),
+        db_persist=True,
+    )
+    
     # ==================== 时间字段 ====================
     created_at = models.DateTimeField(auto_now_add=True, help_text='创建时间')
 
@@ -486,6 +540,12 @@ class Vulnerability(models.Model):
             models.Index(fields=['source']),
             models.Index(fields=['url']),          # url索引，优化智能过滤搜索
             models.Index(fields=['-created_at']),
+            # 资产搜索按 website URL 前缀关联漏洞：target_id = ? AND url LIKE 'base%'
+            models.Index(
+                'target',
+                OpClass('url', name='text_pattern_ops'),
+                name='vuln_target_url_pattern_idx'
+            ),
         ]
 
     def __str__(self):
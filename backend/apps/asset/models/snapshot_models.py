@@ -50,6 +50,8 @@ class WebsiteSnapshot(models.Model):
     网站快照
     
     记录：某次扫描中发现的网站
+    
+    数据库中按 scan_id HASH 分区（迁移 0008），新增索引不能使用 CONCURRENTLY。
     """
 
     id = models.AutoField(primary_key=True)
@@ -188,6 +190,7 @@ class HostPortMappingSnapshot(models.Model):
     - 存储某次扫描中发现的主机（host）、IP、端口的三元映射关系
     - 主关联 scan_id，记录扫描历史
     - scan + host + ip + port 组成复合唯一约束
+    - 数据库中按 scan_id HASH 分区（迁移 0008），新增索引不能使用 CONCURRENTLY
     """
 
     id = models.AutoField(primary_key=True)
@@ -238,6 +241,12 @@ class HostPortMappingSnapshot(models.Model):
             models.Index(fields=['host', 'ip']),       # 优化组合查询
             models.Index(fields=['scan', 'host']),     # 优化扫描+主机查询
             models.Index(fields=['-created_at']),   # 优化时间排序
+            # 覆盖索引：按扫描导出/按 IP 聚合时走 Index-Only Scan，无需排序和回表
+            models.Index(
+                fields=['scan', 'ip', 'host', 'port'],
+                include=['created_at'],
+                name='hpm_snap_scan_ip_cover_idx'
+            ),
         ]
         constraints = [
             # 复合唯一约束：同一次扫描中，scan + host + ip + port 组合唯一
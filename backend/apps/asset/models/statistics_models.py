@@ -80,3 +80,28 @@ class StatisticsHistory(models.Model):
     
     def __str__(self):
         return f'StatisticsHistory ({self.date})'
+
+
+class TargetAssetStats(models.Model):
+    """
+    目标级资产计数（反范式化）
+    
+    避免 count_by_target 对大目标执行 COUNT(*) 扫描，变为按主键 O(1) 读取。
+    计数由 website / endpoint 表上的语句级触发器在写入的同一事务内维护
+    （见迁移 0007_target_asset_stats），覆盖 upsert、批量删除、级联删除等所有写路径。
+    
+    注意：target_id 不设外键，避免级联删除时与触发器回写产生约束冲突。
+    """
+    
+    target_id = models.IntegerField(primary_key=True, help_text='目标 ID')
+    # 使用数据库默认值：触发器每次只写入一个计数列，另一列依赖 DEFAULT 0
+    website_count = models.IntegerField(db_default=0, help_text='网站数量')
+    endpoint_count = models.IntegerField(db_default=0, help_text='端点数量')
+    
+    class Meta:
+        db_table = 'target_asset_stats'
+        verbose_name = '目标资产计数'
+        verbose_name_plural = '目标资产计数'
+    
+    def __str__(self):
+        return f'TargetAssetStats (target: {self.target_id})'
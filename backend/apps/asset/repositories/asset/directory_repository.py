@@ -3,13 +3,14 @@ Django ORM 实现的 Directory Repository
 """
 
 import logging
+from operator import attrgetter
 from typing import List, Iterator
 from django.db import transaction
 
 from apps.asset.models.asset_models import Directory
 from apps.asset.dtos import DirectoryDTO
 from apps.common.decorators import auto_ensure_db_connection
-from apps.common.utils import deduplicate_for_bulk
+from apps.common.utils import deduplicate_for_bulk, copy_upsert
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +19,15 @@ logger = logging.getLogger(__name__)
 class DjangoDirectoryRepository:
     """Django ORM 实现的 Directory Repository"""
 
+    # COPY 写入的列（顺序与 _to_copy_row 一致）
+    COPY_COLUMNS = (
+        'target_id', 'url', 'status', 'content_length',
+        'words', 'lines', 'content_type', 'duration',
+    )
+
+    # DTO -> COPY 数据行（None 由 copy_upsert 按模型默认值填充）
+    _to_copy_row = attrgetter(*COPY_COLUMNS)
+
     def bulk_upsert(self, items: List[DirectoryDTO]) -> int:
         """
         批量创建或更新 Directory（upsert）
@@ -80,6 +90,7 @@ class DjangoDirectoryRepository:
         
         与 bulk_upsert 不同，此方法不会更新已存在的记录。
         适用于批量添加场景，只提供 URL，没有其他字段数据。
+        使用 COPY + INSERT ... ON CONFLICT DO NOTHING，不构建 Model 实例。
         
         注意：自动按模型唯一约束去重，保留最后一条记录。
         
@@ -96,26 +107,12 @@ class DjangoDirectoryRepository:
             # 自动按模型唯一约束去重
             unique_items = deduplicate_for_bulk(items, Directory)
             
-            directories = [
-                Directory(
-                    target_id=item.target_id,
-                    url=item.url,
-                    status=item.status,
-                    content_length=item.content_length,
-                    words=item.words,
-                    lines=item.lines,
-                    content_type=item.content_type or '',
-                    duration=item.duration
-                )
-                for item in unique_items
-            ]
-            
-            with transaction.atomic():
-                Directory.objects.bulk_create(
-                    directories,
-                    ignore_conflicts=True,
-                    batch_size=1000
-                )
+            copy_upsert(
+                Directory,
+                map(self._to_copy_row, unique_items),
+                columns=self.COPY_COLUMNS,
+                unique_columns=('target_id', 'url'),
+            )
             
             logger.debug(f"批量创建 Directory 成功（ignore_conflicts）: {len(unique_items)} 条")
             return len(unique_items)
@@ -1,13 +1,14 @@
 """Endpoint Repository - Django ORM 实现"""
 
 import logging
-from typing import List, Iterator
+from operator import attrgetter
+from typing import BinaryIO, Iterable, List
 
-from apps.asset.models import Endpoint
+from apps.asset.models import Endpoint, TargetAssetStats
 from apps.asset.dtos.asset import EndpointDTO
+from apps.asset.search_cache import invalidate_search_cache_on_commit
 from apps.common.decorators import auto_ensure_db_connection
-from apps.common.utils import deduplicate_for_bulk
-from django.db import transaction
+from apps.common.utils import deduplicate_for_bulk, copy_csv_export, copy_upsert, copy_upsert_returning
 
 logger = logging.getLogger(__name__)
 
@@ -16,61 +17,57 @@ logger = logging.getLogger(__name__)
 class DjangoEndpointRepository:
     """端点 Repository - 负责端点表的数据访问"""
     
-    def bulk_upsert(self, items: List[EndpointDTO]) -> int:
+    # bulk_upsert 写入的列（与 DTO 属性同名）
+    UPSERT_COLUMNS = (
+        'target_id', 'url', 'host', 'title', 'status_code', 'content_length',
+        'webserver', 'response_body', 'content_type', 'tech', 'vhost',
+        'location', 'matched_gf_patterns', 'response_headers',
+    )
+    # 冲突时更新的列（整列覆盖，tech 等数组字段同样以本次结果替换，不做合并）
+    UPSERT_UPDATE_COLUMNS = UPSERT_COLUMNS[2:]
+
+    # DTO -> COPY 数据行（None 由 copy_upsert 按模型默认值填充）
+    _to_upsert_row = attrgetter(*UPSERT_COLUMNS)
+
+    def bulk_upsert(self, items: Iterable[EndpointDTO]) -> int:
         """
         批量创建或更新端点（upsert）
         
         存在则更新所有字段，不存在则创建。
-        使用 Django 原生 update_conflicts。
+        使用 COPY 写入临时表 + INSERT ... ON CONFLICT DO UPDATE，
+        不构建 Model 实例，数据库往返次数为常数。
+        已存在且各字段均未变化的记录跳过更新（重复扫描时大多数行不变），
+        不产生新的行版本，减少 WAL 和 autovacuum 压力。
         
         注意：自动按模型唯一约束去重，保留最后一条记录。
         
+        tech 语义：整体替换为本次扫描结果（以最新一次探测为准，已消失的技术栈会被移除）。
+        需要累积合并的场景（如指纹识别补充 tech）由调用方在 SQL 中显式使用
+        ARRAY(SELECT DISTINCT unnest(tech || EXCLUDED.tech)) 合并，见 run_xingfinger_task。
+        
         Args:
-            items: 端点 DTO 列表
+            items: 端点 DTO 列表或生成器（只遍历一次）
             
         Returns:
             int: 处理的记录数
         """
-        if not items:
-            return 0
-        
         try:
-            # 自动按模型唯一约束去重
+            # 自动按模型唯一约束去重（ON CONFLICT DO UPDATE 不允许同批重复）
             unique_items = deduplicate_for_bulk(items, Endpoint)
+            if not unique_items:
+                return 0
             
-            # 直接从 DTO 字段构建 Model
-            endpoints = [
-                Endpoint(
-                    target_id=item.target_id,
-                    url=item.url,
-                    host=item.host or '',
-                    title=item.title or '',
-                    status_code=item.status_code,
-                    content_length=item.content_length,
-                    webserver=item.webserver or '',
-                    response_body=item.response_body or '',
-                    content_type=item.content_type or '',
-                    tech=item.tech if item.tech else [],
-                    vhost=item.vhost,
-                    location=item.location or '',
-                    matched_gf_patterns=item.matched_gf_patterns if item.matched_gf_patterns else [],
-                    response_headers=item.response_headers if item.response_headers else ''
-                )
-                for item in unique_items
-            ]
-            
-            with transaction.atomic():
-                Endpoint.objects.bulk_create(
-                    endpoints,
-                    update_conflicts=True,
-                    unique_fields=['url', 'target'],
-                    update_fields=[
-                        'host', 'title', 'status_code', 'content_length',
-                        'webserver', 'response_body', 'content_type', 'tech',
-                        'vhost', 'location', 'matched_gf_patterns', 'response_headers'
-                    ],
-                    batch_size=1000
-                )
+            affected = copy_upsert(
+                Endpoint,
+                map(self._to_upsert_row, unique_items),
+                columns=self.UPSERT_COLUMNS,
+                unique_columns=('url', 'target_id'),
+                update_columns=self.UPSERT_UPDATE_COLUMNS,
+                skip_unchanged=True,
+            )
+            # 重复扫描时各行均未变化则不影响任何行，无需使缓存失效
+            if affected:
+                invalidate_search_cache_on_commit()
             
             logger.debug(f"批量 upsert 端点成功: {len(unique_items)} 条")
             return len(unique_items)
@@ -99,13 +96,56 @@ class DjangoEndpointRepository:
         """
         统计目标下的端点数量
         
+        读取触发器维护的 target_asset_stats 计数，O(1) 主键查询。
+        
         Args:
             target_id: 目标 ID
             
         Returns:
             int: 端点数量
         """
-        return Endpoint.objects.filter(target_id=target_id).count()
+        return (
+            TargetAssetStats.objects
+            .filter(target_id=target_id)
+            .values_list('endpoint_count', flat=True)
+            .first()
+        ) or 0
+
+    def bulk_create_urls(self, target_id: int, urls: Iterable[str]) -> int:
+        """
+        按 URL 批量创建端点（存在即跳过），返回实际新建的记录数
+        
+        URL 直接流式 COPY 到暂存表，由数据库完成去重（DISTINCT ON）与冲突跳过，
+        不构建 DTO 列表和去重集合；RETURNING id 只返回真正插入的行。
+        
+        Args:
+            target_id: 目标 ID
+            urls: 已校验的 URL 迭代器（允许重复）
+            
+        Returns:
+            int: 实际新建的记录数
+        """
+        # 除 target_id / url 外的列传 None，由 copy_upsert 按模型默认值填充
+        padding = (None,) * (len(self.UPSERT_COLUMNS) - 2)
+        
+        try:
+            inserted = copy_upsert_returning(
+                Endpoint,
+                ((target_id, url, *padding) for url in urls),
+                columns=self.UPSERT_COLUMNS,
+                unique_columns=('url', 'target_id'),
+                returning=('id',),
+                distinct=True,
+            )
+            if inserted:
+                invalidate_search_cache_on_commit()
+            
+            logger.debug(f"批量创建端点成功（ignore_conflicts）: 新建 {len(inserted)} 条")
+            return len(inserted)
+                
+        except Exception as e:
+            logger.error(f"批量创建端点失败: {e}")
+            raise
 
     def bulk_create_ignore_conflicts(self, items: List[EndpointDTO]) -> int:
         """
@@ -113,6 +153,7 @@ class DjangoEndpointRepository:
         
         与 bulk_upsert 不同，此方法不会更新已存在的记录。
         适用于快速扫描场景，只提供 URL，没有其他字段数据。
+        使用 COPY + INSERT ... ON CONFLICT DO NOTHING，不构建 Model 实例。
         
         注意：自动按模型唯一约束去重，保留最后一条记录。
         
@@ -129,33 +170,14 @@ class DjangoEndpointRepository:
             # 自动按模型唯一约束去重
             unique_items = deduplicate_for_bulk(items, Endpoint)
             
-            # 直接从 DTO 字段构建 Model
-            endpoints = [
-                Endpoint(
-                    target_id=item.target_id,
-                    url=item.url,
-                    host=item.host or '',
-                    title=item.title or '',
-                    status_code=item.status_code,
-                    content_length=item.content_length,
-                    webserver=item.webserver or '',
-                    response_body=item.response_body or '',
-                    content_type=item.content_type or '',
-                    tech=item.tech if item.tech else [],
-                    vhost=item.vhost,
-                    location=item.location or '',
-                    matched_gf_patterns=item.matched_gf_patterns if item.matched_gf_patterns else [],
-                    response_headers=item.response_headers if item.response_headers else ''
-                )
-                for item in unique_items
-            ]
-            
-            with transaction.atomic():
-                Endpoint.objects.bulk_create(
-                    endpoints,
-                    ignore_conflicts=True,
-                    batch_size=1000
-                )
+            inserted = copy_upsert(
+                Endpoint,
+                map(self._to_upsert_row, unique_items),
+                columns=self.UPSERT_COLUMNS,
+                unique_columns=('url', 'target_id'),
+            )
+            if inserted:
+                invalidate_search_cache_on_commit()
             
             logger.debug(f"批量创建端点成功（ignore_conflicts）: {len(unique_items)} 条")
             return len(unique_items)
@@ -164,31 +186,36 @@ class DjangoEndpointRepository:
             logger.error(f"批量创建端点失败: {e}")
             raise
 
-    def iter_raw_data_for_export(
-        self, 
-        target_id: int,
-        batch_size: int = 1000
-    ) -> Iterator[dict]:
+    def bulk_delete_by_ids(self, ids: Iterable[int]) -> int:
+        """
+        按 ID 批量删除端点，并使搜索缓存失效
+        
+        Returns:
+            int: 删除的记录数（含级联删除）
+        """
+        deleted_count, _ = Endpoint.objects.filter(id__in=ids).delete()
+        if deleted_count:
+            invalidate_search_cache_on_commit()
+        return deleted_count
+
+    def stream_csv_export(self, target_id: int, out_file: BinaryIO) -> None:
         """
-        流式获取原始数据用于 CSV 导出
+        把目标下的端点以 CSV（含表头）写入 out_file，按 url 排序
         
         Args:
             target_id: 目标 ID
-            batch_size: 每批数据量
-        
-        Yields:
-            包含所有端点字段的字典
+            out_file: 二进制可写文件对象
         """
-        qs = (
-            Endpoint.objects
-            .filter(target_id=target_id)
-            .values(
-                'url', 'host', 'location', 'title', 'status_code',
-                'content_length', 'content_type', 'webserver', 'tech',
-                'response_body', 'response_headers', 'vhost', 'matched_gf_patterns', 'created_at'
-            )
-            .order_by('url')
+        copy_csv_export(
+            out_file,
+            table='endpoint',
+            columns=(
+                "url, host, location, title, status_code, content_length, content_type, webserver, "
+                "array_to_string(tech, ',') AS tech, response_body, response_headers, "
+                "CASE WHEN vhost THEN 'True' WHEN NOT vhost THEN 'False' END AS vhost, "
+                "array_to_string(matched_gf_patterns, ',') AS matched_gf_patterns"
+            ),
+            where='target_id = %s',
+            params=[target_id],
+            order_by='url',
         )
-        
-        for row in qs.iterator(chunk_size=batch_size):
-            yield row
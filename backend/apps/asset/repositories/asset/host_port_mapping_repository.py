@@ -1,7 +1,7 @@
 """HostPortMapping Repository - Django ORM 实现"""
 
 import logging
-from typing import List, Iterator, Dict, Optional
+from typing import Iterable, List, Iterator, Dict, Optional
 
 from django.db.models import QuerySet, Min
 
@@ -20,28 +20,28 @@ class DjangoHostPortMappingRepository:
     职责：纯数据访问，不包含业务逻辑
     """
 
-    def bulk_create_ignore_conflicts(self, items: List[HostPortMappingDTO]) -> int:
+    def bulk_create_ignore_conflicts(self, items: Iterable[HostPortMappingDTO]) -> int:
         """
         批量创建主机端口关联（忽略冲突）
         
         注意：自动按模型唯一约束去重，保留最后一条记录。
         
         Args:
-            items: 主机端口关联 DTO 列表
+            items: 主机端口关联 DTO 列表或生成器（只遍历一次）
         
         Returns:
             int: 实际创建的记录数
         """
+        unique_items = []
         try:
-            logger.debug("准备批量创建主机端口关联 - 数量: %d", len(items))
+            # 自动按模型唯一约束去重
+            unique_items = deduplicate_for_bulk(items, HostPortMapping)
+            logger.debug("准备批量创建主机端口关联 - 数量: %d", len(unique_items))
             
-            if not items:
+            if not unique_items:
                 logger.debug("主机端口关联为空，跳过创建")
                 return 0
             
-            # 自动按模型唯一约束去重
-            unique_items = deduplicate_for_bulk(items, HostPortMapping)
-                
             records = [
                 HostPortMapping(
                     target_id=item.target_id,
@@ -65,7 +65,7 @@ class DjangoHostPortMappingRepository:
         except Exception as e:
             logger.error(
                 "批量创建主机端口关联失败 - 数量: %d, 错误: %s",
-                len(items),
+                len(unique_items),
                 str(e),
                 exc_info=True
             )
@@ -113,14 +113,14 @@ class DjangoHostPortMappingRepository:
     def iter_raw_data_for_export(
         self, 
         target_id: int,
-        batch_size: int = 1000
+        batch_size: int = 10000
     ) -> Iterator[dict]:
         """
         流式获取原始数据用于 CSV 导出
         
         Args:
             target_id: 目标 ID
-            batch_size: 每批数据量
+            batch_size: 每批数据量（服务端游标每次 FETCH 的行数；行很窄，取大值减少往返）
         
         Yields:
             {
@@ -3,13 +3,15 @@ Django ORM 实现的 WebSite Repository
 """
 
 import logging
-from typing import List, Generator, Optional, Iterator
-from django.db import transaction
+from operator import attrgetter
+from typing import BinaryIO, Iterable, List, Generator, Optional
 
 from apps.asset.models.asset_models import WebSite
+from apps.asset.models.statistics_models import TargetAssetStats
 from apps.asset.dtos import WebSiteDTO
+from apps.asset.search_cache import invalidate_search_cache_on_commit
 from apps.common.decorators import auto_ensure_db_connection
-from apps.common.utils import deduplicate_for_bulk
+from apps.common.utils import deduplicate_for_bulk, copy_csv_export, copy_upsert, copy_upsert_returning
 
 logger = logging.getLogger(__name__)
 
@@ -18,15 +20,34 @@ logger = logging.getLogger(__name__)
 class DjangoWebSiteRepository:
     """Django ORM 实现的 WebSite Repository"""
 
+    # bulk_upsert 写入的列（与 DTO 属性同名）
+    UPSERT_COLUMNS = (
+        'target_id', 'url', 'host', 'location', 'title', 'webserver',
+        'response_body', 'content_type', 'tech', 'status_code',
+        'content_length', 'vhost', 'response_headers',
+    )
+    # 冲突时更新的列（整列覆盖，tech 等数组字段同样以本次结果替换，不做合并）
+    UPSERT_UPDATE_COLUMNS = UPSERT_COLUMNS[2:]
+
+    # DTO -> COPY 数据行（None 由 copy_upsert 按模型默认值填充）
+    _to_upsert_row = attrgetter(*UPSERT_COLUMNS)
+
     def bulk_upsert(self, items: List[WebSiteDTO]) -> int:
         """
         批量创建或更新 WebSite（upsert）
         
         存在则更新所有字段，不存在则创建。
-        使用 Django 原生 update_conflicts。
+        使用 COPY 写入临时表 + INSERT ... ON CONFLICT DO UPDATE，
+        不构建 Model 实例，数据库往返次数为常数。
+        已存在且各字段均未变化的记录跳过更新（重复扫描时大多数行不变），
+        不产生新的行版本，减少 WAL 和 autovacuum 压力。
         
         注意：自动按模型唯一约束去重，保留最后一条记录。
         
+        tech 语义：整体替换为本次扫描结果（以最新一次探测为准，已消失的技术栈会被移除）。
+        需要累积合并的场景（如指纹识别补充 tech）由调用方在 SQL 中显式使用
+        ARRAY(SELECT DISTINCT unnest(tech || EXCLUDED.tech)) 合并，见 run_xingfinger_task。
+        
         Args:
             items: WebSite DTO 列表
             
@@ -37,41 +58,20 @@ class DjangoWebSiteRepository:
             return 0
         
         try:
-            # 自动按模型唯一约束去重
+            # 自动按模型唯一约束去重（ON CONFLICT DO UPDATE 不允许同批重复）
             unique_items = deduplicate_for_bulk(items, WebSite)
             
-            # 直接从 DTO 字段构建 Model
-            websites = [
-                WebSite(
-                    target_id=item.target_id,
-                    url=item.url,
-                    host=item.host or '',
-                    location=item.location or '',
-                    title=item.title or '',
-                    webserver=item.webserver or '',
-                    response_body=item.response_body or '',
-                    content_type=item.content_type or '',
-                    tech=item.tech if item.tech else [],
-                    status_code=item.status_code,
-                    content_length=item.content_length,
-                    vhost=item.vhost,
-                    response_headers=item.response_headers if item.response_headers else ''
-                )
-                for item in unique_items
-            ]
-            
-            with transaction.atomic():
-                WebSite.objects.bulk_create(
-                    websites,
-                    update_conflicts=True,
-                    unique_fields=['url', 'target'],
-                    update_fields=[
-                        'host', 'location', 'title', 'webserver',
-                        'response_body', 'content_type', 'tech',
-                        'status_code', 'content_length', 'vhost', 'response_headers'
-                    ],
-                    batch_size=1000
-                )
+            affected = copy_upsert(
+                WebSite,
+                map(self._to_upsert_row, unique_items),
+                columns=self.UPSERT_COLUMNS,
+                unique_columns=('url', 'target_id'),
+                update_columns=self.UPSERT_UPDATE_COLUMNS,
+                skip_unchanged=True,
+            )
+            # 重复扫描时各行均未变化则不影响任何行，无需使缓存失效
+            if affected:
+                invalidate_search_cache_on_commit()
             
             logger.debug(f"批量 upsert WebSite 成功: {len(unique_items)} 条")
             return len(unique_items)
@@ -104,18 +104,65 @@ class DjangoWebSiteRepository:
         return WebSite.objects.filter(target_id=target_id).order_by('-created_at')
 
     def count_by_target(self, target_id: int) -> int:
-        """统计目标下的站点总数"""
-        return WebSite.objects.filter(target_id=target_id).count()
+        """统计目标下的站点总数（读取触发器维护的 target_asset_stats 计数）"""
+        return (
+            TargetAssetStats.objects
+            .filter(target_id=target_id)
+            .values_list('website_count', flat=True)
+            .first()
+        ) or 0
 
     def get_by_url(self, url: str, target_id: int) -> Optional[int]:
-        """根据 URL 和 target_id 查找站点 ID"""
-        website = WebSite.objects.filter(url=url, target_id=target_id).first()
-        return website.id if website else None
+        """根据 URL 和 target_id 查找站点 ID（只查询 id 列，不构建 Model 实例）"""
+        return (
+            WebSite.objects
+            .filter(url=url, target_id=target_id)
+            .values_list('id', flat=True)
+            .first()
+        )
+
+    def bulk_create_urls(self, target_id: int, urls: Iterable[str]) -> int:
+        """
+        按 URL 批量创建WebSite（存在即跳过），返回实际新建的记录数
+        
+        URL 直接流式 COPY 到暂存表，由数据库完成去重（DISTINCT ON）与冲突跳过，
+        不构建 DTO 列表和去重集合；RETURNING id 只返回真正插入的行。
+        
+        Args:
+            target_id: 目标 ID
+            urls: 已校验的 URL 迭代器（允许重复）
+            
+        Returns:
+            int: 实际新建的记录数
+        """
+        # 除 target_id / url 外的列传 None，由 copy_upsert 按模型默认值填充
+        padding = (None,) * (len(self.UPSERT_COLUMNS) - 2)
+        
+        try:
+            inserted = copy_upsert_returning(
+                WebSite,
+                ((target_id, url, *padding) for url in urls),
+                columns=self.UPSERT_COLUMNS,
+                unique_columns=('url', 'target_id'),
+                returning=('id',),
+                distinct=True,
+            )
+            if inserted:
+                invalidate_search_cache_on_commit()
+            
+            logger.debug(f"批量创建WebSite成功（ignore_conflicts）: 新建 {len(inserted)} 条")
+            return len(inserted)
+                
+        except Exception as e:
+            logger.error(f"批量创建WebSite失败: {e}")
+            raise
 
     def bulk_create_ignore_conflicts(self, items: List[WebSiteDTO]) -> int:
         """
         批量创建 WebSite（存在即跳过）
         
+        使用 COPY + INSERT ... ON CONFLICT DO NOTHING，不构建 Model 实例。
+        
         注意：自动按模型唯一约束去重，保留最后一条记录。
         """
         if not items:
@@ -125,31 +172,14 @@ class DjangoWebSiteRepository:
             # 自动按模型唯一约束去重
             unique_items = deduplicate_for_bulk(items, WebSite)
             
-            websites = [
-                WebSite(
-                    target_id=item.target_id,
-                    url=item.url,
-                    host=item.host or '',
-                    location=item.location or '',
-                    title=item.title or '',
-                    webserver=item.webserver or '',
-                    response_body=item.response_body or '',
-                    content_type=item.content_type or '',
-                    tech=item.tech if item.tech else [],
-                    status_code=item.status_code,
-                    content_length=item.content_length,
-                    vhost=item.vhost,
-                    response_headers=item.response_headers if item.response_headers else ''
-                )
-                for item in unique_items
-            ]
-            
-            with transaction.atomic():
-                WebSite.objects.bulk_create(
-                    websites,
-                    ignore_conflicts=True,
-                    batch_size=1000
-                )
+            inserted = copy_upsert(
+                WebSite,
+                map(self._to_upsert_row, unique_items),
+                columns=self.UPSERT_COLUMNS,
+                unique_columns=('url', 'target_id'),
+            )
+            if inserted:
+                invalidate_search_cache_on_commit()
             
             logger.debug(f"批量创建 WebSite 成功（ignore_conflicts）: {len(unique_items)} 条")
             return len(unique_items)
@@ -158,31 +188,35 @@ class DjangoWebSiteRepository:
             logger.error(f"批量创建 WebSite 失败: {e}")
             raise
 
-    def iter_raw_data_for_export(
-        self, 
-        target_id: int,
-        batch_size: int = 1000
-    ) -> Iterator[dict]:
+    def bulk_delete_by_ids(self, ids: Iterable[int]) -> int:
         """
-        流式获取原始数据用于 CSV 导出
+        按 ID 批量删除WebSite，并使搜索缓存失效
+        
+        Returns:
+            int: 删除的记录数（含级联删除）
+        """
+        deleted_count, _ = WebSite.objects.filter(id__in=ids).delete()
+        if deleted_count:
+            invalidate_search_cache_on_commit()
+        return deleted_count
+
+    def stream_csv_export(self, target_id: int, out_file: BinaryIO) -> None:
+        """
+        把目标下的网站以 CSV（含表头）写入 out_file，按 url 排序
         
         Args:
             target_id: 目标 ID
-            batch_size: 每批数据量
-        
-        Yields:
-            包含所有网站字段的字典
+            out_file: 二进制可写文件对象
         """
-        qs = (
-            WebSite.objects
-            .filter(target_id=target_id)
-            .values(
-                'url', 'host', 'location', 'title', 'status_code',
-                'content_length', 'content_type', 'webserver', 'tech',
-                'response_body', 'response_headers', 'vhost', 'created_at'
-            )
-            .order_by('url')
+        copy_csv_export(
+            out_file,
+            table='website',
+            columns=(
+                "url, host, location, title, status_code, content_length, content_type, webserver, "
+                "array_to_string(tech, ',') AS tech, response_body, response_headers, "
+                "CASE WHEN vhost THEN 'True' WHEN NOT vhost THEN 'False' END AS vhost"
+            ),
+            where='target_id = %s',
+            params=[target_id],
+            order_by='url',
         )
-        
-        for row in qs.iterator(chunk_size=batch_size):
-            yield row
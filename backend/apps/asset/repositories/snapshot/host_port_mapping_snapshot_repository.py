@@ -1,12 +1,17 @@
 """HostPortMappingSnapshot Repository - Django ORM 实现"""
 
 import logging
-from typing import List, Iterator
+from operator import attrgetter
+from typing import BinaryIO, List, Iterator
+
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db.models import Min, Q
 
 from apps.asset.models.snapshot_models import HostPortMappingSnapshot
 from apps.asset.dtos.snapshot import HostPortMappingSnapshotDTO
 from apps.common.decorators import auto_ensure_db_connection
-from apps.common.utils import deduplicate_for_bulk
+from apps.common.utils import copy_csv_export, copy_upsert
+from apps.common.utils.filter_utils import apply_filters
 
 logger = logging.getLogger(__name__)
 
@@ -15,18 +20,23 @@ logger = logging.getLogger(__name__)
 class DjangoHostPortMappingSnapshotRepository:
     """HostPortMappingSnapshot Repository - Django ORM 实现，负责主机端口映射快照表的数据访问"""
 
+    # COPY 写入的列（DTO 属性名与数据库列名一致）
+    SAVE_COLUMNS = ('scan_id', 'host', 'ip', 'port')
+    _to_save_row = attrgetter(*SAVE_COLUMNS)
+
     def save_snapshots(self, items: List[HostPortMappingSnapshotDTO]) -> None:
         """
         保存主机端口关联快照
         
-        注意：会自动按 (scan_id, host, ip, port) 去重，保留最后一条记录。
+        使用 COPY 写入临时暂存表，再 INSERT ... SELECT ... ON CONFLICT DO NOTHING 合并，
+        不构建 Model 实例。重复数据由唯一约束 (scan + host + ip + port) 丢弃。
         
         Args:
             items: 主机端口关联快照 DTO 列表
         
         Note:
             - 保存完整的快照数据
-            - 基于唯一约束 (scan + host + ip + port) 自动去重
+            - created_at 由数据库填充为 NOW()
         """
         try:
             logger.debug("准备保存主机端口关联快照 - 数量: %d", len(items))
@@ -35,26 +45,14 @@ class DjangoHostPortMappingSnapshotRepository:
                 logger.debug("主机端口关联快照为空，跳过保存")
                 return
             
-            # 根据模型唯一约束自动去重
-            unique_items = deduplicate_for_bulk(items, HostPortMappingSnapshot)
-                
-            # 构建快照对象
-            snapshots = []
-            for item in unique_items:
-                snapshots.append(HostPortMappingSnapshot(
-                    scan_id=item.scan_id,
-                    host=item.host,
-                    ip=item.ip,
-                    port=item.port
-                ))
-            
-            # 批量创建（忽略冲突，基于唯一约束去重）
-            HostPortMappingSnapshot.objects.bulk_create(
-                snapshots, 
-                ignore_conflicts=True
+            copy_upsert(
+                HostPortMappingSnapshot,
+                map(self._to_save_row, items),
+                columns=self.SAVE_COLUMNS,
+                unique_columns=('scan_id', 'host', 'ip', 'port'),
             )
             
-            logger.debug("主机端口关联快照保存成功 - 数量: %d", len(snapshots))
+            logger.debug("主机端口关联快照保存成功 - 数量: %d", len(items))
             
         except Exception as e:
             logger.error(
@@ -65,93 +63,59 @@ class DjangoHostPortMappingSnapshotRepository:
             )
             raise
     
-    def get_ip_aggregation_by_scan(self, scan_id: int, filter_query: str = None):
-        from django.db.models import Min
-        from apps.common.utils.filter_utils import apply_filters
+    # 智能过滤字段映射
+    FILTER_FIELD_MAPPING = {
+        'ip': 'ip',
+        'port': 'port',
+        'host': 'host',
+    }
 
-        qs = HostPortMappingSnapshot.objects.filter(scan_id=scan_id)
+    def get_ip_aggregation_by_scan(self, scan_id: int, filter_query: str = None):
+        """
+        获取扫描下的 IP 聚合数据
         
-        # 应用智能过滤
-        if filter_query:
-            field_mapping = {
-                'ip': 'ip',
-                'port': 'port',
-                'host': 'host',
-            }
-            qs = apply_filters(qs, filter_query, field_mapping)
-
-        ip_aggregated = (
-            qs
-            .values('ip')
-            .annotate(
-                created_at=Min('created_at')
-            )
-            .order_by('-created_at')
-        )
-
-        results = []
-        for item in ip_aggregated:
-            ip = item['ip']
-            mappings = (
-                HostPortMappingSnapshot.objects
-                .filter(scan_id=scan_id, ip=ip)
-                .values('host', 'port')
-                .distinct()
-            )
-
-            hosts = sorted({m['host'] for m in mappings})
-            ports = sorted({m['port'] for m in mappings})
-
-            results.append({
-                'ip': ip,
-                'hosts': hosts,
-                'ports': ports,
-                'created_at': item['created_at'],
-            })
-
-        return results
+        单条 SQL 完成聚合：ARRAY_AGG(DISTINCT ...) 在数据库端去重并排序 host/port，
+        避免对每个 IP 再发起一次子查询（1+N 次往返）。
+        """
+        return self._aggregate_by_ip(HostPortMappingSnapshot.objects.filter(scan_id=scan_id), filter_query)
 
     def get_all_ip_aggregation(self, filter_query: str = None):
-        """获取所有 IP 聚合数据"""
-        from django.db.models import Min
-        from apps.common.utils.filter_utils import apply_filters
+        """获取所有 IP 聚合数据（单条 ARRAY_AGG 聚合查询）"""
+        return self._aggregate_by_ip(HostPortMappingSnapshot.objects.all(), filter_query)
 
-        qs = HostPortMappingSnapshot.objects.all()
+    def _aggregate_by_ip(self, qs, filter_query: str = None) -> List[dict]:
+        """
+        按 IP 聚合映射
         
-        # 应用智能过滤
+        过滤条件决定命中哪些 IP，以及 created_at（排序依据）取哪些行的最小值；
+        hosts/ports 仍聚合该 IP 的全部映射。
+        """
+        created_at = Min('created_at')
         if filter_query:
-            field_mapping = {
-                'ip': 'ip',
-                'port': 'port',
-                'host': 'host',
-            }
-            qs = apply_filters(qs, filter_query, field_mapping)
+            matched = apply_filters(qs, filter_query, self.FILTER_FIELD_MAPPING)
+            qs = qs.filter(ip__in=matched.values('ip'))
+            created_at = Min('created_at', filter=Q(pk__in=matched.values('pk')))
 
         ip_aggregated = (
             qs
             .values('ip')
-            .annotate(created_at=Min('created_at'))
+            .annotate(
+                created_at=created_at,
+                hosts=ArrayAgg('host', distinct=True, order_by='host'),
+                ports=ArrayAgg('port', distinct=True, order_by='port'),
+            )
             .order_by('-created_at')
         )
 
-        results = []
-        for item in ip_aggregated:
-            ip = item['ip']
-            mappings = (
-                HostPortMappingSnapshot.objects
-                .filter(ip=ip)
-                .values('host', 'port')
-                .distinct()
-            )
-            hosts = sorted({m['host'] for m in mappings})
-            ports = sorted({m['port'] for m in mappings})
-            results.append({
-                'ip': ip,
-                'hosts': hosts,
-                'ports': ports,
+        return [
+            {
+                'ip': item['ip'],
+                'hosts': item['hosts'],
+                'ports': item['ports'],
                 'created_at': item['created_at'],
-            })
-        return results
+            }
+            for item in ip_aggregated
+        ]
 
     def get_ips_for_export(self, scan_id: int, batch_size: int = 1000) -> Iterator[str]:
         """流式导出扫描下的所有唯一 IP 地址。"""
@@ -166,32 +130,19 @@ class DjangoHostPortMappingSnapshotRepository:
         for ip in queryset:
             yield ip
 
-    def iter_raw_data_for_export(
-        self, 
-        scan_id: int,
-        batch_size: int = 1000
-    ) -> Iterator[dict]:
+    def stream_csv_export(self, scan_id: int, out_file: BinaryIO) -> None:
         """
-        流式获取原始数据用于 CSV 导出
+        把扫描下的主机端口映射快照以 CSV（含表头）写入 out_file，按 ip, host, port 排序
         
         Args:
             scan_id: 扫描 ID
-            batch_size: 每批数据量
-        
-        Yields:
-            {
-                'ip': '192.168.1.1',
-                'host': 'example.com',
-                'port': 80,
-                'created_at': datetime
-            }
+            out_file: 二进制可写文件对象
         """
-        qs = (
-            HostPortMappingSnapshot.objects
-            .filter(scan_id=scan_id)
-            .values('ip', 'host', 'port', 'created_at')
-            .order_by('ip', 'host', 'port')
+        copy_csv_export(
+            out_file,
+            table='host_port_mapping_snapshot',
+            columns='ip, host, port',
+            where='scan_id = %s',
+            params=[scan_id],
+            order_by='ip, host, port',
         )
-        
-        for row in qs.iterator(chunk_size=batch_size):
-            yield row
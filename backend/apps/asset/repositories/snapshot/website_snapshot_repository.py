@@ -1,12 +1,15 @@
 """WebsiteSnapshot Repository - Django ORM 实现"""
 
 import logging
-from typing import List, Iterator
+from itertools import islice
+from typing import BinaryIO, List
+
+from django.db import transaction
 
 from apps.asset.models.snapshot_models import WebsiteSnapshot
 from apps.asset.dtos.snapshot import WebsiteSnapshotDTO
 from apps.common.decorators import auto_ensure_db_connection
-from apps.common.utils import deduplicate_for_bulk
+from apps.common.utils import copy_csv_export, deduplicate_for_bulk
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +18,9 @@ logger = logging.getLogger(__name__)
 class DjangoWebsiteSnapshotRepository:
     """网站快照 Repository - 负责网站快照表的数据访问"""
 
+    # 每批写入的快照数量
+    SAVE_BATCH_SIZE = 2000
+
     def save_snapshots(self, items: List[WebsiteSnapshotDTO]) -> None:
         """
         保存网站快照
@@ -26,7 +32,7 @@ class DjangoWebsiteSnapshotRepository:
         
         Note:
             - 保存完整的快照数据
-            - 基于唯一约束 (scan + subdomain + url) 自动去重
+            - 快照对象按批惰性构建，不一次性物化全部 Model 实例
         """
         try:
             logger.debug("准备保存网站快照 - 数量: %d", len(items))
@@ -35,13 +41,12 @@ class DjangoWebsiteSnapshotRepository:
                 logger.debug("网站快照为空，跳过保存")
                 return
             
-            # 根据模型唯一约束自动去重
+            # 根据模型唯一约束自动去重（只处理 DTO，不构建 Model 实例）
             unique_items = deduplicate_for_bulk(items, WebsiteSnapshot)
-                
-            # 构建快照对象
-            snapshots = []
-            for item in unique_items:
-                snapshots.append(WebsiteSnapshot(
+            
+            # 惰性构建快照对象
+            snapshots = (
+                WebsiteSnapshot(
                     scan_id=item.scan_id,
                     url=item.url,
                     host=item.host,
@@ -55,15 +60,16 @@ class DjangoWebsiteSnapshotRepository:
                     response_body=item.response_body,
                     vhost=item.vhost,
                     response_headers=item.response_headers if item.response_headers else ''
-                ))
-            
-            # 批量创建（忽略冲突，基于唯一约束去重）
-            WebsiteSnapshot.objects.bulk_create(
-                snapshots, 
-                ignore_conflicts=True
+                )
+                for item in unique_items
             )
             
-            logger.debug("网站快照保存成功 - 数量: %d", len(snapshots))
+            # 分批创建（忽略冲突，基于唯一约束去重）
+            with transaction.atomic():
+                while batch := list(islice(snapshots, self.SAVE_BATCH_SIZE)):
+                    WebsiteSnapshot.objects.bulk_create(batch, ignore_conflicts=True)
+            
+            logger.debug("网站快照保存成功 - 数量: %d", len(items))
             
         except Exception as e:
             logger.error(
@@ -80,31 +86,23 @@ class DjangoWebsiteSnapshotRepository:
     def get_all(self):
         return WebsiteSnapshot.objects.all().order_by('-created_at')
 
-    def iter_raw_data_for_export(
-        self, 
-        scan_id: int,
-        batch_size: int = 1000
-    ) -> Iterator[dict]:
+    def stream_csv_export(self, scan_id: int, out_file: BinaryIO) -> None:
         """
-        流式获取原始数据用于 CSV 导出
+        把扫描下的网站快照以 CSV（含表头）写入 out_file，按 url 排序
         
         Args:
             scan_id: 扫描 ID
-            batch_size: 每批数据量
-        
-        Yields:
-            包含所有网站字段的字典
+            out_file: 二进制可写文件对象
         """
-        qs = (
-            WebsiteSnapshot.objects
-            .filter(scan_id=scan_id)
-            .values(
-                'url', 'host', 'location', 'title', 'status_code',
-                'content_length', 'content_type', 'webserver', 'tech',
-                'response_body', 'response_headers', 'vhost', 'created_at'
-            )
-            .order_by('url')
+        copy_csv_export(
+            out_file,
+            table='website_snapshot',
+            columns=(
+                "url, host, location, title, status_code, content_length, content_type, webserver, "
+                "array_to_string(tech, ',') AS tech, response_body, response_headers, "
+                "CASE WHEN vhost THEN 'True' WHEN NOT vhost THEN 'False' END AS vhost"
+            ),
+            where='scan_id = %s',
+            params=[scan_id],
+            order_by='url',
         )
-        
-        for row in qs.iterator(chunk_size=batch_size):
-            yield row
@@ -0,0 +1,73 @@
+"""
+资产搜索缓存版本号
+
+搜索结果缓存在 Redis（settings.CACHES['search']），缓存键中包含版本号。
+版本号保存在 PostgreSQL 序列中（见迁移 0015）：Worker 无法直连 Redis，
+但 Server 与 Worker 都能访问数据库，写入资产后递增序列即可使旧版本的缓存键全部失效。
+
+本模块只依赖 Django，资产写入路径（repositories / services / views / tasks）统一从这里导入，
+不会与 apps.asset.services 包产生循环导入。
+"""
+
+import logging
+import time
+
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+# 缓存版本号序列
+SEARCH_CACHE_VERSION_SEQUENCE = 'asset_search_cache_version'
+# 进程内复用版本号的秒数：缓存命中时不必每次都查询序列，
+# 其他进程（如 Worker）写入后的失效最多延迟该时间生效
+SEARCH_CACHE_VERSION_TTL = 2.0
+
+# (版本号, 过期时间)，整体替换，多线程读写无需加锁
+_cached_version: tuple[int, float] | None = None
+
+
+def get_search_cache_version() -> int:
+    """
+    获取当前缓存版本号（序列的 last_value，不会递增序列）
+
+    Raises:
+        DatabaseError: 读取序列失败（调用方应退化为不使用缓存）
+    """
+    global _cached_version
+    now = time.monotonic()
+    cached = _cached_version
+    if cached is not None and now < cached[1]:
+        return cached[0]
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT last_value FROM {SEARCH_CACHE_VERSION_SEQUENCE}")
+        version = cursor.fetchone()[0]
+    _cached_version = (version, now + SEARCH_CACHE_VERSION_TTL)
+    return version
+
+
+def invalidate_search_cache() -> None:
+    """
+    递增缓存版本号，使所有已缓存的搜索结果失效
+
+    旧版本的缓存键不再被读取，由 TTL 自然过期。当前进程立即使用新版本号。
+    """
+    global _cached_version
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT nextval(%s)", [SEARCH_CACHE_VERSION_SEQUENCE])
+            version = cursor.fetchone()[0]
+        _cached_version = (version, time.monotonic() + SEARCH_CACHE_VERSION_TTL)
+    except Exception as e:
+        logger.warning(f"使搜索缓存失效失败: {e}")
+
+
+def invalidate_search_cache_on_commit() -> None:
+    """
+    在当前事务提交后使搜索缓存失效（不在事务中时立即执行）
+
+    资产写入路径（website / endpoint / vulnerability 的创建、更新、upsert 与删除，
+    目标硬删除，指纹识别回写）统一调用此函数。
+    提交前就失效的话，并发请求可能把提交前的旧结果重新写入缓存。
+    """
+    transaction.on_commit(invalidate_search_cache)
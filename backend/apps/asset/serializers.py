@@ -1,4 +1,8 @@
+from operator import attrgetter
+
 from rest_framework import serializers
+
+from apps.common.serializers import CachedFieldsSerializerMixin, DynamicFieldsSerializerMixin
 from .models import Subdomain, WebSite, Directory, HostPortMapping, Endpoint, Vulnerability
 from .models.snapshot_models import (
     SubdomainSnapshot,
@@ -10,6 +14,33 @@ from .models.snapshot_models import (
 from .models.screenshot_models import Screenshot, ScreenshotSnapshot
 
 
+# 手写 to_representation 使用的时间格式化字段（与 ModelSerializer 默认输出一致）
+_datetime_field = serializers.DateTimeField(read_only=True)
+
+
+def _created_at(instance):
+    return _datetime_field.to_representation(instance.created_at)
+
+
+def _direct_representation(serializer_class):
+    """
+    类装饰器：按 Meta.fields 生成 to_representation 使用的取值表
+
+    声明字段按其 source 取值，其余按同名属性取值，created_at 固定按时间格式输出。
+    取值表在类创建时由 Meta.fields 生成，新增/删除字段无需同步修改第二份列表。
+    """
+    declared = serializer_class._declared_fields
+    getters = {}
+    for name in serializer_class.Meta.fields:
+        if name == 'created_at':
+            getters[name] = _created_at
+        else:
+            field = declared.get(name)
+            getters[name] = attrgetter(field.source if field is not None and field.source else name)
+    serializer_class.representation_getters = getters
+    return serializer_class
+
+
 # 注意：IPAddress 和 Port 模型已被重构为 HostPortMapping
 # 以下是基于新架构的序列化器实现
 
@@ -32,7 +63,7 @@ class SubdomainSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class SubdomainListSerializer(serializers.ModelSerializer):
+class SubdomainListSerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     """子域名列表序列化器（用于扫描详情）"""
     
     # 注意：Subdomain 模型已简化，只保留核心字段
@@ -67,10 +98,12 @@ class SubdomainListSerializer(serializers.ModelSerializer):
 #         read_only_fields = fields
 
 
-class WebSiteSerializer(serializers.ModelSerializer):
+class WebSiteSerializer(DynamicFieldsSerializerMixin, CachedFieldsSerializerMixin, serializers.ModelSerializer):
     """站点序列化器（目标详情页）"""
     
-    subdomain = serializers.CharField(source='subdomain.name', allow_blank=True, default='')
+    # WebSite 没有 subdomain 关联（按 host 归属），原 source='subdomain.name' 每行都会
+    # 触发 AttributeError 后回退默认值；直接返回空字符串，保持接口字段不变
+    subdomain = serializers.SerializerMethodField()
     responseHeaders = serializers.CharField(source='response_headers', read_only=True)  # 原始HTTP响应头
     
     class Meta:
@@ -94,8 +127,11 @@ class WebSiteSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = fields
 
+    def get_subdomain(self, instance) -> str:
+        return ''
+
 
-class VulnerabilitySerializer(serializers.ModelSerializer):
+class VulnerabilitySerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     """漏洞资产序列化器（按目标查看漏洞资产）。"""
 
     class Meta:
@@ -115,7 +151,7 @@ class VulnerabilitySerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
-class VulnerabilitySnapshotSerializer(serializers.ModelSerializer):
+class VulnerabilitySnapshotSerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     """漏洞快照序列化器（用于扫描历史漏洞列表）。"""
 
     class Meta:
@@ -134,7 +170,8 @@ class VulnerabilitySnapshotSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
-class EndpointListSerializer(serializers.ModelSerializer):
+@_direct_representation
+class EndpointListSerializer(DynamicFieldsSerializerMixin, CachedFieldsSerializerMixin, serializers.ModelSerializer):
     """端点列表序列化器（用于目标端点列表页）"""
 
     # GF 匹配模式（gf-patterns 工具匹配的敏感 URL 模式）
@@ -165,8 +202,17 @@ class EndpointListSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = fields
 
+    def to_representation(self, instance):
+        """
+        直接拼装输出字典，跳过 ModelSerializer 的逐字段反射
 
-class DirectorySerializer(serializers.ModelSerializer):
+        端点列表是高频分页接口，取值表由 Meta.fields 生成（见 _direct_representation）。
+        只读取 ?fields= 请求的属性，配合 restrict_queryset 的 only() 不产生逐行回查。
+        """
+        return self.build_representation(instance, self.representation_getters)
+
+
+class DirectorySerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     """目录序列化器"""
     
     created_at = serializers.DateTimeField(read_only=True)
@@ -205,7 +251,7 @@ class IPAddressAggregatedSerializer(serializers.Serializer):
 
 # ==================== 快照序列化器 ====================
 
-class SubdomainSnapshotSerializer(serializers.ModelSerializer):
+class SubdomainSnapshotSerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     """子域名快照序列化器（用于扫描历史）"""
     
     class Meta:
@@ -214,10 +260,10 @@ class SubdomainSnapshotSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
-class WebsiteSnapshotSerializer(serializers.ModelSerializer):
+@_direct_representation
+class WebsiteSnapshotSerializer(DynamicFieldsSerializerMixin, CachedFieldsSerializerMixin, serializers.ModelSerializer):
     """网站快照序列化器（用于扫描历史）"""
     
-    subdomain_name = serializers.CharField(source='subdomain.name', read_only=True)
     responseHeaders = serializers.CharField(source='response_headers', read_only=True)  # 原始HTTP响应头
     
     class Meta:
@@ -235,13 +281,16 @@ class WebsiteSnapshotSerializer(serializers.ModelSerializer):
             'tech',
             'vhost',
             'responseHeaders',  # HTTP响应头
-            'subdomain_name',
             'created_at',
         ]
         read_only_fields = fields
 
+    def to_representation(self, instance):
+        """直接拼装输出字典，跳过 ModelSerializer 的逐字段反射"""
+        return self.build_representation(instance, self.representation_getters)
 
-class DirectorySnapshotSerializer(serializers.ModelSerializer):
+
+class DirectorySnapshotSerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     """目录快照序列化器（用于扫描历史）"""
     
     class Meta:
@@ -260,7 +309,12 @@ class DirectorySnapshotSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
-class EndpointSnapshotSerializer(serializers.ModelSerializer):
+@_direct_representation
+class EndpointSnapshotSerializer(
+    DynamicFieldsSerializerMixin,
+    CachedFieldsSerializerMixin,
+    serializers.ModelSerializer,
+):
     """端点快照序列化器（用于扫描历史）"""
 
     # GF 匹配模式（gf-patterns 工具匹配的敏感 URL 模式）
@@ -292,10 +346,14 @@ class EndpointSnapshotSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = fields
 
+    def to_representation(self, instance):
+        """直接拼装输出字典，跳过 ModelSerializer 的逐字段反射"""
+        return self.build_representation(instance, self.representation_getters)
+
 
 # ==================== 截图序列化器 ====================
 
-class ScreenshotListSerializer(serializers.ModelSerializer):
+class ScreenshotListSerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     """截图资产列表序列化器（不包含 image 字段）"""
     
     class Meta:
@@ -304,7 +362,7 @@ class ScreenshotListSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
-class ScreenshotSnapshotListSerializer(serializers.ModelSerializer):
+class ScreenshotSnapshotListSerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     """截图快照列表序列化器（不包含 image 字段）"""
     
     class Meta:
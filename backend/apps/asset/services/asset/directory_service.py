@@ -5,7 +5,7 @@ from typing import List, Iterator, Optional
 
 from apps.asset.repositories import DjangoDirectoryRepository
 from apps.asset.dtos import DirectoryDTO
-from apps.common.validators import is_valid_url, is_url_match_target
+from apps.common.validators import filter_target_urls
 from apps.common.utils.filter_utils import apply_filters
 
 logger = logging.getLogger(__name__)
@@ -65,24 +65,8 @@ class DirectoryService:
             return 0
         
         # 过滤有效 URL 并去重
-        valid_urls = []
-        seen = set()
-        
-        for url in urls:
-            if not isinstance(url, str):
-                continue
-            url = url.strip()
-            if not url or url in seen:
-                continue
-            if not is_valid_url(url):
-                continue
-            
-            # 匹配验证（前端已阻止不匹配的提交，后端作为双重保障）
-            if not is_url_match_target(url, target_name, target_type):
-                continue
-            
-            seen.add(url)
-            valid_urls.append(url)
+        # 匹配验证（前端已阻止不匹配的提交，后端作为双重保障）
+        valid_urls = filter_target_urls(urls, target_name, target_type)
         
         if not valid_urls:
             return 0
@@ -5,11 +5,11 @@ Endpoint 服务层
 """
 
 import logging
-from typing import List, Iterator, Optional
+from typing import BinaryIO, Iterable, List, Iterator, Optional
 
 from apps.asset.dtos.asset import EndpointDTO
 from apps.asset.repositories.asset import DjangoEndpointRepository
-from apps.common.validators import is_valid_url, is_url_match_target
+from apps.common.validators import iter_target_urls
 from apps.common.utils.filter_utils import apply_filters
 
 logger = logging.getLogger(__name__)
@@ -35,21 +35,18 @@ class EndpointService:
         """初始化 Endpoint 服务"""
         self.repo = DjangoEndpointRepository()
     
-    def bulk_upsert(self, endpoints: List[EndpointDTO]) -> int:
+    def bulk_upsert(self, endpoints: Iterable[EndpointDTO]) -> int:
         """
         批量创建或更新端点（upsert）
         
         存在则更新所有字段，不存在则创建。
         
         Args:
-            endpoints: 端点数据列表
+            endpoints: 端点数据列表或生成器（只遍历一次）
             
         Returns:
             int: 处理的记录数
         """
-        if not endpoints:
-            return 0
-        
         try:
             return self.repo.bulk_upsert(endpoints)
         except Exception as e:
@@ -75,42 +72,22 @@ class EndpointService:
         if not urls:
             return 0
         
-        # 过滤有效 URL 并去重
-        valid_urls = []
-        seen = set()
+        # 流式过滤有效 URL，去重交给数据库（大批量上传时不在内存中构建 URL 集合）
+        # 匹配验证（前端已阻止不匹配的提交，后端作为双重保障）
+        valid_urls = iter_target_urls(urls, target_name, target_type)
+        return self.repo.bulk_create_urls(target_id, valid_urls)
+    
+    def bulk_delete(self, ids: List[int]) -> int:
+        """
+        按 ID 批量删除端点（同时使搜索缓存失效）
         
-        for url in urls:
-            if not isinstance(url, str):
-                continue
-            url = url.strip()
-            if not url or url in seen:
-                continue
-            if not is_valid_url(url):
-                continue
-            
-            # 匹配验证（前端已阻止不匹配的提交，后端作为双重保障）
-            if not is_url_match_target(url, target_name, target_type):
-                continue
+        Args:
+            ids: 端点 ID 列表
             
-            seen.add(url)
-            valid_urls.append(url)
-        
-        if not valid_urls:
-            return 0
-        
-        # 获取创建前的数量
-        count_before = self.repo.count_by_target(target_id)
-        
-        # 创建 DTO 列表并批量创建
-        endpoint_dtos = [
-            EndpointDTO(url=url, target_id=target_id)
-            for url in valid_urls
-        ]
-        self.repo.bulk_create_ignore_conflicts(endpoint_dtos)
-        
-        # 获取创建后的数量
-        count_after = self.repo.count_by_target(target_id)
-        return count_after - count_before
+        Returns:
+            int: 删除的记录数
+        """
+        return self.repo.bulk_delete_by_ids(ids)
     
     def get_endpoints_by_target(self, target_id: int, filter_query: Optional[str] = None):
         """获取目标下的所有端点"""
@@ -144,14 +121,12 @@ class EndpointService:
         for url in queryset.values_list('url', flat=True).iterator(chunk_size=chunk_size):
             yield url
 
-    def iter_raw_data_for_csv_export(self, target_id: int) -> Iterator[dict]:
+    def stream_csv_export(self, target_id: int, out_file: BinaryIO) -> None:
         """
-        流式获取原始数据用于 CSV 导出
+        由数据库 COPY 直接生成 CSV 并写入 out_file
         
         Args:
             target_id: 目标 ID
-        
-        Yields:
-            原始数据字典
+            out_file: 二进制可写文件对象
         """
-        return self.repo.iter_raw_data_for_export(target_id=target_id)
+        self.repo.stream_csv_export(target_id=target_id, out_file=out_file)
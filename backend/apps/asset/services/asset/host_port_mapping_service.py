@@ -1,7 +1,8 @@
 """HostPortMapping Service - 业务逻辑层"""
 
 import logging
-from typing import List, Iterator, Optional, Dict
+from collections import defaultdict
+from typing import Iterable, List, Iterator, Optional, Dict
 
 from django.db.models import Min
 
@@ -30,12 +31,12 @@ class HostPortMappingService:
     def __init__(self):
         self.repo = DjangoHostPortMappingRepository()
     
-    def bulk_create_ignore_conflicts(self, items: List[HostPortMappingDTO]) -> int:
+    def bulk_create_ignore_conflicts(self, items: Iterable[HostPortMappingDTO]) -> int:
         """
         批量创建主机端口映射（忽略冲突）
         
         Args:
-            items: 主机端口映射 DTO 列表
+            items: 主机端口映射 DTO 列表或生成器（只遍历一次）
         
         Returns:
             int: 实际创建的记录数
@@ -44,8 +45,6 @@ class HostPortMappingService:
             使用数据库唯一约束 + ignore_conflicts 自动去重
         """
         try:
-            logger.debug("Service: 准备批量创建主机端口映射 - 数量: %d", len(items))
-            
             created_count = self.repo.bulk_create_ignore_conflicts(items)
             
             logger.info("Service: 主机端口映射创建成功 - 数量: %d", created_count)
@@ -54,8 +53,7 @@ class HostPortMappingService:
             
         except Exception as e:
             logger.error(
-                "Service: 批量创建主机端口映射失败 - 数量: %d, 错误: %s",
-                len(items),
+                "Service: 批量创建主机端口映射失败 - 错误: %s",
                 str(e),
                 exc_info=True
             )
@@ -86,7 +84,7 @@ class HostPortMappingService:
             qs = apply_filters(qs, filter_query, self.FILTER_FIELD_MAPPING)
         
         # Service 层处理聚合逻辑
-        return self._aggregate_by_ip(qs, filter_query, target_id=target_id)
+        return self._aggregate_by_ip(qs)
 
     def get_all_ip_aggregation(self, filter_query: Optional[str] = None) -> List[Dict]:
         """获取所有 IP 聚合数据（全局查询）
@@ -105,20 +103,16 @@ class HostPortMappingService:
             qs = apply_filters(qs, filter_query, self.FILTER_FIELD_MAPPING)
         
         # Service 层处理聚合逻辑
-        return self._aggregate_by_ip(qs, filter_query)
+        return self._aggregate_by_ip(qs)
 
-    def _aggregate_by_ip(
-        self, 
-        qs, 
-        filter_query: Optional[str] = None,
-        target_id: Optional[int] = None
-    ) -> List[Dict]:
+    def _aggregate_by_ip(self, qs) -> List[Dict]:
         """按 IP 聚合数据
         
+        一次流式读取 (ip, host, port) 并在 Python 端分组，
+        避免对每个 IP 再发起一次 host/port 查询（1+N 次往返）。
+        
         Args:
-            qs: 已过滤的 QuerySet
-            filter_query: 过滤条件（用于子查询）
-            target_id: 目标 ID（用于子查询限定范围）
+            qs: 已过滤的 QuerySet（hosts/ports 与 IP 列表使用同一过滤条件）
         
         Returns:
             聚合后的数据列表
@@ -130,23 +124,19 @@ class HostPortMappingService:
             .order_by('-created_at')
         )
 
+        groups = defaultdict(lambda: (set(), set()))
+        for ip, host, port in qs.values_list('ip', 'host', 'port').iterator(chunk_size=5000):
+            hosts, ports = groups[ip]
+            hosts.add(host)
+            ports.add(port)
+
         results = []
         for item in ip_aggregated:
-            ip = item['ip']
-            
-            # 获取该 IP 的所有 host 和 port（也需要应用过滤条件）
-            mappings_qs = self.repo.get_queryset_by_ip(ip, target_id=target_id)
-            if filter_query:
-                mappings_qs = apply_filters(mappings_qs, filter_query, self.FILTER_FIELD_MAPPING)
-            
-            mappings = mappings_qs.values('host', 'port').distinct()
-            hosts = sorted({m['host'] for m in mappings})
-            ports = sorted({m['port'] for m in mappings})
-            
+            hosts, ports = groups[item['ip']]
             results.append({
-                'ip': ip,
-                'hosts': hosts,
-                'ports': ports,
+                'ip': item['ip'],
+                'hosts': sorted(hosts),
+                'ports': sorted(ports),
                 'created_at': item['created_at'],
             })
         
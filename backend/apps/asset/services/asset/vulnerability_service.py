@@ -5,6 +5,7 @@ from typing import List, Optional
 
 from apps.asset.models import Vulnerability
 from apps.asset.dtos.asset import VulnerabilityDTO
+from apps.asset.search_cache import invalidate_search_cache_on_commit
 from apps.common.decorators import auto_ensure_db_connection
 from apps.common.utils import deduplicate_for_bulk
 from apps.common.utils.filter_utils import apply_filters
@@ -59,6 +60,8 @@ class VulnerabilityService:
             ]
 
             Vulnerability.objects.bulk_create(vulns, ignore_conflicts=True)
+            # 资产搜索结果附带漏洞列表
+            invalidate_search_cache_on_commit()
             logger.info("漏洞资产保存成功 - 数量: %d", len(vulns))
 
         except Exception as e:
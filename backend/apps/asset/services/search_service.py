@@ -2,18 +2,25 @@
 资产搜索服务
 
 提供资产搜索的核心业务逻辑：
-- 从物化视图查询数据
+- 直接查询 website / endpoint 原表（依赖原表上的索引）
 - 支持表达式语法解析
 - 支持 =（模糊）、==（精确）、!=（不等于）操作符
 - 支持 && (AND) 和 || (OR) 逻辑组合
 - 支持 Website 和 Endpoint 两种资产类型
 """
 
+import hashlib
 import logging
 import re
-from typing import Optional, List, Dict, Any, Tuple, Literal, Iterator
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional, List, Dict, Any, Tuple, Literal, Iterable, Callable, TypeVar, BinaryIO
 
-from django.db import connection
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.asset.search_cache import get_search_cache_version
 
 logger = logging.getLogger(__name__)
 
@@ -31,14 +38,7 @@ FIELD_MAPPING = {
 # 数组类型字段
 ARRAY_FIELDS = {'tech'}
 
-# 资产类型到视图名的映射
-VIEW_MAPPING = {
-    'website': 'asset_search_view',
-    'endpoint': 'endpoint_search_view',
-}
-
-# 资产类型到原表名的映射（用于 JOIN 获取数组字段）
-# ⚠️ 重要：pg_ivm 不支持 ArrayField，所有数组字段必须从原表 JOIN 获取
+# 资产类型到表名的映射
 TABLE_MAPPING = {
     'website': 'website',
     'endpoint': 'endpoint',
@@ -47,64 +47,332 @@ TABLE_MAPPING = {
 # 有效的资产类型
 VALID_ASSET_TYPES = {'website', 'endpoint'}
 
-# Website 查询字段（v=视图，t=原表）
-# ⚠️ 注意：t.tech 从原表获取，因为 pg_ivm 不支持 ArrayField
+# Website 查询字段（t=表别名）
 WEBSITE_SELECT_FIELDS = """
-    v.id,
-    v.url,
-    v.host,
-    v.title,
-    t.tech,  -- ArrayField，从 website 表 JOIN 获取
-    v.status_code,
-    v.response_headers,
-    v.response_body,
-    v.content_type,
-    v.content_length,
-    v.webserver,
-    v.location,
-    v.vhost,
-    v.created_at,
-    v.target_id
+    t.id,
+    t.url,
+    t.host,
+    t.title,
+    t.tech,
+    t.status_code,
+    t.response_headers,
+    t.response_body,
+    t.content_type,
+    t.content_length,
+    t.webserver,
+    t.location,
+    t.vhost,
+    t.created_at,
+    t.target_id
 """
 
 # Endpoint 查询字段
-# ⚠️ 注意：t.tech 和 t.matched_gf_patterns 从原表获取，因为 pg_ivm 不支持 ArrayField
 ENDPOINT_SELECT_FIELDS = """
-    v.id,
-    v.url,
-    v.host,
-    v.title,
-    t.tech,  -- ArrayField，从 endpoint 表 JOIN 获取
-    v.status_code,
-    v.response_headers,
-    v.response_body,
-    v.content_type,
-    v.content_length,
-    v.webserver,
-    v.location,
-    v.vhost,
-    t.matched_gf_patterns,  -- ArrayField，从 endpoint 表 JOIN 获取
-    v.created_at,
-    v.target_id
+    t.id,
+    t.url,
+    t.host,
+    t.title,
+    t.tech,
+    t.status_code,
+    t.response_headers,
+    t.response_body,
+    t.content_type,
+    t.content_length,
+    t.webserver,
+    t.location,
+    t.vhost,
+    t.matched_gf_patterns,
+    t.created_at,
+    t.target_id
 """
 
 
+# 结果列名（与 SELECT 字段顺序一致，模块加载时确定，避免每次查询读取 cursor.description）
+WEBSITE_COLUMNS = tuple(f.strip()[2:] for f in WEBSITE_SELECT_FIELDS.split(',') if f.strip())
+ENDPOINT_COLUMNS = tuple(f.strip()[2:] for f in ENDPOINT_SELECT_FIELDS.split(',') if f.strip())
+
+
+# 资产类型 -> (SELECT 字段, 结果列名)
+_ASSET_TYPE_FIELDS = {
+    'website': (WEBSITE_SELECT_FIELDS, WEBSITE_COLUMNS),
+    'endpoint': (ENDPOINT_SELECT_FIELDS, ENDPOINT_COLUMNS),
+}
+
+
+def _check_asset_type(asset_type: str) -> None:
+    """校验资产类型；表名直接拼入 SQL，不能静默回退到默认表"""
+    if asset_type not in VALID_ASSET_TYPES:
+        raise ValueError(f"无效的资产类型: {asset_type!r}，必须是 {sorted(VALID_ASSET_TYPES)} 之一")
+
+
+# 按字段裁剪查询列时始终保留的列（结果标识、游标分页位置）
+REQUIRED_COLUMNS = ('id', 'created_at')
+
+
+def _get_columns(asset_type: str) -> Tuple[str, ...]:
+    """获取资产类型对应的结果列名"""
+    _check_asset_type(asset_type)
+    return _ASSET_TYPE_FIELDS[asset_type][1]
+
+
+def _select_columns(asset_type: str, fields: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    """
+    确定实际查询的列
+    
+    未指定 fields 时返回全部列；否则只保留白名单（该资产类型的全部列）内的字段，
+    加上 REQUIRED_COLUMNS，按标准列顺序排列，同一组字段总是得到同一个元组
+    （_build_sql 的缓存键保持稳定）。
+    
+    Raises:
+        ValueError: 资产类型无效或包含不支持的字段
+    """
+    columns = _get_columns(asset_type)
+    if fields is None:
+        return columns
+    requested = set(fields)
+    unknown = requested.difference(columns)
+    if unknown:
+        raise ValueError(f"不支持的字段: {', '.join(sorted(unknown))}")
+    requested.update(REQUIRED_COLUMNS)
+    return tuple(column for column in columns if column in requested)
+
+
+def _row_factory(columns: Tuple[str, ...]) -> Callable[[tuple], Dict[str, Any]]:
+    """
+    返回把结果行转换为 dict 的函数
+    
+    zip 按列名数量截断，多余的行尾列（如 _total）会被忽略。
+    """
+    def row_to_dict(row: tuple) -> Dict[str, Any]:
+        return dict(zip(columns, row))
+    return row_to_dict
+
+
+# SQL 模板（{where} 为解析器生成的 WHERE 子句，值全部走参数占位符）
+# 排序追加 t.id DESC 作为唯一的次序键，保证分页（OFFSET 或游标）结果稳定
+_SQL_TEMPLATES = {
+    'search': "SELECT {fields} FROM {table} t WHERE {where} ORDER BY t.created_at DESC, t.id DESC",
+    'search_limit': (
+        "SELECT {fields} FROM {table} t WHERE {where} "
+        "ORDER BY t.created_at DESC, t.id DESC LIMIT %s"
+    ),
+    # 游标分页：从上一页最后一行 (created_at, id) 之后继续，沿 created_at 索引只读 LIMIT 行，
+    # 不再像 OFFSET 那样先扫描并丢弃前面所有页
+    'search_after': (
+        "SELECT {fields} FROM {table} t WHERE ({where}) AND (t.created_at, t.id) < (%s, %s) "
+        "ORDER BY t.created_at DESC, t.id DESC LIMIT %s"
+    ),
+    'search_with_count': (
+        "SELECT {fields}, COUNT(*) OVER() AS _total FROM {table} t WHERE {where} "
+        "ORDER BY t.created_at DESC, t.id DESC LIMIT %s OFFSET %s"
+    ),
+    'count': "SELECT COUNT(*) FROM {table} t WHERE {where}",
+    'exists': "SELECT EXISTS (SELECT 1 FROM {table} t WHERE {where})",
+}
+
+
+@lru_cache(maxsize=512)
+def _build_sql(
+    kind: str,
+    asset_type: str,
+    where_clause: str,
+    columns: Optional[Tuple[str, ...]] = None
+) -> str:
+    """
+    按 (语句类型, 资产类型, WHERE 子句) 缓存拼接好的 SQL
+    
+    WHERE 子句只包含字段和 %s 占位符，不含用户输入的值，因此同一查询形状
+    （如 host="..." && tech="..."）无论取值如何都命中同一条缓存，
+    LIMIT/OFFSET 也作为参数传入，SQL 文本保持稳定。
+    每种 (语句类型, 资产类型, 查询形状) 只格式化一次，之后直接返回缓存的字符串。
+    
+    columns 为 _select_columns 的结果时只查询这些列（不传则查询全部列）。
+    
+    Raises:
+        ValueError: 资产类型无效
+    """
+    _check_asset_type(asset_type)
+    if columns is None:
+        select_fields = _ASSET_TYPE_FIELDS[asset_type][0]
+    else:
+        select_fields = ', '.join(f't.{column}' for column in columns)
+    return _SQL_TEMPLATES[kind].format(fields=select_fields, table=TABLE_MAPPING[asset_type], where=where_clause)
+
+
+# CSV 导出列（表头 -> SQL 表达式），格式与原 generate_csv_rows 导出一致：
+# 数组用 "; " 连接，vhost 输出 true/false，created_at 转为本地时区（占位符由调用方传入时区名）
+_CSV_COMMON_HEAD = (
+    ('url', 't.url'),
+    ('host', 't.host'),
+    ('title', 't.title'),
+    ('status_code', 't.status_code'),
+    ('content_type', 't.content_type'),
+    ('content_length', 't.content_length'),
+    ('webserver', 't.webserver'),
+    ('location', 't.location'),
+    ('tech', "array_to_string(t.tech, '; ')"),
+)
+_CSV_COMMON_TAIL = (
+    ('vhost', "CASE WHEN t.vhost THEN 'true' WHEN NOT t.vhost THEN 'false' END"),
+    ('created_at', "to_char(t.created_at AT TIME ZONE %s, 'YYYY-MM-DD HH24:MI:SS')"),
+)
+_CSV_EXPORT_COLUMNS = {
+    'website': _CSV_COMMON_HEAD + _CSV_COMMON_TAIL,
+    'endpoint': (
+        _CSV_COMMON_HEAD
+        + (('matched_gf_patterns', "array_to_string(t.matched_gf_patterns, '; ')"),)
+        + _CSV_COMMON_TAIL
+    ),
+}
+
+
+@lru_cache(maxsize=256)
+def _build_csv_export_sql(asset_type: str, where_clause: str) -> str:
+    """
+    构建 CSV 导出查询（供 COPY ... TO STDOUT 使用），第一个参数为时区名
+    
+    Raises:
+        ValueError: 资产类型无效
+    """
+    _check_asset_type(asset_type)
+    select_fields = ', '.join(
+        f'{expression} AS "{header}"' for header, expression in _CSV_EXPORT_COLUMNS[asset_type]
+    )
+    return _SQL_TEMPLATES['search'].format(
+        fields=select_fields, table=TABLE_MAPPING[asset_type], where=where_clause
+    )
+
+
+# 搜索结果缓存（settings.CACHES['search']，Redis；版本号见 apps.asset.search_cache）
+SEARCH_CACHE_ALIAS = 'search'
+
+T = TypeVar('T')
+
+
+def _cached_search(key_parts: tuple, compute: Callable[[], T]) -> T:
+    """
+    读取/写入搜索结果缓存
+    
+    缓存键 = 版本号 + (语句类型, 资产类型, 查询, 分页...) 的哈希。
+    Redis 或版本号序列不可用时记录警告并直接查询数据库，不影响搜索功能。
+    """
+    try:
+        version = get_search_cache_version()
+        cache = caches[SEARCH_CACHE_ALIAS]
+        digest = hashlib.blake2b(repr(key_parts).encode(), digest_size=16).hexdigest()
+        key = f"asset_search:{version}:{digest}"
+        cached = cache.get(key)
+    except Exception as e:
+        logger.warning(f"搜索缓存不可用，直接查询数据库: {e}")
+        return compute()
+    
+    if cached is not None:
+        return cached
+    
+    value = compute()
+    try:
+        cache.set(key, value)
+    except Exception as e:
+        logger.warning(f"写入搜索缓存失败: {e}")
+    return value
+
+
+# 状态码取值：单个或逗号分隔的多个整数，如 "200" / "200,301,302"
+_STATUS_PATTERN = re.compile(r'\s*\d+\s*(?:,\s*\d+\s*)*')
+
+
+@lru_cache(maxsize=256)
+def _parse_status(value: str) -> Optional[Tuple[int, ...]]:
+    """
+    解析状态码取值，非整数列表时返回 None
+    
+    仪表盘常重复相同的状态码组合（如 200,301,302），按字符串缓存解析结果。
+    """
+    if not _STATUS_PATTERN.fullmatch(value):
+        return None
+    return tuple(int(code) for code in value.split(','))
+
+
+def _status_condition(field: str, codes: Tuple[int, ...], negate: bool = False) -> Tuple[str, List[Any]]:
+    """状态码条件：单值用 =，多值用 = ANY（按值个数保持 SQL 文本稳定）"""
+    if len(codes) == 1:
+        clause, params = f"t.{field} = %s", [codes[0]]
+    else:
+        clause, params = f"t.{field} = ANY(%s)", [list(codes)]
+    if negate:
+        return f"(t.{field} IS NULL OR NOT ({clause}))", params
+    return clause, params
+
+
+def _escape_like(value: str) -> str:
+    """转义 LIKE 模式中的通配符（反斜杠为默认转义字符）"""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+# 词法单元类型
+_TOKEN_AND = 'and'
+_TOKEN_OR = 'or'
+_TOKEN_LPAREN = 'lparen'
+_TOKEN_RPAREN = 'rparen'
+_TOKEN_COND = 'cond'
+
+# 单次扫描切分查询：引号内的内容整体归入条件（未闭合的引号一直延续到末尾），
+# 引号外的 && / || / ( / ) 作为结构符号
+_TOKEN_PATTERN = re.compile(
+    r'\s*(?:(?P<and>&&)|(?P<or>\|\|)|(?P<lparen>\()|(?P<rparen>\))'
+    r'|(?P<cond>(?:"[^"]*"?|[^"&|()]|&(?!&)|\|(?!\|))+))'
+)
+
+# (类型, 起始位置, 结束位置)：只记录在查询字符串中的区间，不切出子串
+Token = Tuple[str, int, int]
+
+
+def _tokenize(query: str) -> List[Token]:
+    """
+    把查询切分为 (类型, 起始位置, 结束位置) 序列
+    
+    一次正则扫描完成，不再按 || 和 && 分别切分字符串；
+    没有对应左括号的右括号直接丢弃。条件区间已去掉首尾空白，
+    解析条件时直接在原查询上按区间查找，只有字段名和值会被切出。
+    """
+    tokens: List[Token] = []
+    depth = 0
+    for match in _TOKEN_PATTERN.finditer(query):
+        kind = match.lastgroup
+        if kind == _TOKEN_LPAREN:
+            depth += 1
+        elif kind == _TOKEN_RPAREN:
+            if not depth:
+                continue
+            depth -= 1
+        start, end = match.span(kind)
+        while end > start and query[end - 1].isspace():
+            end -= 1
+        tokens.append((kind, start, end))
+    return tokens
+
+
 class SearchQueryParser:
     """
     搜索查询解析器
     
     支持语法：
     - field="value"     模糊匹配（ILIKE %value%）
+    - host="*.example.com"  后缀匹配（子域名搜索，走反转主机名索引）
     - field=="value"    精确匹配
     - field!="value"    不等于
-    - &&                AND 连接
+    - &&                AND 连接（优先级高于 ||）
     - ||                OR 连接
-    - ()                分组（暂不支持嵌套）
+    - ()                分组（支持嵌套）
     
     示例：
     - host="api" && tech="nginx"
     - tech="vue" || tech="react"
     - status=="200" && host!="test"
+    - status="200,301,302"（状态码多值匹配）
+    - (tech="vue" || tech="react") && status=="200"
+    
+    无法解析的条件记录警告后忽略；全部忽略时返回 1=1。
     """
     
     # 匹配单个条件: field="value" 或 field=="value" 或 field!="value"
@@ -115,212 +383,268 @@ class SearchQueryParser:
         """
         解析查询字符串，返回 SQL WHERE 子句和参数
         
+        解析结果按原始查询字符串缓存（翻页、导出前计数等会反复解析同一查询），
+        每次返回新的参数列表，调用方可以自由追加 LIMIT 等参数。
+        
         Args:
             query: 搜索查询字符串
         
         Returns:
             (where_clause, params) 元组
         """
+        clause, params = _parse_query_cached(query)
+        return clause, list(params)
+    
+    @classmethod
+    def _parse_uncached(cls, query: str) -> Tuple[str, List[Any]]:
+        """parse 的实际解析逻辑（不经过缓存）"""
         if not query or not query.strip():
             return "1=1", []
         
         query = query.strip()
         
         # 检查是否包含操作符语法，如果不包含则作为 host 模糊搜索
-        if not cls.CONDITION_PATTERN.search(query):
-            # 裸文本，默认作为 host 模糊搜索（v 是视图别名）
-            return "v.host ILIKE %s", [f"%{query}%"]
-        
-        # 按 || 分割为 OR 组
-        or_groups = cls._split_by_or(query)
-        
-        if len(or_groups) == 1:
-            # 没有 OR，直接解析 AND 条件
-            return cls._parse_and_group(or_groups[0])
-        
-        # 多个 OR 组
-        or_clauses = []
-        all_params = []
-        
-        for group in or_groups:
-            clause, params = cls._parse_and_group(group)
-            if clause and clause != "1=1":
-                or_clauses.append(f"({clause})")
-                all_params.extend(params)
-        
-        if not or_clauses:
+        # 条件必须同时含 = 和 "，先用子串判断排除最常见的裸文本，再跑正则
+        if '=' not in query or '"' not in query or not cls.CONDITION_PATTERN.search(query):
+            # 裸文本，默认作为 host 模糊搜索（t 是表别名）
+            return "t.host ILIKE %s", [f"%{query}%"]
+        
+        tokens = _tokenize(query)
+        clause, params, _, _ = cls._parse_or(query, tokens, 0)
+        if not clause:
             return "1=1", []
-        
-        return " OR ".join(or_clauses), all_params
+        return clause, params
     
     @classmethod
-    def _split_by_or(cls, query: str) -> List[str]:
-        """按 || 分割查询，但忽略引号内的 ||"""
-        parts = []
-        current = ""
-        in_quotes = False
-        i = 0
-        
-        while i < len(query):
-            char = query[i]
-            
-            if char == '"':
-                in_quotes = not in_quotes
-                current += char
-            elif not in_quotes and i + 1 < len(query) and query[i:i+2] == '||':
-                if current.strip():
-                    parts.append(current.strip())
-                current = ""
-                i += 1  # 跳过第二个 |
-            else:
-                current += char
-            
-            i += 1
-        
-        if current.strip():
-            parts.append(current.strip())
+    def _parse_or(cls, query: str, tokens: List[Token], pos: int) -> Tuple[Optional[str], List[Any], int, bool]:
+        """
+        解析 OR 表达式：and_expr (|| and_expr)*
         
-        return parts if parts else [query]
+        Returns:
+            (clause, params, 下一个位置, 是否为多分支 OR)
+            多分支时每个分支加括号，与 AND 组合时由调用方整体再加括号
+        """
+        branches: List[str] = []
+        params: List[Any] = []
+        # 非空分支数（空分支如 "a ||" 末尾的部分不计入）
+        branch_count = 0
+        while True:
+            start = pos
+            clause, branch_params, pos = cls._parse_and(query, tokens, pos)
+            if pos > start:
+                branch_count += 1
+            if clause:
+                branches.append(clause)
+                params.extend(branch_params)
+            if pos >= len(tokens) or tokens[pos][0] != _TOKEN_OR:
+                break
+            pos += 1
+        
+        if not branches:
+            return None, [], pos, False
+        if branch_count < 2:
+            return branches[0], params, pos, False
+        return " OR ".join(f"({branch})" for branch in branches), params, pos, True
     
     @classmethod
-    def _parse_and_group(cls, group: str) -> Tuple[str, List[Any]]:
-        """解析 AND 组（用 && 连接的条件）"""
-        # 移除外层括号
-        group = group.strip()
-        if group.startswith('(') and group.endswith(')'):
-            group = group[1:-1].strip()
-        
-        # 按 && 分割
-        parts = cls._split_by_and(group)
-        
-        and_clauses = []
-        all_params = []
-        
-        for part in parts:
-            clause, params = cls._parse_condition(part.strip())
+    def _parse_and(cls, query: str, tokens: List[Token], pos: int) -> Tuple[Optional[str], List[Any], int]:
+        """解析 AND 表达式：primary (&& primary)*，括号后直接跟条件时按 AND 处理"""
+        clauses: List[str] = []
+        params: List[Any] = []
+        while True:
+            clause, primary_params, pos = cls._parse_primary(query, tokens, pos)
             if clause:
-                and_clauses.append(clause)
-                all_params.extend(params)
-        
-        if not and_clauses:
-            return "1=1", []
-        
-        return " AND ".join(and_clauses), all_params
+                clauses.append(clause)
+                params.extend(primary_params)
+            if pos >= len(tokens):
+                break
+            kind = tokens[pos][0]
+            if kind == _TOKEN_AND:
+                pos += 1
+            elif kind in (_TOKEN_OR, _TOKEN_RPAREN):
+                break
+        
+        if not clauses:
+            return None, [], pos
+        return " AND ".join(clauses), params, pos
     
     @classmethod
-    def _split_by_and(cls, query: str) -> List[str]:
-        """按 && 分割查询，但忽略引号内的 &&"""
-        parts = []
-        current = ""
-        in_quotes = False
-        i = 0
-        
-        while i < len(query):
-            char = query[i]
-            
-            if char == '"':
-                in_quotes = not in_quotes
-                current += char
-            elif not in_quotes and i + 1 < len(query) and query[i:i+2] == '&&':
-                if current.strip():
-                    parts.append(current.strip())
-                current = ""
-                i += 1  # 跳过第二个 &
-            else:
-                current += char
-            
-            i += 1
-        
-        if current.strip():
-            parts.append(current.strip())
-        
-        return parts if parts else [query]
+    def _parse_primary(cls, query: str, tokens: List[Token], pos: int) -> Tuple[Optional[str], List[Any], int]:
+        """解析单个条件或括号分组；遇到缺失的操作数（如 && &&）时不消耗词法单元"""
+        if pos >= len(tokens):
+            return None, [], pos
+        
+        kind, start, end = tokens[pos]
+        if kind == _TOKEN_COND:
+            clause, params = cls._parse_condition(query, start, end)
+            return clause, params, pos + 1
+        if kind != _TOKEN_LPAREN:
+            return None, [], pos
+        
+        clause, params, pos, is_or = cls._parse_or(query, tokens, pos + 1)
+        # 未闭合的左括号视为在末尾闭合
+        if pos < len(tokens) and tokens[pos][0] == _TOKEN_RPAREN:
+            pos += 1
+        if clause and is_or:
+            clause = f"({clause})"
+        return clause, params, pos
     
     @classmethod
-    def _parse_condition(cls, condition: str) -> Tuple[Optional[str], List[Any]]:
+    def _parse_condition(cls, query: str, start: int, end: int) -> Tuple[Optional[str], List[Any]]:
         """
-        解析单个条件
+        解析 query[start:end] 区间内的单个条件（区间已去掉首尾空白，且不含引号外的括号）
+        
+        快速路径直接在区间内定位引号和操作符，只切出字段名和值：字段必须是已知字段，
+        否则交给 CONDITION_PATTERN 处理（统一产生无法解析/未知字段的警告）。
         
         Returns:
             (sql_clause, params) 或 (None, []) 如果解析失败
         """
-        # 移除括号
-        condition = condition.strip()
-        if condition.startswith('(') and condition.endswith(')'):
-            condition = condition[1:-1].strip()
-        
-        match = cls.CONDITION_PATTERN.match(condition)
+        quote = query.find('"', start, end)
+        close = query.find('"', quote + 1, end) if quote > start else -1
+        if close > 0:
+            # 跳过操作符前后的空白，只移动下标
+            op_end = quote
+            while op_end > start and query[op_end - 1].isspace():
+                op_end -= 1
+            if query.startswith('==', op_end - 2, op_end) or query.startswith('!=', op_end - 2, op_end):
+                op_start = op_end - 2
+            elif op_end > start and query[op_end - 1] == '=':
+                op_start = op_end - 1
+            else:
+                op_start = -1
+            if op_start > start:
+                field_end = op_start
+                while field_end > start and query[field_end - 1].isspace():
+                    field_end -= 1
+                builder = _CLAUSE_BUILDERS.get((query[start:field_end].lower(), query[op_start:op_end]))
+                if builder is not None:
+                    return builder(query[quote + 1:close])
+        
+        match = cls.CONDITION_PATTERN.match(query, start, end)
         if not match:
-            logger.warning(f"无法解析条件: {condition}")
+            logger.warning(f"无法解析条件: {query[start:end]}")
             return None, []
         
         field, operator, value = match.groups()
         field = field.lower()
         
-        # 验证字段
-        if field not in FIELD_MAPPING:
+        # 查表得到 (字段, 操作符) 对应的构建函数，查不到即未知字段
+        builder = _CLAUSE_BUILDERS.get((field, operator))
+        if builder is None:
             logger.warning(f"未知字段: {field}")
             return None, []
         
-        db_field = FIELD_MAPPING[field]
-        is_array = field in ARRAY_FIELDS
-        
-        # 根据操作符生成 SQL
-        if operator == '=':
-            # 模糊匹配
-            return cls._build_like_condition(db_field, value, is_array)
-        elif operator == '==':
-            # 精确匹配
-            return cls._build_exact_condition(db_field, value, is_array)
-        elif operator == '!=':
-            # 不等于
-            return cls._build_not_equal_condition(db_field, value, is_array)
-        
-        return None, []
+        return builder(value)
+
+
+# ==================== 条件构建表 ====================
+# 每个 (前端字段, 操作符) 在模块加载时生成一个构建函数，SQL 文本预先拼好，
+# 解析时只需一次字典查找，不再逐条件判断数组字段/状态码/操作符。
+
+ClauseBuilder = Callable[[str], Tuple[str, List[Any]]]
+
+
+def _like_builder(field: str, is_array: bool) -> ClauseBuilder:
+    """构建模糊匹配条件（=）"""
+    if is_array:
+        # 数组字段：先用拼接文本的 trgm 索引粗筛（asset_tech_text，见迁移 0009），
+        # 再逐元素校验，避免跨元素边界的误匹配
+        sql = (
+            f"(asset_tech_text(t.{field}) ILIKE %s "
+            f"AND EXISTS (SELECT 1 FROM unnest(t.{field}) AS elem WHERE elem ILIKE %s))"
+        )
+        
+        def build_array(value: str) -> Tuple[str, List[Any]]:
+            pattern = f"%{value}%"
+            return sql, [pattern, pattern]
+        return build_array
     
-    @classmethod
-    def _build_like_condition(cls, field: str, value: str, is_array: bool) -> Tuple[str, List[Any]]:
-        """构建模糊匹配条件"""
-        if is_array:
-            # 数组字段：检查数组中是否有元素包含该值（从原表 t 获取）
-            return f"EXISTS (SELECT 1 FROM unnest(t.{field}) AS elem WHERE elem ILIKE %s)", [f"%{value}%"]
-        elif field == 'status_code':
-            # 状态码是整数，模糊匹配转为精确匹配
-            try:
-                return f"v.{field} = %s", [int(value)]
-            except ValueError:
-                return f"v.{field}::text ILIKE %s", [f"%{value}%"]
-        else:
-            return f"v.{field} ILIKE %s", [f"%{value}%"]
+    like_sql = f"t.{field} ILIKE %s"
     
-    @classmethod
-    def _build_exact_condition(cls, field: str, value: str, is_array: bool) -> Tuple[str, List[Any]]:
-        """构建精确匹配条件"""
-        if is_array:
-            # 数组字段：检查数组中是否包含该精确值（从原表 t 获取）
-            return f"%s = ANY(t.{field})", [value]
-        elif field == 'status_code':
-            # 状态码是整数
-            try:
-                return f"v.{field} = %s", [int(value)]
-            except ValueError:
-                return f"v.{field}::text = %s", [value]
-        else:
-            return f"v.{field} = %s", [value]
+    if field == 'host':
+        # 后缀匹配：反转后变为前缀匹配，使用 reverse(lower(host)) 索引（见迁移 0011）
+        suffix_sql = f"reverse(lower(t.{field})) LIKE %s"
+        
+        def build_host(value: str) -> Tuple[str, List[Any]]:
+            if value.startswith('*.'):
+                return suffix_sql, [_escape_like(value[1:].lower()[::-1]) + '%']
+            return like_sql, [f"%{value}%"]
+        return build_host
     
-    @classmethod
-    def _build_not_equal_condition(cls, field: str, value: str, is_array: bool) -> Tuple[str, List[Any]]:
-        """构建不等于条件"""
-        if is_array:
-            # 数组字段：检查数组中不包含该值（从原表 t 获取）
-            return f"NOT (%s = ANY(t.{field}))", [value]
-        elif field == 'status_code':
-            try:
-                return f"(v.{field} IS NULL OR v.{field} != %s)", [int(value)]
-            except ValueError:
-                return f"(v.{field} IS NULL OR v.{field}::text != %s)", [value]
-        else:
-            return f"(v.{field} IS NULL OR v.{field} != %s)", [value]
+    if field == 'status_code':
+        # 状态码是整数，模糊匹配转为精确匹配（支持逗号分隔多值）
+        text_sql = f"t.{field}::text ILIKE %s"
+        
+        def build_status(value: str) -> Tuple[str, List[Any]]:
+            codes = _parse_status(value)
+            if codes is not None:
+                return _status_condition(field, codes)
+            return text_sql, [f"%{value}%"]
+        return build_status
+    
+    return lambda value: (like_sql, [f"%{value}%"])
+
+
+def _exact_builder(field: str, is_array: bool) -> ClauseBuilder:
+    """构建精确匹配条件（==）"""
+    if is_array:
+        # 数组字段：@> 可以使用 tech 上的 GIN 索引（= ANY 不能）
+        sql = f"t.{field} @> ARRAY[%s]::varchar[]"
+        return lambda value: (sql, [value])
+    
+    if field == 'status_code':
+        # 状态码是整数（支持逗号分隔多值）
+        text_sql = f"t.{field}::text = %s"
+        
+        def build_status(value: str) -> Tuple[str, List[Any]]:
+            codes = _parse_status(value)
+            if codes is not None:
+                return _status_condition(field, codes)
+            return text_sql, [value]
+        return build_status
+    
+    sql = f"t.{field} = %s"
+    return lambda value: (sql, [value])
+
+
+def _not_equal_builder(field: str, is_array: bool) -> ClauseBuilder:
+    """构建不等于条件（!=）"""
+    if is_array:
+        # 数组字段：检查数组中不包含该值
+        sql = f"NOT (t.{field} @> ARRAY[%s]::varchar[])"
+        return lambda value: (sql, [value])
+    
+    if field == 'status_code':
+        text_sql = f"(t.{field} IS NULL OR t.{field}::text != %s)"
+        
+        def build_status(value: str) -> Tuple[str, List[Any]]:
+            codes = _parse_status(value)
+            if codes is not None:
+                return _status_condition(field, codes, negate=True)
+            return text_sql, [value]
+        return build_status
+    
+    sql = f"(t.{field} IS NULL OR t.{field} != %s)"
+    return lambda value: (sql, [value])
+
+
+_CLAUSE_BUILDERS: Dict[Tuple[str, str], ClauseBuilder] = {
+    (name, operator): factory(db_field, name in ARRAY_FIELDS)
+    for name, db_field in FIELD_MAPPING.items()
+    for operator, factory in (
+        ('=', _like_builder),
+        ('==', _exact_builder),
+        ('!=', _not_equal_builder),
+    )
+}
+
+
+@lru_cache(maxsize=1024)
+def _parse_query_cached(query: str) -> Tuple[str, Tuple[Any, ...]]:
+    """按原始查询字符串缓存 SearchQueryParser 的解析结果（参数以元组保存，避免被调用方修改）"""
+    clause, params = SearchQueryParser._parse_uncached(query)
+    return clause, tuple(params)
 
 
 AssetType = Literal['website', 'endpoint']
@@ -333,7 +657,9 @@ class AssetSearchService:
         self, 
         query: str, 
         asset_type: AssetType = 'website',
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        fields: Optional[Iterable[str]] = None
     ) -> List[Dict[str, Any]]:
         """
         搜索资产
@@ -342,44 +668,104 @@ class AssetSearchService:
             query: 搜索查询字符串
             asset_type: 资产类型 ('website' 或 'endpoint')
             limit: 最大返回数量（可选）
+            after: 游标分页位置，上一页最后一行的 (created_at, id)（可选，需同时传 limit）；
+                只返回排在该行之后的结果，翻页开销与页码无关
+            fields: 只查询这些列（可选，见 _select_columns）；列表页不展示
+                response_body / response_headers 时可省去这些大字段的读取和传输
         
         Returns:
             List[Dict]: 搜索结果列表
+        
+        Raises:
+            ValueError: 资产类型无效或 fields 包含不支持的字段
         """
+        columns = _select_columns(asset_type, fields)
         where_clause, params = SearchQueryParser.parse(query)
         
-        # 根据资产类型选择视图、原表和字段
-        view_name = VIEW_MAPPING.get(asset_type, 'asset_search_view')
-        table_name = TABLE_MAPPING.get(asset_type, 'website')
-        select_fields = ENDPOINT_SELECT_FIELDS if asset_type == 'endpoint' else WEBSITE_SELECT_FIELDS
-        
-        # JOIN 原表获取数组字段（tech, matched_gf_patterns）
-        sql = f"""
-            SELECT {select_fields}
-            FROM {view_name} v
-            JOIN {table_name} t ON v.id = t.id
-            WHERE {where_clause}
-            ORDER BY v.created_at DESC
+        if after is not None and limit is not None and limit > 0:
+            sql = _build_sql('search_after', asset_type, where_clause, columns)
+            params = [*params, after[0], after[1], int(limit)]
+        elif limit is not None and limit > 0:
+            sql = _build_sql('search_limit', asset_type, where_clause, columns)
+            params = [*params, int(limit)]
+        else:
+            sql = _build_sql('search', asset_type, where_clause, columns)
+        
+        try:
+            to_dict = _row_factory(columns)
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                # 直接迭代游标，不再额外构建 fetchall() 的元组列表
+                return [to_dict(row) for row in cursor]
+        except Exception as e:
+            logger.error(f"搜索查询失败: {e}, SQL: {sql}, params: {params}")
+            raise
+    
+    def search_with_count(
+        self,
+        query: str,
+        asset_type: AssetType = 'website',
+        limit: int = 10,
+        offset: int = 0,
+        fields: Optional[Iterable[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
         """
+        分页搜索资产，并在同一条 SQL 中返回总数
+        
+        通过 COUNT(*) OVER() 窗口函数在取一页数据的同时得到过滤后的总行数，
+        避免 count() + search() 两次执行相同的 WHERE 条件。
+        结果按查询缓存（见 _cached_search），重复查询不再访问数据库。
+        
+        Args:
+            query: 搜索查询字符串
+            asset_type: 资产类型 ('website' 或 'endpoint')
+            limit: 每页数量
+            offset: 偏移量
+            fields: 只查询这些列（可选，见 search）
+        
+        Returns:
+            (results, total): 当前页结果列表和结果总数
         
-        # 添加 LIMIT
-        if limit is not None and limit > 0:
-            sql += f" LIMIT {int(limit)}"
+        Raises:
+            ValueError: 资产类型无效或 fields 包含不支持的字段
+        """
+        columns = _select_columns(asset_type, fields)
+        return _cached_search(
+            ('search_with_count', asset_type, query.strip(), int(limit), int(offset), columns),
+            lambda: self._search_with_count(query, asset_type, int(limit), int(offset), columns),
+        )
+    
+    def _search_with_count(
+        self,
+        query: str,
+        asset_type: AssetType,
+        limit: int,
+        offset: int,
+        columns: Tuple[str, ...]
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """search_with_count 的数据库查询部分（不经过缓存）"""
+        where_clause, params = SearchQueryParser.parse(query)
+        sql = _build_sql('search_with_count', asset_type, where_clause, columns)
         
         try:
             with connection.cursor() as cursor:
-                cursor.execute(sql, params)
-                columns = [col[0] for col in cursor.description]
-                results = []
-                
-                for row in cursor.fetchall():
-                    result = dict(zip(columns, row))
-                    results.append(result)
-                
-                return results
+                cursor.execute(sql, [*params, limit, offset])
+                rows = cursor.fetchall()
         except Exception as e:
             logger.error(f"搜索查询失败: {e}, SQL: {sql}, params: {params}")
             raise
+        
+        if rows:
+            total = rows[0][-1]
+        elif offset > 0:
+            # 页码超出范围时窗口函数没有行可以携带总数，单独统计
+            total = self._count(query, asset_type, statement_timeout_ms=300000)
+        else:
+            total = 0
+        
+        # 最后一列是 _total，行转换函数只取前面的列
+        to_dict = _row_factory(columns)
+        return [to_dict(row) for row in rows], total
     
     def count(self, query: str, asset_type: AssetType = 'website', statement_timeout_ms: int = 300000) -> int:
         """
@@ -391,16 +777,17 @@ class AssetSearchService:
             statement_timeout_ms: SQL 语句超时时间（毫秒），默认 5 分钟
         
         Returns:
-            int: 结果总数
+            int: 结果总数（按查询缓存）
         """
+        return _cached_search(
+            ('count', asset_type, query.strip()),
+            lambda: self._count(query, asset_type, statement_timeout_ms),
+        )
+    
+    def _count(self, query: str, asset_type: AssetType, statement_timeout_ms: int) -> int:
+        """count 的数据库查询部分（不经过缓存）"""
         where_clause, params = SearchQueryParser.parse(query)
-        
-        # 根据资产类型选择视图和原表
-        view_name = VIEW_MAPPING.get(asset_type, 'asset_search_view')
-        table_name = TABLE_MAPPING.get(asset_type, 'website')
-        
-        # JOIN 原表以支持数组字段查询
-        sql = f"SELECT COUNT(*) FROM {view_name} v JOIN {table_name} t ON v.id = t.id WHERE {where_clause}"
+        sql = _build_sql('count', asset_type, where_clause)
         
         try:
             with connection.cursor() as cursor:
@@ -412,66 +799,62 @@ class AssetSearchService:
             logger.error(f"统计查询失败: {e}")
             raise
     
-    def search_iter(
-        self, 
-        query: str, 
-        asset_type: AssetType = 'website',
-        batch_size: int = 1000,
-        statement_timeout_ms: int = 300000
-    ) -> Iterator[Dict[str, Any]]:
+    def exists(self, query: str, asset_type: AssetType = 'website') -> bool:
         """
-        流式搜索资产（使用分批查询，内存友好）
+        是否存在匹配的资产（不经过缓存，找到第一行即返回）
+        
+        导出前的空结果检查使用：缓存的 count 可能落后于最新写入。
         
         Args:
             query: 搜索查询字符串
             asset_type: 资产类型 ('website' 或 'endpoint')
-            batch_size: 每批获取的数量
-            statement_timeout_ms: SQL 语句超时时间（毫秒），默认 5 分钟
         
-        Yields:
-            Dict: 单条搜索结果
+        Returns:
+            bool: 是否有结果
         """
         where_clause, params = SearchQueryParser.parse(query)
+        sql = _build_sql('exists', asset_type, where_clause)
+        
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                return cursor.fetchone()[0]
+        except Exception as e:
+            logger.error(f"存在性查询失败: {e}")
+            raise
+    
+    def stream_csv_export(
+        self,
+        query: str,
+        asset_type: AssetType,
+        out_file: BinaryIO,
+        statement_timeout_ms: int = 300000
+    ) -> None:
+        """
+        使用 COPY ... TO STDOUT 把搜索结果以 CSV 直接写入文件对象（含表头，不含 BOM）
         
-        # 根据资产类型选择视图、原表和字段
-        view_name = VIEW_MAPPING.get(asset_type, 'asset_search_view')
-        table_name = TABLE_MAPPING.get(asset_type, 'website')
-        select_fields = ENDPOINT_SELECT_FIELDS if asset_type == 'endpoint' else WEBSITE_SELECT_FIELDS
+        CSV 由 PostgreSQL 生成并按块写出，Python 端不逐行构建 dict，
+        也不经过 csv.writer 序列化。列与格式见 _CSV_EXPORT_COLUMNS。
         
-        # 使用 OFFSET/LIMIT 分批查询（Django 不支持命名游标）
-        offset = 0
+        Args:
+            query: 搜索查询字符串
+            asset_type: 资产类型 ('website' 或 'endpoint')
+            out_file: 二进制可写文件对象
+            statement_timeout_ms: SQL 语句超时时间（毫秒），默认 5 分钟
+        """
+        where_clause, params = SearchQueryParser.parse(query)
+        sql = _build_csv_export_sql(asset_type, where_clause)
+        params = [timezone.get_current_timezone_name(), *params]
         
         try:
-            while True:
-                # JOIN 原表获取数组字段
-                sql = f"""
-                    SELECT {select_fields}
-                    FROM {view_name} v
-                    JOIN {table_name} t ON v.id = t.id
-                    WHERE {where_clause}
-                    ORDER BY v.created_at DESC
-                    LIMIT {batch_size} OFFSET {offset}
-                """
-                
+            with transaction.atomic():
                 with connection.cursor() as cursor:
-                    # 为导出设置更长的超时时间（仅影响当前会话）
                     cursor.execute(f"SET LOCAL statement_timeout = {statement_timeout_ms}")
-                    cursor.execute(sql, params)
-                    columns = [col[0] for col in cursor.description]
-                    rows = cursor.fetchall()
-                
-                if not rows:
-                    break
-                
-                for row in rows:
-                    yield dict(zip(columns, row))
-                
-                # 如果返回的行数少于 batch_size，说明已经是最后一批
-                if len(rows) < batch_size:
-                    break
-                
-                offset += batch_size
-                
+                    copy_query = cursor.mogrify(sql, params).decode()
+                    cursor.copy_expert(
+                        f"COPY ({copy_query}) TO STDOUT WITH (FORMAT csv, HEADER)",
+                        out_file
+                    )
         except Exception as e:
-            logger.error(f"流式搜索查询失败: {e}, SQL: {sql}, params: {params}")
+            logger.error(f"CSV 导出查询失败: {e}, SQL: {sql}, params: {params}")
             raise
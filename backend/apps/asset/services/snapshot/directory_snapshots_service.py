@@ -1,21 +1,36 @@
 """Directory Snapshots Service - 业务逻辑层"""
 
 import logging
+from functools import lru_cache
 from typing import List, Iterator
 
 from apps.asset.repositories.snapshot import DjangoDirectorySnapshotRepository
 from apps.asset.services.asset import DirectoryService
 from apps.asset.dtos.snapshot import DirectorySnapshotDTO
+from apps.common.utils.filter_utils import apply_filters
+from apps.asset.services.snapshot.scan_guard import scan_exists
 
 logger = logging.getLogger(__name__)
 
 
+# Repository / 资产 Service 都是无状态的包装，进程内共享一个实例，
+# 视图每次请求构造本服务时不再重复创建
+@lru_cache(maxsize=1)
+def _get_snapshot_repo() -> DjangoDirectorySnapshotRepository:
+    return DjangoDirectorySnapshotRepository()
+
+
+@lru_cache(maxsize=1)
+def _get_asset_service() -> DirectoryService:
+    return DirectoryService()
+
+
 class DirectorySnapshotsService:
     """目录快照服务 - 统一管理快照和资产同步"""
     
     def __init__(self):
-        self.snapshot_repo = DjangoDirectorySnapshotRepository()
-        self.asset_service = DirectoryService()
+        self.snapshot_repo = _get_snapshot_repo()
+        self.asset_service = _get_asset_service()
     
     def save_and_sync(self, items: List[DirectorySnapshotDTO]) -> None:
         """
@@ -36,8 +51,7 @@ class DirectorySnapshotsService:
         
         # 检查 Scan 是否仍存在（防止删除后竞态写入）
         scan_id = items[0].scan_id
-        from apps.scan.repositories import DjangoScanRepository
-        if not DjangoScanRepository().exists(scan_id):
+        if not scan_exists(scan_id):
             logger.warning("Scan 已删除，跳过目录快照保存 - scan_id=%s, 数量=%d", scan_id, len(items))
             return
         
@@ -75,8 +89,6 @@ class DirectorySnapshotsService:
     }
     
     def get_by_scan(self, scan_id: int, filter_query: str = None):
-        from apps.common.utils.filter_utils import apply_filters
-        
         queryset = self.snapshot_repo.get_by_scan(scan_id)
         if filter_query:
             queryset = apply_filters(queryset, filter_query, self.FILTER_FIELD_MAPPING)
@@ -84,8 +96,6 @@ class DirectorySnapshotsService:
 
     def get_all(self, filter_query: str = None):
         """获取所有目录快照"""
-        from apps.common.utils.filter_utils import apply_filters
-        
         queryset = self.snapshot_repo.get_all()
         if filter_query:
             queryset = apply_filters(queryset, filter_query, self.FILTER_FIELD_MAPPING)
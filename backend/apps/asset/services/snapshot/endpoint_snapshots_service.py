@@ -1,21 +1,36 @@
 """Endpoint Snapshots Service - 业务逻辑层"""
 
 import logging
+from functools import lru_cache
 from typing import List, Iterator
 
 from apps.asset.repositories.snapshot import DjangoEndpointSnapshotRepository
 from apps.asset.services.asset import EndpointService
 from apps.asset.dtos.snapshot import EndpointSnapshotDTO
+from apps.common.utils.filter_utils import apply_filters
+from apps.asset.services.snapshot.scan_guard import scan_exists
 
 logger = logging.getLogger(__name__)
 
 
+# Repository / 资产 Service 都是无状态的包装，进程内共享一个实例，
+# 视图每次请求构造本服务时不再重复创建
+@lru_cache(maxsize=1)
+def _get_snapshot_repo() -> DjangoEndpointSnapshotRepository:
+    return DjangoEndpointSnapshotRepository()
+
+
+@lru_cache(maxsize=1)
+def _get_asset_service() -> EndpointService:
+    return EndpointService()
+
+
 class EndpointSnapshotsService:
     """端点快照服务 - 统一管理快照和资产同步"""
     
     def __init__(self):
-        self.snapshot_repo = DjangoEndpointSnapshotRepository()
-        self.asset_service = EndpointService()
+        self.snapshot_repo = _get_snapshot_repo()
+        self.asset_service = _get_asset_service()
     
     def save_and_sync(self, items: List[EndpointSnapshotDTO]) -> None:
         """
@@ -37,8 +52,7 @@ class EndpointSnapshotsService:
         
         # 检查 Scan 是否仍存在（防止删除后竞态写入）
         scan_id = items[0].scan_id
-        from apps.scan.repositories import DjangoScanRepository
-        if not DjangoScanRepository().exists(scan_id):
+        if not scan_exists(scan_id):
             logger.warning("Scan 已删除，跳过端点快照保存 - scan_id=%s, 数量=%d", scan_id, len(items))
             return
         
@@ -52,7 +66,8 @@ class EndpointSnapshotsService:
             # 步骤 2: 转换为资产 DTO 并保存到资产表
             # 使用 upsert：新记录插入，已存在的记录更新
             logger.debug("步骤 2: 同步到资产表（通过 Service 层）")
-            asset_items = [item.to_asset_dto() for item in items]
+            # 惰性迭代器：资产 DTO 在写入时逐个生成，不额外构建完整列表
+            asset_items = EndpointSnapshotDTO.bulk_to_asset_dto(items)
             
             self.asset_service.bulk_upsert(asset_items)
             
@@ -78,8 +93,6 @@ class EndpointSnapshotsService:
     }
     
     def get_by_scan(self, scan_id: int, filter_query: str = None):
-        from apps.common.utils.filter_utils import apply_filters
-        
         queryset = self.snapshot_repo.get_by_scan(scan_id)
         if filter_query:
             queryset = apply_filters(queryset, filter_query, self.FILTER_FIELD_MAPPING)
@@ -87,8 +100,6 @@ class EndpointSnapshotsService:
 
     def get_all(self, filter_query: str = None):
         """获取所有端点快照"""
-        from apps.common.utils.filter_utils import apply_filters
-        
         queryset = self.snapshot_repo.get_all()
         if filter_query:
             queryset = apply_filters(queryset, filter_query, self.FILTER_FIELD_MAPPING)
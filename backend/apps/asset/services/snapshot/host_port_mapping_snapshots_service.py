@@ -1,21 +1,35 @@
 """HostPortMapping Snapshots Service - 业务逻辑层"""
 
 import logging
-from typing import List, Iterator
+from functools import lru_cache
+from typing import BinaryIO, List, Iterator
 
 from apps.asset.repositories.snapshot import DjangoHostPortMappingSnapshotRepository
 from apps.asset.services.asset import HostPortMappingService
 from apps.asset.dtos.snapshot import HostPortMappingSnapshotDTO
+from apps.asset.services.snapshot.scan_guard import scan_exists
 
 logger = logging.getLogger(__name__)
 
 
+# Repository / 资产 Service 都是无状态的包装，进程内共享一个实例，
+# 视图每次请求构造本服务时不再重复创建
+@lru_cache(maxsize=1)
+def _get_snapshot_repo() -> DjangoHostPortMappingSnapshotRepository:
+    return DjangoHostPortMappingSnapshotRepository()
+
+
+@lru_cache(maxsize=1)
+def _get_asset_service() -> HostPortMappingService:
+    return HostPortMappingService()
+
+
 class HostPortMappingSnapshotsService:
     """HostPortMapping Snapshots Service - 统一管理快照和资产同步"""
     
     def __init__(self):
-        self.snapshot_repo = DjangoHostPortMappingSnapshotRepository()
-        self.asset_service = HostPortMappingService()
+        self.snapshot_repo = _get_snapshot_repo()
+        self.asset_service = _get_asset_service()
     
     def save_and_sync(self, items: List[HostPortMappingSnapshotDTO]) -> None:
         """
@@ -39,8 +53,7 @@ class HostPortMappingSnapshotsService:
         
         # 检查 Scan 是否仍存在（防止删除后竞态写入）
         scan_id = items[0].scan_id
-        from apps.scan.repositories import DjangoScanRepository
-        if not DjangoScanRepository().exists(scan_id):
+        if not scan_exists(scan_id):
             logger.warning("Scan 已删除，跳过主机端口快照保存 - scan_id=%s, 数量=%d", scan_id, len(items))
             return
         
@@ -54,7 +67,8 @@ class HostPortMappingSnapshotsService:
             # - 新记录：插入资产表
             # - 已存在的记录：自动跳过
             logger.debug("步骤 2: 同步到资产表（通过 Service 层）")
-            asset_items = [item.to_asset_dto() for item in items]
+            # 惰性迭代器：资产 DTO 在写入时逐个生成，不额外构建完整列表
+            asset_items = HostPortMappingSnapshotDTO.bulk_to_asset_dto(items)
             
             self.asset_service.bulk_create_ignore_conflicts(asset_items)
             
@@ -80,14 +94,12 @@ class HostPortMappingSnapshotsService:
         """流式获取某次扫描下的所有唯一 IP 地址。"""
         return self.snapshot_repo.get_ips_for_export(scan_id=scan_id, batch_size=batch_size)
 
-    def iter_raw_data_for_csv_export(self, scan_id: int) -> Iterator[dict]:
+    def stream_csv_export(self, scan_id: int, out_file: BinaryIO) -> None:
         """
-        流式获取原始数据用于 CSV 导出
+        由数据库 COPY 直接生成 CSV 并写入 out_file
         
         Args:
             scan_id: 扫描 ID
-        
-        Yields:
-            原始数据字典 {ip, host, port, created_at}
+            out_file: 二进制可写文件对象
         """
-        return self.snapshot_repo.iter_raw_data_for_export(scan_id=scan_id)
+        self.snapshot_repo.stream_csv_export(scan_id=scan_id, out_file=out_file)
@@ -0,0 +1,33 @@
+"""快照写入前的 Scan 存在性检查"""
+
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from apps.scan.repositories import DjangoScanRepository
+
+# 进程内共享的 DjangoScanRepository 实例（首次使用时创建）
+_scan_repo: Optional['DjangoScanRepository'] = None
+
+
+def _get_scan_repo() -> 'DjangoScanRepository':
+    """
+    获取 Scan Repository 单例
+    
+    延迟导入 apps.scan，避免 asset 服务模块加载时引入 scan 应用；
+    导入和实例化只在首次调用时发生，之后每批快照直接复用。
+    """
+    global _scan_repo
+    if _scan_repo is None:
+        from apps.scan.repositories import DjangoScanRepository
+        _scan_repo = DjangoScanRepository()
+    return _scan_repo
+
+
+def scan_exists(scan_id: int) -> bool:
+    """
+    检查 Scan 是否仍存在（防止删除后竞态写入）
+    
+    每批都直接查询数据库，不做缓存：删除可能发生在其他进程（如 API 服务），
+    进程内缓存无法及时失效，会削弱这项检查。
+    """
+    return _get_scan_repo().exists(scan_id)
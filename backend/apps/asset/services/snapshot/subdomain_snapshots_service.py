@@ -1,17 +1,27 @@
 import logging
+from functools import lru_cache
 from typing import List, Iterator
 
 from apps.asset.dtos import SubdomainSnapshotDTO
 from apps.asset.repositories import DjangoSubdomainSnapshotRepository
+from apps.common.utils.filter_utils import apply_filters
+from apps.asset.services.snapshot.scan_guard import scan_exists
 
 logger = logging.getLogger(__name__)
 
 
+# Repository 是无状态的包装，进程内共享一个实例，
+# 视图每次请求构造本服务时不再重复创建
+@lru_cache(maxsize=1)
+def _get_snapshot_repo() -> DjangoSubdomainSnapshotRepository:
+    return DjangoSubdomainSnapshotRepository()
+
+
 class SubdomainSnapshotsService:
     """子域名快照服务 - 负责子域名快照数据的业务逻辑"""
     
     def __init__(self):
-        self.subdomain_snapshot_repo = DjangoSubdomainSnapshotRepository()
+        self.subdomain_snapshot_repo = _get_snapshot_repo()
     
     def save_and_sync(self, items: List[SubdomainSnapshotDTO]) -> None:
         """
@@ -35,8 +45,7 @@ class SubdomainSnapshotsService:
         
         # 检查 Scan 是否仍存在（防止删除后竞态写入）
         scan_id = items[0].scan_id
-        from apps.scan.repositories import DjangoScanRepository
-        if not DjangoScanRepository().exists(scan_id):
+        if not scan_exists(scan_id):
             logger.warning("Scan 已删除，跳过快照保存 - scan_id=%s, 数量=%d", scan_id, len(items))
             return
         
@@ -72,8 +81,6 @@ class SubdomainSnapshotsService:
     }
     
     def get_by_scan(self, scan_id: int, filter_query: str = None):
-        from apps.common.utils.filter_utils import apply_filters
-        
         queryset = self.subdomain_snapshot_repo.get_by_scan(scan_id)
         if filter_query:
             queryset = apply_filters(queryset, filter_query, self.FILTER_FIELD_MAPPING)
@@ -81,8 +88,6 @@ class SubdomainSnapshotsService:
 
     def get_all(self, filter_query: str = None):
         """获取所有子域名快照"""
-        from apps.common.utils.filter_utils import apply_filters
-        
         queryset = self.subdomain_snapshot_repo.get_all()
         if filter_query:
             queryset = apply_filters(queryset, filter_query, self.FILTER_FIELD_MAPPING)
@@ -1,15 +1,30 @@
 """Vulnerability Snapshots Service - 业务逻辑层"""
 
 import logging
+from functools import lru_cache
 from typing import List, Iterator
 
 from apps.asset.repositories.snapshot import DjangoVulnerabilitySnapshotRepository
 from apps.asset.services.asset.vulnerability_service import VulnerabilityService
 from apps.asset.dtos.snapshot import VulnerabilitySnapshotDTO
+from apps.common.utils.filter_utils import apply_filters
+from apps.asset.services.snapshot.scan_guard import scan_exists
 
 logger = logging.getLogger(__name__)
 
 
+# Repository / 资产 Service 都是无状态的包装，进程内共享一个实例，
+# 视图每次请求构造本服务时不再重复创建
+@lru_cache(maxsize=1)
+def _get_snapshot_repo() -> DjangoVulnerabilitySnapshotRepository:
+    return DjangoVulnerabilitySnapshotRepository()
+
+
+@lru_cache(maxsize=1)
+def _get_asset_service() -> VulnerabilityService:
+    return VulnerabilityService()
+
+
 class VulnerabilitySnapshotsService:
     """漏洞快照服务 - 统一管理快照和资产同步。
 
@@ -19,8 +34,8 @@ class VulnerabilitySnapshotsService:
     """
 
     def __init__(self):
-        self.snapshot_repo = DjangoVulnerabilitySnapshotRepository()
-        self.asset_service = VulnerabilityService()
+        self.snapshot_repo = _get_snapshot_repo()
+        self.asset_service = _get_asset_service()
 
     def save_and_sync(self, items: List[VulnerabilitySnapshotDTO]) -> None:
         """保存漏洞快照并同步到漏洞资产表。"""
@@ -29,8 +44,7 @@ class VulnerabilitySnapshotsService:
         
         # 检查 Scan 是否仍存在（防止删除后竞态写入）
         scan_id = items[0].scan_id
-        from apps.scan.repositories import DjangoScanRepository
-        if not DjangoScanRepository().exists(scan_id):
+        if not scan_exists(scan_id):
             logger.warning("Scan 已删除，跳过漏洞快照保存 - scan_id=%s, 数量=%d", scan_id, len(items))
             return
         
@@ -76,8 +90,6 @@ class VulnerabilitySnapshotsService:
 
     def get_by_scan(self, scan_id: int, filter_query: str = None):
         """按扫描任务获取所有漏洞快照。"""
-        from apps.common.utils.filter_utils import apply_filters
-        
         queryset = self.snapshot_repo.get_by_scan(scan_id)
         if filter_query:
             queryset = apply_filters(queryset, filter_query, self.FILTER_FIELD_MAPPING)
@@ -85,8 +97,6 @@ class VulnerabilitySnapshotsService:
 
     def get_all(self, filter_query: str = None):
         """获取所有漏洞快照"""
-        from apps.common.utils.filter_utils import apply_filters
-        
         queryset = self.snapshot_repo.get_all()
         if filter_query:
             queryset = apply_filters(queryset, filter_query, self.FILTER_FIELD_MAPPING)
@@ -1,21 +1,36 @@
 """Website Snapshots Service - 业务逻辑层"""
 
 import logging
-from typing import List, Iterator
+from functools import lru_cache
+from typing import BinaryIO, List, Iterator
 
 from apps.asset.repositories.snapshot import DjangoWebsiteSnapshotRepository
 from apps.asset.services.asset import WebSiteService
 from apps.asset.dtos.snapshot import WebsiteSnapshotDTO
+from apps.common.utils.filter_utils import apply_filters
+from apps.asset.services.snapshot.scan_guard import scan_exists
 
 logger = logging.getLogger(__name__)
 
 
+# Repository / 资产 Service 都是无状态的包装，进程内共享一个实例，
+# 视图每次请求构造本服务时不再重复创建
+@lru_cache(maxsize=1)
+def _get_snapshot_repo() -> DjangoWebsiteSnapshotRepository:
+    return DjangoWebsiteSnapshotRepository()
+
+
+@lru_cache(maxsize=1)
+def _get_asset_service() -> WebSiteService:
+    return WebSiteService()
+
+
 class WebsiteSnapshotsService:
     """网站快照服务 - 统一管理快照和资产同步"""
     
     def __init__(self):
-        self.snapshot_repo = DjangoWebsiteSnapshotRepository()
-        self.asset_service = WebSiteService()
+        self.snapshot_repo = _get_snapshot_repo()
+        self.asset_service = _get_asset_service()
     
     def save_and_sync(self, items: List[WebsiteSnapshotDTO]) -> None:
         """
@@ -37,8 +52,7 @@ class WebsiteSnapshotsService:
         
         # 检查 Scan 是否仍存在（防止删除后竞态写入）
         scan_id = items[0].scan_id
-        from apps.scan.repositories import DjangoScanRepository
-        if not DjangoScanRepository().exists(scan_id):
+        if not scan_exists(scan_id):
             logger.warning("Scan 已删除，跳过网站快照保存 - scan_id=%s, 数量=%d", scan_id, len(items))
             return
         
@@ -79,8 +93,6 @@ class WebsiteSnapshotsService:
     }
     
     def get_by_scan(self, scan_id: int, filter_query: str = None):
-        from apps.common.utils.filter_utils import apply_filters
-        
         queryset = self.snapshot_repo.get_by_scan(scan_id)
         if filter_query:
             queryset = apply_filters(queryset, filter_query, self.FILTER_FIELD_MAPPING)
@@ -88,8 +100,6 @@ class WebsiteSnapshotsService:
 
     def get_all(self, filter_query: str = None):
         """获取所有网站快照"""
-        from apps.common.utils.filter_utils import apply_filters
-        
         queryset = self.snapshot_repo.get_all()
         if filter_query:
             queryset = apply_filters(queryset, filter_query, self.FILTER_FIELD_MAPPING)
@@ -98,17 +108,15 @@ class WebsiteSnapshotsService:
     def iter_website_urls_by_scan(self, scan_id: int, chunk_size: int = 1000) -> Iterator[str]:
         """流式获取某次扫描下的所有站点 URL（按创建时间倒序）。"""
         queryset = self.snapshot_repo.get_by_scan(scan_id)
-        for snapshot in queryset.iterator(chunk_size=chunk_size):
-            yield snapshot.url
+        for url in queryset.values_list('url', flat=True).iterator(chunk_size=chunk_size):
+            yield url
 
-    def iter_raw_data_for_csv_export(self, scan_id: int) -> Iterator[dict]:
+    def stream_csv_export(self, scan_id: int, out_file: BinaryIO) -> None:
         """
-        流式获取原始数据用于 CSV 导出
+        由数据库 COPY 直接生成 CSV 并写入 out_file
         
         Args:
             scan_id: 扫描 ID
-        
-        Yields:
-            原始数据字典
+            out_file: 二进制可写文件对象
         """
-        return self.snapshot_repo.iter_raw_data_for_export(scan_id=scan_id)
+        self.snapshot_repo.stream_csv_export(scan_id=scan_id, out_file=out_file)
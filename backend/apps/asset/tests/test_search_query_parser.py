@@ -0,0 +1,207 @@
+"""
+SearchQueryParser 单元测试
+
+覆盖资产搜索表达式解析：
+- 操作符：=（模糊）、==（精确）、!=（不等于）
+- 逻辑组合：&&、||、括号分组及优先级
+- 引号内的结构符号、LIKE 通配符转义
+- 无法解析的输入、未知字段
+- 前端字段名到数据库字段的映射
+"""
+
+import pytest
+
+from apps.asset.services.search_service import (
+    FIELD_MAPPING,
+    SearchQueryParser,
+    _escape_like,
+    _parse_status,
+)
+
+
+class TestOperators:
+    """=、==、!= 操作符"""
+
+    def test_like_match(self):
+        clause, params = SearchQueryParser.parse('title="admin"')
+        assert clause == "t.title ILIKE %s"
+        assert params == ["%admin%"]
+
+    def test_exact_match(self):
+        clause, params = SearchQueryParser.parse('title=="Admin Panel"')
+        assert clause == "t.title = %s"
+        assert params == ["Admin Panel"]
+
+    def test_not_equal_includes_null(self):
+        clause, params = SearchQueryParser.parse('title!="test"')
+        assert clause == "(t.title IS NULL OR t.title != %s)"
+        assert params == ["test"]
+
+    def test_whitespace_around_operator(self):
+        assert SearchQueryParser.parse('title  ==  "x"') == SearchQueryParser.parse('title=="x"')
+
+    def test_field_name_case_insensitive(self):
+        assert SearchQueryParser.parse('TITLE="x"') == SearchQueryParser.parse('title="x"')
+
+    def test_host_suffix_match_uses_reversed_prefix(self):
+        clause, params = SearchQueryParser.parse('host="*.Example.com"')
+        assert clause == "reverse(lower(t.host)) LIKE %s"
+        assert params == ["moc.elpmaxe.%"]
+
+    def test_array_field_like(self):
+        clause, params = SearchQueryParser.parse('tech="nginx"')
+        assert "asset_tech_text(t.tech) ILIKE %s" in clause
+        assert "unnest(t.tech)" in clause
+        assert params == ["%nginx%", "%nginx%"]
+
+    def test_array_field_exact(self):
+        clause, params = SearchQueryParser.parse('tech=="nginx"')
+        assert clause == "t.tech @> ARRAY[%s]::varchar[]"
+        assert params == ["nginx"]
+
+    def test_array_field_not_equal(self):
+        clause, params = SearchQueryParser.parse('tech!="nginx"')
+        assert clause == "NOT (t.tech @> ARRAY[%s]::varchar[])"
+        assert params == ["nginx"]
+
+
+class TestStatus:
+    """状态码条件"""
+
+    def test_single_code(self):
+        assert SearchQueryParser.parse('status=="200"') == ("t.status_code = %s", [200])
+        # 整数状态码的模糊匹配转为精确匹配
+        assert SearchQueryParser.parse('status="200"') == ("t.status_code = %s", [200])
+
+    def test_multiple_codes(self):
+        clause, params = SearchQueryParser.parse('status="200, 301,302"')
+        assert clause == "t.status_code = ANY(%s)"
+        assert params == [[200, 301, 302]]
+
+    def test_not_equal_codes(self):
+        clause, params = SearchQueryParser.parse('status!="404"')
+        assert clause == "(t.status_code IS NULL OR NOT (t.status_code = %s))"
+        assert params == [404]
+
+    def test_non_numeric_falls_back_to_text(self):
+        clause, params = SearchQueryParser.parse('status="2xx"')
+        assert clause == "t.status_code::text ILIKE %s"
+        assert params == ["%2xx%"]
+
+    @pytest.mark.parametrize("value", ["", "200,", ",200", "20 0", "abc"])
+    def test_parse_status_rejects_invalid(self, value):
+        assert _parse_status(value) is None
+
+
+class TestLogic:
+    """&&、|| 与括号"""
+
+    def test_and(self):
+        clause, params = SearchQueryParser.parse('host="api" && title="admin"')
+        assert clause == "t.host ILIKE %s AND t.title ILIKE %s"
+        assert params == ["%api%", "%admin%"]
+
+    def test_or(self):
+        clause, params = SearchQueryParser.parse('title="a" || title="b"')
+        assert clause == "(t.title ILIKE %s) OR (t.title ILIKE %s)"
+        assert params == ["%a%", "%b%"]
+
+    def test_and_binds_tighter_than_or(self):
+        clause, params = SearchQueryParser.parse('title="a" || title="b" && url="c"')
+        assert clause == "(t.title ILIKE %s) OR (t.title ILIKE %s AND t.url ILIKE %s)"
+        assert params == ["%a%", "%b%", "%c%"]
+
+    def test_parentheses_group_or(self):
+        clause, params = SearchQueryParser.parse('(title="a" || title="b") && url="c"')
+        assert clause == "((t.title ILIKE %s) OR (t.title ILIKE %s)) AND t.url ILIKE %s"
+        assert params == ["%a%", "%b%", "%c%"]
+
+    def test_nested_parentheses(self):
+        clause, _ = SearchQueryParser.parse('((title="a" || title="b") && url="c") || host="d"')
+        assert clause == (
+            "(((t.title ILIKE %s) OR (t.title ILIKE %s)) AND t.url ILIKE %s) OR (t.host ILIKE %s)"
+        )
+
+    def test_unclosed_parenthesis_closes_at_end(self):
+        assert SearchQueryParser.parse('(title="a" || title="b"') == SearchQueryParser.parse(
+            '(title="a" || title="b")'
+        )
+
+    def test_stray_closing_parenthesis_ignored(self):
+        assert SearchQueryParser.parse('title="a")') == SearchQueryParser.parse('title="a"')
+
+    def test_empty_operands_ignored(self):
+        assert SearchQueryParser.parse('title="a" && && url="b" ||') == (
+            "t.title ILIKE %s AND t.url ILIKE %s",
+            ["%a%", "%b%"],
+        )
+
+
+class TestQuotingAndEscaping:
+    """引号与转义"""
+
+    def test_operators_inside_quotes_are_literal(self):
+        clause, params = SearchQueryParser.parse('title="a && b || (c)"')
+        assert clause == "t.title ILIKE %s"
+        assert params == ["%a && b || (c)%"]
+
+    def test_single_ampersand_and_pipe_in_value(self):
+        clause, params = SearchQueryParser.parse('url=="/a?x=1&y=2|3"')
+        assert clause == "t.url = %s"
+        assert params == ["/a?x=1&y=2|3"]
+
+    def test_values_are_parameters_not_sql(self):
+        clause, params = SearchQueryParser.parse("title==\"x' OR 1=1 --\"")
+        assert clause == "t.title = %s"
+        assert params == ["x' OR 1=1 --"]
+
+    def test_escape_like(self):
+        assert _escape_like(r"50%_a\b") == r"50\%\_a\\b"
+
+    def test_host_suffix_escapes_wildcards(self):
+        _, params = SearchQueryParser.parse('host="*.a_b.com"')
+        assert params == ["moc.b\\_a.%"]
+
+
+class TestInvalidInput:
+    """空输入、裸文本与无法解析的条件"""
+
+    @pytest.mark.parametrize("query", ["", "   "])
+    def test_empty_query_matches_all(self, query):
+        assert SearchQueryParser.parse(query) == ("1=1", [])
+
+    def test_plain_text_searches_host(self):
+        assert SearchQueryParser.parse("  example.com ") == ("t.host ILIKE %s", ["%example.com%"])
+
+    def test_unknown_field_ignored(self):
+        clause, params = SearchQueryParser.parse('foo="x" && title="y"')
+        assert clause == "t.title ILIKE %s"
+        assert params == ["%y%"]
+
+    def test_all_conditions_invalid_matches_all(self):
+        assert SearchQueryParser.parse('foo="x" || bar=="y"') == ("1=1", [])
+
+    def test_unquoted_value_ignored(self):
+        assert SearchQueryParser.parse('title=admin && url="x"') == ("t.url ILIKE %s", ["%x%"])
+
+    def test_returns_fresh_params_list(self):
+        _, params = SearchQueryParser.parse('title="a"')
+        params.append(10)
+        assert SearchQueryParser.parse('title="a"')[1] == ["%a%"]
+
+
+class TestFieldMapping:
+    """前端字段名映射到数据库列"""
+
+    @pytest.mark.parametrize(
+        "field",
+        [name for name in FIELD_MAPPING if name not in ('tech', 'status')],
+    )
+    def test_text_fields_map_to_columns(self, field):
+        clause, _ = SearchQueryParser.parse(f'{field}=="x"')
+        assert clause == f"t.{FIELD_MAPPING[field]} = %s"
+
+    def test_frontend_names_differ_from_columns(self):
+        assert SearchQueryParser.parse('body="x"')[0] == "t.response_body ILIKE %s"
+        assert SearchQueryParser.parse('header="x"')[0] == "t.response_headers ILIKE %s"
+        assert SearchQueryParser.parse('status=="200"')[0] == "t.status_code = %s"
@@ -0,0 +1,43 @@
+"""
+target_asset_stats 触发器测试（需要 PostgreSQL 测试数据库）
+
+新目标首次写入网站/端点时，触发器插入的计数行只包含一个计数列，
+另一列依赖数据库默认值 0（见迁移 0016）。
+"""
+
+import pytest
+
+from apps.asset.models import Endpoint, TargetAssetStats, WebSite
+from apps.targets.models import Target
+
+
+@pytest.fixture
+def target():
+    return Target.objects.create(name='example.com')
+
+
+def _stats(target_id: int) -> tuple:
+    return TargetAssetStats.objects.values_list('website_count', 'endpoint_count').get(target_id=target_id)
+
+
+@pytest.mark.django_db
+class TestTargetAssetStatsTrigger:
+    """触发器维护的目标级资产计数"""
+
+    def test_website_insert_for_new_target(self, target):
+        WebSite.objects.create(target=target, url='https://a.example.com')
+        assert _stats(target.id) == (1, 0)
+
+    def test_endpoint_insert_for_new_target(self, target):
+        Endpoint.objects.create(target=target, url='https://a.example.com/login')
+        assert _stats(target.id) == (0, 1)
+
+    def test_counts_accumulate_and_decrement(self, target):
+        WebSite.objects.bulk_create([
+            WebSite(target=target, url=f'https://{i}.example.com') for i in range(3)
+        ])
+        Endpoint.objects.create(target=target, url='https://a.example.com/login')
+        assert _stats(target.id) == (3, 1)
+
+        WebSite.objects.filter(target=target, url='https://0.example.com').delete()
+        assert _stats(target.id) == (2, 1)
@@ -15,6 +15,7 @@ from ..serializers import (
     SubdomainSnapshotSerializer, WebsiteSnapshotSerializer, DirectorySnapshotSerializer,
     EndpointSnapshotSerializer, VulnerabilitySnapshotSerializer
 )
+from ..search_cache import invalidate_search_cache_on_commit
 from ..services import (
     SubdomainService, WebSiteService, DirectoryService, 
     VulnerabilityService, AssetStatisticsService, EndpointService, HostPortMappingService
@@ -321,8 +322,20 @@ class WebSiteViewSet(viewsets.ModelViewSet):
         filter_query = self.request.query_params.get('filter', None)
         
         if target_pk:
-            return self.service.get_websites_by_target(target_pk, filter_query=filter_query)
-        return self.service.get_all(filter_query=filter_query)
+            queryset = self.service.get_websites_by_target(target_pk, filter_query=filter_query)
+        else:
+            queryset = self.service.get_all(filter_query=filter_query)
+        # ?fields= 稀疏字段集：只查询需要输出的列
+        return self.get_serializer().restrict_queryset(queryset)
+
+    def perform_update(self, serializer):
+        """更新后使搜索缓存失效"""
+        super().perform_update(serializer)
+        invalidate_search_cache_on_commit()
+
+    def perform_destroy(self, instance):
+        """单条删除走 service，同时使搜索缓存失效"""
+        self.service.bulk_delete([instance.pk])
 
     @action(detail=False, methods=['post'], url_path='bulk-create')
     def bulk_create(self, request, **kwargs):
@@ -397,29 +410,15 @@ class WebSiteViewSet(viewsets.ModelViewSet):
         
         CSV 列：url, host, location, title, status_code, content_length, content_type, webserver, tech, response_body, response_headers, vhost, created_at
         """
-        from apps.common.utils import create_csv_export_response, format_datetime, format_list_field
+        from apps.common.utils import create_copy_csv_export_response
         
         target_pk = self.kwargs.get('target_pk')
         if not target_pk:
             raise DRFValidationError('必须在目标下导出')
         
-        data_iterator = self.service.iter_raw_data_for_csv_export(target_id=target_pk)
-        
-        headers = [
-            'url', 'host', 'location', 'title', 'status_code',
-            'content_length', 'content_type', 'webserver', 'tech',
-            'response_body', 'response_headers', 'vhost', 'created_at'
-        ]
-        formatters = {
-            'created_at': format_datetime,
-            'tech': lambda x: format_list_field(x, separator=','),
-        }
-        
-        return create_csv_export_response(
-            data_iterator=data_iterator,
-            headers=headers,
-            filename=f"target-{target_pk}-websites.csv",
-            field_formatters=formatters
+        return create_copy_csv_export_response(
+            lambda out_file: self.service.stream_csv_export(target_id=target_pk, out_file=out_file),
+            filename=f"target-{target_pk}-websites.csv"
         )
 
     @action(detail=False, methods=['post'], url_path='bulk-delete')
@@ -440,8 +439,7 @@ class WebSiteViewSet(viewsets.ModelViewSet):
             )
         
         try:
-            from ..models import WebSite
-            deleted_count, _ = WebSite.objects.filter(id__in=ids).delete()
+            deleted_count = self.service.bulk_delete(ids)
             return success_response(data={'deletedCount': deleted_count})
         except Exception as e:
             logger.exception("批量删除网站失败")
@@ -640,8 +638,20 @@ class EndpointViewSet(viewsets.ModelViewSet):
         filter_query = self.request.query_params.get('filter', None)
         
         if target_pk:
-            return self.service.get_endpoints_by_target(target_pk, filter_query=filter_query)
-        return self.service.get_all(filter_query=filter_query)
+            queryset = self.service.get_endpoints_by_target(target_pk, filter_query=filter_query)
+        else:
+            queryset = self.service.get_all(filter_query=filter_query)
+        # ?fields= 稀疏字段集：只查询需要输出的列
+        return self.get_serializer().restrict_queryset(queryset)
+
+    def perform_update(self, serializer):
+        """更新后使搜索缓存失效"""
+        super().perform_update(serializer)
+        invalidate_search_cache_on_commit()
+
+    def perform_destroy(self, instance):
+        """单条删除走 service，同时使搜索缓存失效"""
+        self.service.bulk_delete([instance.pk])
 
     @action(detail=False, methods=['post'], url_path='bulk-create')
     def bulk_create(self, request, **kwargs):
@@ -716,30 +726,15 @@ class EndpointViewSet(viewsets.ModelViewSet):
         
         CSV 列：url, host, location, title, status_code, content_length, content_type, webserver, tech, response_body, response_headers, vhost, matched_gf_patterns, created_at
         """
-        from apps.common.utils import create_csv_export_response, format_datetime, format_list_field
+        from apps.common.utils import create_copy_csv_export_response
         
         target_pk = self.kwargs.get('target_pk')
         if not target_pk:
             raise DRFValidationError('必须在目标下导出')
         
-        data_iterator = self.service.iter_raw_data_for_csv_export(target_id=target_pk)
-        
-        headers = [
-            'url', 'host', 'location', 'title', 'status_code',
-            'content_length', 'content_type', 'webserver', 'tech',
-            'response_body', 'response_headers', 'vhost', 'matched_gf_patterns', 'created_at'
-        ]
-        formatters = {
-            'created_at': format_datetime,
-            'tech': lambda x: format_list_field(x, separator=','),
-            'matched_gf_patterns': lambda x: format_list_field(x, separator=','),
-        }
-        
-        return create_csv_export_response(
-            data_iterator=data_iterator,
-            headers=headers,
-            filename=f"target-{target_pk}-endpoints.csv",
-            field_formatters=formatters
+        return create_copy_csv_export_response(
+            lambda out_file: self.service.stream_csv_export(target_id=target_pk, out_file=out_file),
+            filename=f"target-{target_pk}-endpoints.csv"
         )
 
     @action(detail=False, methods=['post'], url_path='bulk-delete')
@@ -760,8 +755,7 @@ class EndpointViewSet(viewsets.ModelViewSet):
             )
         
         try:
-            from ..models import Endpoint
-            deleted_count, _ = Endpoint.objects.filter(id__in=ids).delete()
+            deleted_count = self.service.bulk_delete(ids)
             return success_response(data={'deletedCount': deleted_count})
         except Exception as e:
             logger.exception("批量删除端点失败")
@@ -991,8 +985,11 @@ class WebsiteSnapshotViewSet(viewsets.ModelViewSet):
         filter_query = self.request.query_params.get('filter', None)
         
         if scan_pk:
-            return self.service.get_by_scan(scan_pk, filter_query=filter_query)
-        return self.service.get_all(filter_query=filter_query)
+            queryset = self.service.get_by_scan(scan_pk, filter_query=filter_query)
+        else:
+            queryset = self.service.get_all(filter_query=filter_query)
+        # ?fields= 稀疏字段集：只查询需要输出的列
+        return self.get_serializer().restrict_queryset(queryset)
 
     @action(detail=False, methods=['get'], url_path='export')
     def export(self, request, **kwargs):
@@ -1000,29 +997,15 @@ class WebsiteSnapshotViewSet(viewsets.ModelViewSet):
         
         CSV 列：url, host, location, title, status_code, content_length, content_type, webserver, tech, response_body, response_headers, vhost, created_at
         """
-        from apps.common.utils import create_csv_export_response, format_datetime, format_list_field
+        from apps.common.utils import create_copy_csv_export_response
         
         scan_pk = self.kwargs.get('scan_pk')
         if not scan_pk:
             raise DRFValidationError('必须在扫描下导出')
         
-        data_iterator = self.service.iter_raw_data_for_csv_export(scan_id=scan_pk)
-        
-        headers = [
-            'url', 'host', 'location', 'title', 'status_code',
-            'content_length', 'content_type', 'webserver', 'tech',
-            'response_body', 'response_headers', 'vhost', 'created_at'
-        ]
-        formatters = {
-            'created_at': format_datetime,
-            'tech': lambda x: format_list_field(x, separator=','),
-        }
-        
-        return create_csv_export_response(
-            data_iterator=data_iterator,
-            headers=headers,
-            filename=f"scan-{scan_pk}-websites.csv",
-            field_formatters=formatters
+        return create_copy_csv_export_response(
+            lambda out_file: self.service.stream_csv_export(scan_id=scan_pk, out_file=out_file),
+            filename=f"scan-{scan_pk}-websites.csv"
         )
 
 
@@ -1108,8 +1091,11 @@ class EndpointSnapshotViewSet(viewsets.ModelViewSet):
         filter_query = self.request.query_params.get('filter', None)
         
         if scan_pk:
-            return self.service.get_by_scan(scan_pk, filter_query=filter_query)
-        return self.service.get_all(filter_query=filter_query)
+            queryset = self.service.get_by_scan(scan_pk, filter_query=filter_query)
+        else:
+            queryset = self.service.get_all(filter_query=filter_query)
+        # ?fields= 稀疏字段集：只查询需要输出的列
+        return self.get_serializer().restrict_queryset(queryset)
 
     @action(detail=False, methods=['get'], url_path='export')
     def export(self, request, **kwargs):
@@ -1176,26 +1162,15 @@ class HostPortMappingSnapshotViewSet(viewsets.ModelViewSet):
         
         CSV 列：ip, host, port, created_at
         """
-        from apps.common.utils import create_csv_export_response, format_datetime
+        from apps.common.utils import create_copy_csv_export_response
         
         scan_pk = self.kwargs.get('scan_pk')
         if not scan_pk:
             raise DRFValidationError('必须在扫描下导出')
         
-        # 获取流式数据迭代器
-        data_iterator = self.service.iter_raw_data_for_csv_export(scan_id=scan_pk)
-        
-        # CSV 表头和格式化器
-        headers = ['ip', 'host', 'port', 'created_at']
-        formatters = {
-            'created_at': format_datetime
-        }
-        
-        return create_csv_export_response(
-            data_iterator=data_iterator,
-            headers=headers,
-            filename=f"scan-{scan_pk}-ip-addresses.csv",
-            field_formatters=formatters
+        return create_copy_csv_export_response(
+            lambda out_file: self.service.stream_csv_export(scan_id=scan_pk, out_file=out_file),
+            filename=f"scan-{scan_pk}-ip-addresses.csv"
         )
 
 
@@ -26,21 +26,72 @@
 - endpoint: 端点
 """
 
+import base64
 import logging
-import json
+from collections import defaultdict
 from datetime import datetime
+from itertools import chain
+from typing import Optional, Tuple
 from urllib.parse import urlparse, urlunparse
+
+import orjson
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.request import Request
 from django.db import connection
 
+from apps.common.renderers import ORJSONRenderer
 from apps.common.response_helpers import success_response, error_response
 from apps.common.error_codes import ErrorCodes
 from apps.asset.services.search_service import AssetSearchService, VALID_ASSET_TYPES
 
 logger = logging.getLogger(__name__)
 
+# 前缀范围查询的上界后缀：最大的 Unicode 码点，base || 它 大于所有以 base 开头的字符串
+_PREFIX_UPPER_BOUND = '\U0010ffff'
+
+
+# 响应字段名 -> 所需的查询列（?fields= 按响应字段名指定）
+RESULT_FIELD_COLUMNS = {
+    'id': ('id',),
+    'url': ('url',),
+    'host': ('host',),
+    'title': ('title',),
+    'technologies': ('tech',),
+    'statusCode': ('status_code',),
+    'contentLength': ('content_length',),
+    'contentType': ('content_type',),
+    'webserver': ('webserver',),
+    'location': ('location',),
+    'vhost': ('vhost',),
+    'responseHeaders': ('response_headers',),
+    'responseBody': ('response_body',),
+    'createdAt': ('created_at',),
+    'targetId': ('target_id',),
+    'vulnerabilities': ('url', 'target_id'),
+    'matchedGfPatterns': ('matched_gf_patterns',),
+}
+
+
+def _encode_cursor(result: dict) -> Optional[str]:
+    """把结果行的 (created_at, id) 编码为不透明的分页游标"""
+    created_at = result.get('created_at')
+    if created_at is None or result.get('id') is None:
+        return None
+    raw = f"{created_at.isoformat()}|{result['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(value: str) -> Tuple[datetime, int]:
+    """
+    解析 _encode_cursor 生成的游标
+    
+    格式非法时抛出 ValueError（binascii.Error / UnicodeDecodeError 均为其子类）
+    """
+    raw = base64.urlsafe_b64decode(value.encode()).decode()
+    created_at, row_id = raw.rsplit('|', 1)
+    return datetime.fromisoformat(created_at), int(row_id)
+
 
 class AssetSearchView(APIView):
     """
@@ -53,6 +104,10 @@ class AssetSearchView(APIView):
         asset_type: 资产类型 ('website' 或 'endpoint'，默认 'website')
         page: 页码（从 1 开始，默认 1）
         pageSize: 每页数量（默认 10，最大 100）
+        cursor: 游标分页（可选，取上一页响应的 nextCursor）；传入时忽略 page，
+            从上一页最后一行之后继续读取，深翻页不再随页码变慢
+        fields: 只返回这些字段（可选，逗号分隔的响应字段名，如 url,title,statusCode）；
+            未请求 responseBody / responseHeaders 时数据库不读取这两个大字段
     
     示例查询：
         ?q=host="api" && tech="nginx"
@@ -66,21 +121,44 @@ class AssetSearchView(APIView):
             "page": 1,
             "pageSize": 10,
             "totalPages": 10,
-            "assetType": "website"
+            "assetType": "website",
+            "nextCursor": "..."   # 不足一页时为 null
         }
     """
     
+    # 响应键在 _format_result 中已是 camelCase，直接用 orjson 序列化，
+    # 跳过 CamelCaseJSONRenderer 对整个结果（含响应头字典）的递归键名转换；
+    # 响应头名称也因此原样返回，不再被改写
+    renderer_classes = [ORJSONRenderer]
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.service = AssetSearchService()
+        # 响应头文本 -> 解析结果（仅当前请求内复用）
+        self._headers_cache = {}
     
     def _parse_headers(self, headers_data) -> dict:
-        """解析响应头为字典"""
+        """
+        解析响应头为字典
+        
+        同一页结果中相同的响应头文本（同一扫描配置常见）只解析一次，
+        缓存挂在视图实例上（DRF 每个请求新建视图实例），不跨请求共享。
+        """
         if not headers_data:
             return {}
+        if not isinstance(headers_data, str):
+            return self._parse_headers_text(headers_data)
+        parsed = self._headers_cache.get(headers_data)
+        if parsed is None:
+            parsed = self._headers_cache[headers_data] = self._parse_headers_text(headers_data)
+        return parsed
+    
+    @staticmethod
+    def _parse_headers_text(headers_data) -> dict:
+        """_parse_headers 的解析部分：优先按 JSON 解析，失败时按 "Key: Value" 行解析"""
         try:
-            return json.loads(headers_data)
-        except (json.JSONDecodeError, TypeError):
+            return orjson.loads(headers_data)
+        except (orjson.JSONDecodeError, TypeError):
             result = {}
             for line in str(headers_data).split('\n'):
                 if ':' in line:
@@ -90,26 +168,28 @@ class AssetSearchView(APIView):
     
     def _format_result(self, result: dict, vulnerabilities_by_url: dict, asset_type: str) -> dict:
         """格式化单个搜索结果"""
-        url = result.get('url', '')
+        get = result.get
+        url = get('url', '')
         vulns = vulnerabilities_by_url.get(url, [])
+        created_at = get('created_at')
         
         # 基础字段（Website 和 Endpoint 共有）
         formatted = {
-            'id': result.get('id'),
+            'id': get('id'),
             'url': url,
-            'host': result.get('host', ''),
-            'title': result.get('title', ''),
-            'technologies': result.get('tech', []) or [],
-            'statusCode': result.get('status_code'),
-            'contentLength': result.get('content_length'),
-            'contentType': result.get('content_type', ''),
-            'webserver': result.get('webserver', ''),
-            'location': result.get('location', ''),
-            'vhost': result.get('vhost'),
-            'responseHeaders': self._parse_headers(result.get('response_headers')),
-            'responseBody': result.get('response_body', ''),
-            'createdAt': result.get('created_at').isoformat() if result.get('created_at') else None,
-            'targetId': result.get('target_id'),
+            'host': get('host', ''),
+            'title': get('title', ''),
+            'technologies': get('tech', []) or [],
+            'statusCode': get('status_code'),
+            'contentLength': get('content_length'),
+            'contentType': get('content_type', ''),
+            'webserver': get('webserver', ''),
+            'location': get('location', ''),
+            'vhost': get('vhost'),
+            'responseHeaders': self._parse_headers(get('response_headers')),
+            'responseBody': get('response_body', ''),
+            'createdAt': created_at.isoformat() if created_at else None,
+            'targetId': get('target_id'),
         }
         
         # Website 特有字段：漏洞关联
@@ -126,7 +206,7 @@ class AssetSearchView(APIView):
         
         # Endpoint 特有字段
         if asset_type == 'endpoint':
-            formatted['matchedGfPatterns'] = result.get('matched_gf_patterns', []) or []
+            formatted['matchedGfPatterns'] = get('matched_gf_patterns', []) or []
         
         return formatted
     
@@ -147,66 +227,62 @@ class AssetSearchView(APIView):
         if not website_urls:
             return {}
         
+        # 每个 website URL 只解析一次：去掉查询参数和片段，只保留 scheme://netloc/path 作为前缀
+        # by_target: target_id -> {base_url: website_url}（同一前缀保留第一个 website）
+        by_target = defaultdict(dict)
+        for url, target_id in website_urls:
+            if not url or target_id is None:
+                continue
+            parsed = urlparse(url)
+            base_url = urlunparse((parsed.scheme, parsed.netloc, parsed.path, '', '', ''))
+            by_target[target_id].setdefault(base_url, url)
+        
+        if not by_target:
+            return {}
+        
+        # 每个前缀作为 VALUES 的一行 (target_id, 下界, 上界, website URL)，与 vulnerability 做 JOIN：
+        # url ~>=~ base AND url ~<~ base || U+10FFFF 等价于 url 以 base 开头（按字节比较），
+        # 可直接用 (target_id, url text_pattern_ops) 索引逐行做范围扫描，
+        # 也不受 LIKE 通配符 % / _ 出现在路径中的影响
+        params = list(chain.from_iterable(
+            (target_id, base_url, base_url + _PREFIX_UPPER_BOUND, website_url)
+            for target_id, bases in by_target.items()
+            for base_url, website_url in bases.items()
+        ))
+        values_sql = ', '.join(['(%s::int, %s::text, %s::text, %s::text)'] * (len(params) // 4))
+        
         try:
             with connection.cursor() as cursor:
-                # 构建 OR 条件：每个 website URL（去掉查询参数）作为前缀匹配
-                conditions = []
-                params = []
-                url_mapping = {}  # base_url -> original_url
-                
-                for url, target_id in website_urls:
-                    if not url or target_id is None:
-                        continue
-                    # 使用 urlparse 去掉查询参数和片段，只保留 scheme://netloc/path
-                    parsed = urlparse(url)
-                    base_url = urlunparse((parsed.scheme, parsed.netloc, parsed.path, '', '', ''))
-                    url_mapping[base_url] = url
-                    conditions.append("(v.url LIKE %s AND v.target_id = %s)")
-                    params.extend([base_url + '%', target_id])
-                
-                if not conditions:
-                    return {}
-                
-                where_clause = " OR ".join(conditions)
-                
+                # 同一漏洞可能命中多个前缀：DISTINCT ON (v.id) 按前缀长度降序只保留最长前缀，
+                # 归属关系在数据库中确定，外层再按严重性排序
                 sql = f"""
-                    SELECT v.id, v.vuln_type, v.severity, v.url, v.target_id
-                    FROM vulnerability v
-                    WHERE {where_clause}
-                    ORDER BY 
-                        CASE v.severity 
-                            WHEN 'critical' THEN 1 
-                            WHEN 'high' THEN 2 
-                            WHEN 'medium' THEN 3 
-                            WHEN 'low' THEN 4 
-                            ELSE 5 
-                        END
+                    SELECT id, vuln_type, severity, url, target_id, website_url
+                    FROM (
+                        SELECT DISTINCT ON (v.id)
+                            v.id, v.vuln_type, v.severity, v.url, v.target_id,
+                            v.severity_rank, p.website_url
+                        FROM vulnerability v
+                        JOIN (VALUES {values_sql}) AS p(tid, lower_bound, upper_bound, website_url)
+                          ON v.target_id = p.tid
+                         AND v.url ~>=~ p.lower_bound
+                         AND v.url ~<~ p.upper_bound
+                        ORDER BY v.id, length(p.lower_bound) DESC
+                    ) matched
+                    ORDER BY severity_rank
                 """
                 cursor.execute(sql, params)
                 
-                # 获取所有漏洞
-                all_vulns = []
-                for row in cursor.fetchall():
-                    all_vulns.append({
-                        'id': row[0],
-                        'vuln_type': row[1],
-                        'name': row[1],
-                        'severity': row[2],
-                        'url': row[3],
-                        'target_id': row[4],
-                    })
-                
                 # 按原始 website URL 分组（用于返回结果）
                 result = {url: [] for url, _ in website_urls}
-                for vuln in all_vulns:
-                    vuln_url = vuln['url']
-                    # 找到匹配的 website URL（最长前缀匹配）
-                    for website_url, target_id in website_urls:
-                        parsed = urlparse(website_url)
-                        base_url = urlunparse((parsed.scheme, parsed.netloc, parsed.path, '', '', ''))
-                        if vuln_url.startswith(base_url) and vuln['target_id'] == target_id:
-                            result[website_url].append(vuln)
-                            break
+                for vuln_id, vuln_type, severity, vuln_url, target_id, website_url in cursor:
+                    result[website_url].append({
+                        'id': vuln_id,
+                        'vuln_type': vuln_type,
+                        'name': vuln_type,
+                        'severity': severity,
+                        'url': vuln_url,
+                        'target_id': target_id,
+                    })
                 
                 return result
         except Exception as e:
@@ -246,31 +322,85 @@ class AssetSearchView(APIView):
         page = max(1, page)
         page_size = min(max(1, page_size), 100)
         
-        # 获取总数和搜索结果
-        total = self.service.count(query, asset_type)
-        total_pages = (total + page_size - 1) // page_size if total > 0 else 1
-        offset = (page - 1) * page_size
+        # 解析字段裁剪参数（未知字段名忽略，与列表接口的 ?fields= 一致）
+        requested_fields = None
+        columns = None
+        raw_fields = request.query_params.get('fields', '').strip()
+        if raw_fields:
+            requested_fields = {
+                name.strip() for name in raw_fields.split(',')
+                if name.strip() in RESULT_FIELD_COLUMNS
+            }
+            if asset_type != 'website':
+                requested_fields.discard('vulnerabilities')
+            if asset_type != 'endpoint':
+                requested_fields.discard('matchedGfPatterns')
+            requested_fields = requested_fields or None
+            if requested_fields:
+                columns = [column for name in requested_fields for column in RESULT_FIELD_COLUMNS[name]]
         
-        all_results = self.service.search(query, asset_type)
-        results = all_results[offset:offset + page_size]
+        cursor = request.query_params.get('cursor', '').strip()
+        after = None
+        if cursor:
+            try:
+                after = _decode_cursor(cursor)
+            except ValueError:
+                return error_response(
+                    code=ErrorCodes.VALIDATION_ERROR,
+                    message='Invalid cursor',
+                    status_code=status.HTTP_400_BAD_REQUEST
+                )
+        
+        data = self._search_page(query, asset_type, page, page_size, after, requested_fields, columns)
+        return success_response(data=data)
+    
+    def _search_page(
+        self,
+        query: str,
+        asset_type: str,
+        page: int,
+        page_size: int,
+        after: Optional[Tuple[datetime, int]],
+        requested_fields: Optional[set],
+        columns: Optional[list],
+    ) -> dict:
+        """执行搜索并构建响应数据（搜索结果与总数由 AssetSearchService 缓存）"""
+        if after is not None:
+            # 游标分页：按 (created_at, id) 定位，总数走 count() 的查询缓存
+            results = self.service.search(query, asset_type, limit=page_size, after=after, fields=columns)
+            total = self.service.count(query, asset_type)
+        else:
+            # 一条 SQL 同时取当前页和总数
+            offset = (page - 1) * page_size
+            results, total = self.service.search_with_count(
+                query, asset_type, limit=page_size, offset=offset, fields=columns
+            )
+        next_cursor = _encode_cursor(results[-1]) if len(results) == page_size else None
+        total_pages = (total + page_size - 1) // page_size if total > 0 else 1
         
         # 批量查询漏洞数据（仅 Website 类型需要）
         vulnerabilities_by_url = {}
-        if asset_type == 'website':
+        if asset_type == 'website' and (requested_fields is None or 'vulnerabilities' in requested_fields):
             website_urls = [(r.get('url'), r.get('target_id')) for r in results if r.get('url') and r.get('target_id')]
             vulnerabilities_by_url = self._get_vulnerabilities_by_url_prefix(website_urls) if website_urls else {}
         
         # 格式化结果
         formatted_results = [self._format_result(r, vulnerabilities_by_url, asset_type) for r in results]
+        if requested_fields:
+            formatted_results = [
+                {name: item[name] for name in item if name in requested_fields}
+                for item in formatted_results
+            ]
         
-        return success_response(data={
+        return {
             'results': formatted_results,
             'total': total,
             'page': page,
             'pageSize': page_size,
             'totalPages': total_pages,
             'assetType': asset_type,
-        })
+            'nextCursor': next_cursor,
+        }
 
 
 class AssetSearchExportView(APIView):
@@ -291,29 +421,9 @@ class AssetSearchExportView(APIView):
         super().__init__(**kwargs)
         self.service = AssetSearchService()
     
-    def _get_headers_and_formatters(self, asset_type: str):
-        """获取 CSV 表头和格式化器"""
-        from apps.common.utils import format_datetime, format_list_field
-        
-        if asset_type == 'website':
-            headers = ['url', 'host', 'title', 'status_code', 'content_type', 'content_length', 
-                      'webserver', 'location', 'tech', 'vhost', 'created_at']
-        else:
-            headers = ['url', 'host', 'title', 'status_code', 'content_type', 'content_length',
-                      'webserver', 'location', 'tech', 'matched_gf_patterns', 'vhost', 'created_at']
-        
-        formatters = {
-            'created_at': format_datetime,
-            'tech': lambda x: format_list_field(x, separator='; '),
-            'matched_gf_patterns': lambda x: format_list_field(x, separator='; '),
-            'vhost': lambda x: 'true' if x else ('false' if x is False else ''),
-        }
-        
-        return headers, formatters
-    
     def get(self, request: Request):
         """导出搜索结果为 CSV（带 Content-Length，支持下载进度显示）"""
-        from apps.common.utils import create_csv_export_response
+        from apps.common.utils import create_copy_csv_export_response
         
         # 获取搜索查询
         query = request.query_params.get('q', '').strip()
@@ -334,28 +444,20 @@ class AssetSearchExportView(APIView):
                 status_code=status.HTTP_400_BAD_REQUEST
             )
         
-        # 检查是否有结果（快速检查，避免空导出）
-        total = self.service.count(query, asset_type)
-        if total == 0:
+        # 检查是否有结果（避免空导出）；不使用缓存的总数，刚写入的数据也能导出
+        if not self.service.exists(query, asset_type):
             return error_response(
                 code=ErrorCodes.NOT_FOUND,
                 message='No results to export',
                 status_code=status.HTTP_404_NOT_FOUND
             )
         
-        # 获取表头和格式化器
-        headers, formatters = self._get_headers_and_formatters(asset_type)
-        
         # 生成文件名
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f'search_{asset_type}_{timestamp}.csv'
         
-        # 使用通用导出工具
-        data_iterator = self.service.search_iter(query, asset_type)
-        return create_csv_export_response(
-            data_iterator=data_iterator,
-            headers=headers,
-            filename=filename,
-            field_formatters=formatters,
-            show_progress=True  # 显示下载进度
+        # 由 PostgreSQL COPY 直接生成 CSV，不逐行经过 Python 序列化
+        return create_copy_csv_export_response(
+            lambda out_file: self.service.stream_csv_export(query, asset_type, out_file),
+            filename
         )
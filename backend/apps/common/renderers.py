@@ -0,0 +1,30 @@
+"""
+JSON 渲染器
+
+使用 orjson（C 实现）替代标准库 json 序列化响应，大列表接口的渲染耗时显著降低。
+通过 JSON_CAMEL_CASE['RENDERER_CLASS'] 作为 CamelCaseJSONRenderer 的基类，
+camelCase 转换逻辑保持不变。
+"""
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+# orjson 不支持的类型（Decimal、lazy 翻译字符串、QuerySet 等）交给 DRF 的编码器处理；
+# datetime/date/time 也走 DRF 编码器（OPT_PASSTHROUGH_DATETIME），保持毫秒精度和 'Z' 后缀的既有格式
+_fallback_encoder = JSONEncoder()
+
+
+class ORJSONRenderer(JSONRenderer):
+    """基于 orjson 的 JSON 渲染器（输出与 JSONRenderer 兼容的 UTF-8 字节）"""
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        
+        return orjson.dumps(data, default=_fallback_encoder.default, option=option)
@@ -4,9 +4,12 @@ from .blacklist_serializers import (
     GlobalBlacklistRuleSerializer,
     TargetBlacklistRuleSerializer,
 )
+from .mixins import CachedFieldsSerializerMixin, DynamicFieldsSerializerMixin
 
 __all__ = [
     'BlacklistRuleSerializer',
     'GlobalBlacklistRuleSerializer',
     'TargetBlacklistRuleSerializer',
+    'CachedFieldsSerializerMixin',
+    'DynamicFieldsSerializerMixin',
 ]
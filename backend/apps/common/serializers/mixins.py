@@ -0,0 +1,106 @@
+"""序列化器通用 Mixin"""
+
+from functools import cached_property
+from typing import Optional
+
+
+class CachedFieldsSerializerMixin:
+    """
+    缓存可读字段列表的序列化器 Mixin
+    
+    DRF 的 `fields` 已按序列化器实例缓存，但 `_readable_fields` 每次
+    to_representation 都会重新遍历 fields 并过滤 write_only 字段。
+    many=True 时 ListSerializer 复用同一个 child 实例序列化全部记录，
+    缓存后每页只计算一次。
+    
+    用法（放在 ModelSerializer 之前）：
+        class WebSiteSerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
+            ...
+    """
+    
+    _cached_readable_fields = None
+    
+    @property
+    def _readable_fields(self):
+        if self._cached_readable_fields is None:
+            self._cached_readable_fields = tuple(super()._readable_fields)
+        return self._cached_readable_fields
+
+
+def _to_camel(name: str) -> str:
+    """snake_case -> camelCase（与 CamelCaseJSONRenderer 的输出键名一致）"""
+    first, *rest = name.split('_')
+    return first + ''.join(part.title() for part in rest)
+
+
+class DynamicFieldsSerializerMixin:
+    """
+    稀疏字段集 Mixin：?fields=id,url,statusCode 只输出指定字段
+    
+    - 字段名同时接受 snake_case 与前端使用的 camelCase
+    - 未传 fields 参数时行为不变
+    - restrict_queryset() 把请求字段映射为模型字段并调用 queryset.only()，
+      被丢弃的列（如 response_body）不会从数据库读取
+    - 手写 to_representation 的序列化器需用 build_representation() 拼装输出，
+      只读取请求的属性；否则被 only() 延迟的列会在每行触发一次 refresh_from_db
+    """
+    
+    FIELDS_PARAM = 'fields'
+    
+    @cached_property
+    def requested_fields(self) -> Optional[frozenset]:
+        """请求的字段名集合；未指定时为 None"""
+        request = self.context.get('request')
+        if request is None:
+            return None
+        raw = request.query_params.get(self.FIELDS_PARAM)
+        if not raw:
+            return None
+        return frozenset(name.strip() for name in raw.split(',') if name.strip()) or None
+    
+    def _is_requested(self, name: str) -> bool:
+        return name in self.requested_fields or _to_camel(name) in self.requested_fields
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.requested_fields:
+            fields = {name: field for name, field in fields.items() if self._is_requested(name)}
+        return fields
+    
+    def build_representation(self, instance, getters: dict) -> dict:
+        """
+        按请求字段拼装输出字典
+        
+        Args:
+            instance: 模型实例
+            getters: {输出键名: 取值函数}，顺序即输出顺序
+        
+        未请求的键不会调用取值函数，因此不会访问被 only() 延迟加载的列。
+        many=True 时 ListSerializer 复用同一个 child 实例，选中的取值函数每页只计算一次。
+        """
+        selected = self.__dict__.get('_selected_getters')
+        if selected is None:
+            selected = tuple(
+                (name, getter)
+                for name, getter in getters.items()
+                if not self.requested_fields or self._is_requested(name)
+            )
+            self._selected_getters = selected
+        return {name: getter(instance) for name, getter in selected}
+    
+    def restrict_queryset(self, queryset):
+        """
+        按请求字段限制查询列（queryset.only）
+        
+        字段 source 的第一段若是模型的具体字段则加入 only()；
+        其余（关联跨表、方法字段等）忽略。未传 fields 参数时原样返回。
+        """
+        if not self.requested_fields:
+            return queryset
+        concrete = {field.name for field in queryset.model._meta.concrete_fields}
+        only_fields = {
+            field.source.split('.')[0]
+            for field in self.fields.values()
+            if field.source.split('.')[0] in concrete
+        }
+        return queryset.only(*only_fields)
@@ -10,13 +10,23 @@
 import fnmatch
 import logging
 import os
-import subprocess
+import re
+import time
 from datetime import datetime, timezone
 from typing import TypedDict
 
 
 logger = logging.getLogger(__name__)
 
+# 从文件末尾向前读取时每次读取的块大小
+TAIL_BLOCK_SIZE = 8192
+
+# 日志文件列表缓存时间（秒），前端轮询时避免每次都 listdir + stat
+LOG_FILES_CACHE_TTL = 5
+
+# 日志目录 -> (过期时间, 文件列表)；视图每个请求都会新建服务实例，因此放在模块级
+_log_files_cache: dict[str, tuple[float, list]] = {}
+
 
 class LogFileInfo(TypedDict):
     """日志文件信息"""
@@ -41,13 +51,23 @@ class SystemLogService:
         ('container_*.log', 'container'),
     ]
     
+    # 由 CATEGORY_RULES 预先构建：不含通配符的规则走字典精确匹配，其余预编译为正则
+    _EXACT_RULES = {
+        pattern: category for pattern, category in CATEGORY_RULES
+        if not any(ch in pattern for ch in '*?[')
+    }
+    _GLOB_RULES = [
+        (re.compile(fnmatch.translate(pattern)), category)
+        for pattern, category in CATEGORY_RULES
+        if any(ch in pattern for ch in '*?[')
+    ]
+    
     def __init__(self):
         # 日志目录路径
         self.log_dir = "/opt/xingrin/logs"
         self.default_file = "xingrin.log"  # 默认日志文件
         self.default_lines = 200           # 默认返回行数
         self.max_lines = 10000             # 最大返回行数限制
-        self.timeout_seconds = 3           # tail 命令超时时间
 
     def _categorize_file(self, filename: str) -> str | None:
         """
@@ -56,8 +76,11 @@ class SystemLogService:
         Returns:
             分类名称，如果不是日志文件则返回 None
         """
-        for pattern, category in self.CATEGORY_RULES:
-            if fnmatch.fnmatch(filename, pattern):
+        category = self._EXACT_RULES.get(filename)
+        if category is not None:
+            return category
+        for pattern, category in self._GLOB_RULES:
+            if pattern.match(filename):
                 return category
         return None
 
@@ -84,43 +107,53 @@ class SystemLogService:
         """
         获取所有可用的日志文件列表
         
+        结果缓存 LOG_FILES_CACHE_TTL 秒（文件大小和修改时间可能有几秒延迟）。
+        
         Returns:
             日志文件信息列表，按分类和文件名排序
         """
+        cached = _log_files_cache.get(self.log_dir)
+        if cached is not None and cached[0] > time.monotonic():
+            return list(cached[1])
+        
+        files = self._scan_log_files()
+        _log_files_cache[self.log_dir] = (time.monotonic() + LOG_FILES_CACHE_TTL, files)
+        return list(files)
+
+    def _scan_log_files(self) -> list[LogFileInfo]:
+        """扫描日志目录，返回日志文件信息列表（get_log_files 的未缓存实现）"""
         files: list[LogFileInfo] = []
         
         if not os.path.isdir(self.log_dir):
             logger.warning("日志目录不存在: %s", self.log_dir)
             return files
         
-        for filename in os.listdir(self.log_dir):
-            filepath = os.path.join(self.log_dir, filename)
-            
-            # 只处理文件，跳过目录
-            if not os.path.isfile(filepath):
-                continue
-            
-            # 判断分类
-            category = self._categorize_file(filename)
-            if category is None:
-                continue
-            
-            # 获取文件信息
-            try:
-                stat = os.stat(filepath)
-                modified_at = datetime.fromtimestamp(
-                    stat.st_mtime, tz=timezone.utc
-                ).isoformat()
+        # scandir 一次读取目录项，文件类型来自目录项本身，分类不匹配的文件不再 stat
+        with os.scandir(self.log_dir) as entries:
+            for entry in entries:
+                # 判断分类
+                category = self._categorize_file(entry.name)
+                if category is None:
+                    continue
                 
-                files.append({
-                    'filename': filename,
-                    'category': category,
-                    'size': stat.st_size,
-                    'modifiedAt': modified_at,
-                })
-            except OSError as e:
-                logger.warning("获取文件信息失败 %s: %s", filepath, e)
-                continue
+                # 获取文件信息（只处理文件，跳过目录）
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    modified_at = datetime.fromtimestamp(
+                        stat.st_mtime, tz=timezone.utc
+                    ).isoformat()
+                    
+                    files.append({
+                        'filename': entry.name,
+                        'category': category,
+                        'size': stat.st_size,
+                        'modifiedAt': modified_at,
+                    })
+                except OSError as e:
+                    logger.warning("获取文件信息失败 %s: %s", entry.path, e)
+                    continue
         
         # 排序：按分类优先级（system > error > performance > container），然后按文件名
         category_order = {'system': 0, 'error': 1, 'performance': 2, 'container': 3}
@@ -168,23 +201,40 @@ class SystemLogService:
         if lines > self.max_lines:
             lines = self.max_lines
 
-        # 使用 tail 命令读取日志文件末尾内容
-        cmd = ["tail", "-n", str(lines), log_file]
-
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=self.timeout_seconds,
-            check=False,
-        )
-
-        if result.returncode != 0:
-            logger.warning(
-                "tail command failed: returncode=%s stderr=%s",
-                result.returncode,
-                (result.stderr or "").strip(),
-            )
-
-        # 直接返回原始内容，保持文件中的顺序
-        return result.stdout or ""
+        # 从文件末尾向前按块读取，不再为每次请求启动 tail 子进程
+        return self._tail(log_file, lines)
+
+    @staticmethod
+    def _tail(log_file: str, lines: int) -> str:
+        """
+        读取文件最后 lines 行（与 tail -n 行为一致）
+        
+        从文件末尾向前逐块读取，直到换行符数量足以确定最后 lines 行的起点，
+        读取量只与所需行数相关，与文件大小无关。
+        
+        Returns:
+            str: 日志内容，保持文件中的顺序；无法解码的字节替换为 U+FFFD
+        """
+        with open(log_file, 'rb') as f:
+            position = f.seek(0, os.SEEK_END)
+            blocks = []
+            newlines = 0
+            # 末尾换行符只是最后一行的结束符，因此需要多于 lines 个换行符
+            while position > 0 and newlines <= lines:
+                size = min(TAIL_BLOCK_SIZE, position)
+                position -= size
+                f.seek(position)
+                block = f.read(size)
+                blocks.append(block)
+                newlines += block.count(b'\n')
+        
+        data = b''.join(reversed(blocks))
+        ends_with_newline = data.endswith(b'\n')
+        if ends_with_newline:
+            data = data[:-1]
+        tail_lines = data.split(b'\n')[-lines:] if data else []
+        content = b'\n'.join(tail_lines)
+        if ends_with_newline:
+            content += b'\n'
+        
+        return content.decode('utf-8', errors='replace')
@@ -0,0 +1,145 @@
+"""
+pg_copy 测试
+
+format_copy_value 为纯函数测试；copy_upsert 需要 PostgreSQL 测试数据库（pytest-django），
+以 WebSite 表（唯一约束 url + target_id）作为写入目标：
+- 插入 / 冲突更新 / DO NOTHING
+- distinct：同批重复唯一键由数据库去重
+- skip_unchanged：未变化的行不更新、不计入返回值
+- NULL、制表符、换行、反斜杠等特殊字符原样写入
+- 空输入
+- 新目标首次写入时 target_asset_stats 触发器正常插入计数行（迁移 0016 的回归测试）
+"""
+
+import pytest
+
+from apps.asset.models import TargetAssetStats, WebSite
+from apps.common.utils import copy_upsert, format_copy_value
+from apps.targets.models import Target
+
+
+COLUMNS = ('target_id', 'url', 'title', 'response_body', 'tech', 'status_code', 'vhost')
+UPDATE_COLUMNS = COLUMNS[2:]
+UNIQUE_COLUMNS = ('url', 'target_id')
+
+
+def _upsert(rows, **kwargs):
+    kwargs.setdefault('update_columns', UPDATE_COLUMNS)
+    return copy_upsert(WebSite, rows, columns=COLUMNS, unique_columns=UNIQUE_COLUMNS, **kwargs)
+
+
+@pytest.fixture
+def target():
+    return Target.objects.create(name='example.com')
+
+
+class TestFormatCopyValue:
+    """COPY TEXT 字段格式化"""
+
+    def test_null(self):
+        assert format_copy_value(None) == '\\N'
+
+    def test_bool(self):
+        assert format_copy_value(True) == 't'
+        assert format_copy_value(False) == 'f'
+
+    def test_escapes_special_characters(self):
+        assert format_copy_value('a\tb\nc\rd\\e') == 'a\\tb\\nc\\rd\\\\e'
+
+    def test_literal_null_marker_is_not_null(self):
+        assert format_copy_value('\\N') == '\\\\N'
+
+    def test_array(self):
+        assert format_copy_value(['nginx', 'a"b', None]) == '{"nginx","a\\\\"b",NULL}'
+
+
+@pytest.mark.django_db
+class TestCopyUpsert:
+    """copy_upsert 写入 PostgreSQL"""
+
+    def test_empty_input(self, target):
+        assert _upsert([]) == 0
+        assert not WebSite.objects.exists()
+
+    def test_insert_and_update(self, target):
+        rows = [
+            (target.id, 'https://a.example.com', 'A', 'body', ['nginx'], 200, True),
+            (target.id, 'https://b.example.com', 'B', 'body', [], 404, False),
+        ]
+        assert _upsert(rows) == 2
+
+        assert _upsert([(target.id, 'https://a.example.com', 'A2', 'body2', ['vue'], 301, None)]) == 1
+        site = WebSite.objects.get(url='https://a.example.com')
+        assert (site.title, site.response_body, site.tech, site.status_code, site.vhost) == (
+            'A2', 'body2', ['vue'], 301, None
+        )
+        assert WebSite.objects.count() == 2
+        # 未提供的 auto_now_add 字段由数据库填充
+        assert site.created_at is not None
+
+    def test_new_target_creates_asset_stats(self, target):
+        rows = [(target.id, f'https://{i}.example.com', '', '', [], 200, None) for i in range(2)]
+        assert _upsert(rows) == 2
+
+        stats = TargetAssetStats.objects.get(target_id=target.id)
+        assert (stats.website_count, stats.endpoint_count) == (2, 0)
+
+    def test_do_nothing_without_update_columns(self, target):
+        _upsert([(target.id, 'https://a.example.com', 'A', '', [], 200, None)])
+        affected = _upsert(
+            [(target.id, 'https://a.example.com', 'changed', '', [], 500, None)],
+            update_columns=None,
+        )
+        assert affected == 0
+        assert WebSite.objects.get().title == 'A'
+
+    def test_distinct_deduplicates_same_batch(self, target):
+        rows = [
+            (target.id, 'https://a.example.com', 'first', '', [], 200, None),
+            (target.id, 'https://a.example.com', 'second', '', [], 200, None),
+            (target.id, 'https://b.example.com', 'B', '', [], 200, None),
+        ]
+        assert _upsert(rows, distinct=True) == 2
+        assert WebSite.objects.count() == 2
+        # 重复键保留任意一行
+        assert WebSite.objects.get(url='https://a.example.com').title in ('first', 'second')
+
+    def test_skip_unchanged(self, target):
+        rows = [
+            (target.id, 'https://a.example.com', 'A', 'body', ['nginx'], 200, None),
+            (target.id, 'https://b.example.com', 'B', 'body', [], 404, None),
+        ]
+        _upsert(rows)
+
+        # 重复写入相同数据：不更新任何行
+        assert _upsert(rows, skip_unchanged=True) == 0
+
+        # 只有变化的行计入返回值（NULL 与 NULL 视为相同）
+        changed = [rows[0], (target.id, 'https://b.example.com', 'B', 'body', [], 500, None)]
+        assert _upsert(changed, skip_unchanged=True) == 1
+        assert WebSite.objects.get(url='https://b.example.com').status_code == 500
+
+    def test_null_uses_model_default(self, target):
+        _upsert([(target.id, 'https://a.example.com', None, None, None, None, None)])
+        site = WebSite.objects.get()
+        assert site.title == ''
+        assert site.response_body == ''
+        assert site.tech == []
+        assert site.status_code is None
+        assert site.vhost is None
+
+    def test_special_characters_round_trip(self, target):
+        body = 'line1\nline2\r\n\tindented \\path\\ \\N end'
+        tech = ['a"b', 'c\\d', 'e,f', 'g h']
+        _upsert([(target.id, 'https://a.example.com/?q=1\t2', 'tab\there', body, tech, 200, None)])
+
+        site = WebSite.objects.get()
+        assert site.url == 'https://a.example.com/?q=1\t2'
+        assert site.title == 'tab\there'
+        assert site.response_body == body
+        assert site.tech == tech
+
+    def test_multiple_chunks(self, target):
+        rows = [(target.id, f'https://{i}.example.com', str(i), '', [], 200, None) for i in range(25)]
+        assert _upsert(rows, chunk_size=10) == 25
+        assert WebSite.objects.count() == 25
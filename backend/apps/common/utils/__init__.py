@@ -1,6 +1,7 @@
 """Common utilities"""
 
 from .dedup import deduplicate_for_bulk, get_unique_fields
+from .pg_copy import copy_upsert, copy_upsert_returning, format_copy_value
 from .hash import (
     calc_file_sha256,
     calc_stream_sha256,
@@ -12,6 +13,8 @@ from .csv_utils import (
     format_list_field,
     format_datetime,
     create_csv_export_response,
+    create_copy_csv_export_response,
+    copy_csv_export,
     UTF8_BOM,
 )
 from .blacklist_filter import (
@@ -23,6 +26,9 @@ from .blacklist_filter import (
 __all__ = [
     'deduplicate_for_bulk',
     'get_unique_fields',
+    'copy_upsert',
+    'copy_upsert_returning',
+    'format_copy_value',
     'calc_file_sha256',
     'calc_stream_sha256',
     'safe_calc_file_sha256',
@@ -31,6 +37,8 @@ __all__ = [
     'format_list_field',
     'format_datetime',
     'create_csv_export_response',
+    'create_copy_csv_export_response',
+    'copy_csv_export',
     'UTF8_BOM',
     'BlacklistFilter',
     'detect_rule_type',
@@ -13,7 +13,7 @@ import os
 import tempfile
 import logging
 from datetime import datetime
-from typing import Iterator, Dict, Any, List, Callable, Optional
+from typing import Iterator, Dict, Any, List, Callable, Optional, BinaryIO, Sequence
 
 from django.http import FileResponse, StreamingHttpResponse
 
@@ -21,51 +21,77 @@ logger = logging.getLogger(__name__)
 
 # UTF-8 BOM，确保 Excel 正确识别编码
 UTF8_BOM = '\ufeff'
+UTF8_BOM_BYTES = UTF8_BOM.encode('utf-8')
+
+# generate_csv_rows 每次输出的数据行数
+CSV_FLUSH_ROWS = 500
 
 
 def generate_csv_rows(
     data_iterator: Iterator[Dict[str, Any]],
     headers: List[str],
-    field_formatters: Optional[Dict[str, Callable]] = None
-) -> Iterator[str]:
+    field_formatters: Optional[Dict[str, Callable]] = None,
+    flush_rows: int = CSV_FLUSH_ROWS
+) -> Iterator[bytes]:
     """
-    流式生成 CSV 行
+    流式生成 CSV 行（UTF-8 字节）
+    
+    整个导出复用同一个 StringIO 缓冲区和 csv.writer，每累计 flush_rows 行输出一次，
+    避免逐行创建缓冲区/writer，也减少流式响应的写入次数。
+    每块在这里编码一次，StreamingHttpResponse / 临时文件直接写入字节，不再逐块转码。
     
     Args:
         data_iterator: 数据迭代器，每个元素是一个字典
         headers: CSV 表头列表
         field_formatters: 字段格式化函数字典，key 为字段名，value 为格式化函数
+        flush_rows: 每次输出的数据行数
     
     Yields:
-        CSV 行字符串（包含换行符）
+        UTF-8 字节块（首块为 BOM，其次为表头，之后每块包含若干完整行及换行符）
     
     Example:
         >>> data = [{'ip': '192.168.1.1', 'hosts': ['a.com', 'b.com']}]
         >>> headers = ['ip', 'hosts']
         >>> formatters = {'hosts': format_list_field}
-        >>> for row in generate_csv_rows(iter(data), headers, formatters):
-        ...     print(row, end='')
+        >>> for chunk in generate_csv_rows(iter(data), headers, formatters):
+        ...     print(chunk.decode('utf-8'), end='')
     """
-    # 输出 BOM + 表头
     output = io.StringIO()
     writer = csv.writer(output, quoting=csv.QUOTE_MINIMAL)
+    
+    # 输出 BOM + 表头
+    yield UTF8_BOM_BYTES
     writer.writerow(headers)
-    yield UTF8_BOM + output.getvalue()
+    yield output.getvalue().encode('utf-8')
+    output.seek(0)
+    output.truncate(0)
+    
+    # 每列的格式化函数只查一次，循环内不再逐行查字典
+    formatters = field_formatters or {}
+    columns = [(header, formatters.get(header)) for header in headers]
+    writerow = writer.writerow
     
     # 输出数据行
+    pending = 0
     for row_data in data_iterator:
-        output = io.StringIO()
-        writer = csv.writer(output, quoting=csv.QUOTE_MINIMAL)
-        
+        get = row_data.get
         row = []
-        for header in headers:
-            value = row_data.get(header, '')
-            if field_formatters and header in field_formatters:
-                value = field_formatters[header](value)
+        for header, formatter in columns:
+            value = get(header, '')
+            if formatter is not None:
+                value = formatter(value)
             row.append(value if value is not None else '')
         
-        writer.writerow(row)
-        yield output.getvalue()
+        writerow(row)
+        pending += 1
+        if pending >= flush_rows:
+            yield output.getvalue().encode('utf-8')
+            output.seek(0)
+            output.truncate(0)
+            pending = 0
+    
+    if pending:
+        yield output.getvalue().encode('utf-8')
 
 
 def format_list_field(values: List, separator: str = ';') -> str:
@@ -176,10 +202,9 @@ def _create_file_response(
     """
     # 创建临时文件
     temp_file = tempfile.NamedTemporaryFile(
-        mode='w', 
+        mode='wb', 
         suffix='.csv', 
-        delete=False, 
-        encoding='utf-8'
+        delete=False
     )
     temp_path = temp_file.name
     
@@ -189,29 +214,7 @@ def _create_file_response(
             temp_file.write(row)
         temp_file.close()
         
-        # 获取文件大小
-        file_size = os.path.getsize(temp_path)
-        
-        # 创建文件响应
-        response = FileResponse(
-            open(temp_path, 'rb'),
-            content_type='text/csv; charset=utf-8',
-            as_attachment=True,
-            filename=filename
-        )
-        response['Content-Length'] = file_size
-        
-        # 设置清理回调：响应完成后删除临时文件
-        original_close = response.file_to_stream.close
-        def close_and_cleanup():
-            original_close()
-            try:
-                os.unlink(temp_path)
-            except OSError:
-                pass
-        response.file_to_stream.close = close_and_cleanup
-        
-        return response
+        return _file_response_from_temp(temp_path, filename)
         
     except Exception as e:
         # 清理临时文件
@@ -227,6 +230,119 @@ def _create_file_response(
         raise
 
 
+def _file_response_from_temp(temp_path: str, filename: str) -> FileResponse:
+    """
+    基于已写好的临时 CSV 文件创建 FileResponse
+    
+    带 Content-Length，响应关闭后自动删除临时文件。
+    """
+    # 获取文件大小
+    file_size = os.path.getsize(temp_path)
+    
+    # 创建文件响应
+    response = FileResponse(
+        open(temp_path, 'rb'),
+        content_type='text/csv; charset=utf-8',
+        as_attachment=True,
+        filename=filename
+    )
+    response['Content-Length'] = file_size
+    
+    # 设置清理回调：响应完成后删除临时文件
+    original_close = response.file_to_stream.close
+    def close_and_cleanup():
+        original_close()
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+    response.file_to_stream.close = close_and_cleanup
+    
+    return response
+
+
+def create_copy_csv_export_response(
+    write_csv: Callable[[BinaryIO], None],
+    filename: str
+) -> FileResponse:
+    """
+    创建由数据库直接生成 CSV 的导出响应
+    
+    适用于 PostgreSQL COPY ... TO STDOUT WITH CSV：数据库直接输出 CSV 字节，
+    Python 端不做逐行 dict 构建和 csv.writer 序列化。
+    
+    Args:
+        write_csv: 写入函数，接收二进制文件对象并写入 CSV 内容（含表头）
+        filename: 下载文件名
+    
+    Returns:
+        FileResponse（带 Content-Length，支持浏览器下载进度）
+    
+    Example:
+        >>> response = create_copy_csv_export_response(
+        ...     lambda f: repo.stream_csv_export(scan_id, f),
+        ...     'websites.csv'
+        ... )
+    """
+    temp_file = tempfile.NamedTemporaryFile(mode='wb', suffix='.csv', delete=False)
+    temp_path = temp_file.name
+    
+    try:
+        # 先写 BOM，确保 Excel 正确识别编码
+        temp_file.write(UTF8_BOM_BYTES)
+        write_csv(temp_file)
+        temp_file.close()
+        
+        return _file_response_from_temp(temp_path, filename)
+        
+    except Exception as e:
+        try:
+            temp_file.close()
+        except OSError:
+            pass
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        logger.error(f"创建 COPY CSV 导出响应失败: {e}")
+        raise
+
+
+def copy_csv_export(
+    out_file: BinaryIO,
+    table: str,
+    columns: str,
+    where: str,
+    params: Sequence[Any],
+    order_by: str
+) -> None:
+    """
+    使用 COPY (SELECT ...) TO STDOUT WITH CSV 把查询结果（含表头）写入文件对象
+    
+    配合 create_copy_csv_export_response 使用。末尾自动追加 created_at 列，
+    由数据库转为当前时区并按 format_datetime 的格式输出，调用方只需提供其余列的 SQL。
+    
+    Args:
+        out_file: 二进制可写文件对象
+        table: 表名
+        columns: SELECT 列表（不含 created_at），如 "ip, host, port"
+        where: WHERE 条件，参数用 %s 占位
+        params: WHERE 条件的参数
+        order_by: ORDER BY 子句
+    """
+    from django.db import connection
+    from django.utils import timezone
+    
+    with connection.cursor() as cursor:
+        query = cursor.mogrify(
+            f"SELECT {columns}, "
+            f"to_char(created_at AT TIME ZONE %s, 'YYYY-MM-DD HH24:MI:SS') AS created_at "
+            f"FROM {table} WHERE {where} ORDER BY {order_by}",
+            [timezone.get_current_timezone_name(), *params]
+        ).decode()
+        cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)", out_file)
+
+
 def _create_streaming_response(
     data_iterator: Iterator[Dict[str, Any]],
     headers: List[str],
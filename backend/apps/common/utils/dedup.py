@@ -6,7 +6,7 @@
 """
 
 import logging
-from typing import List, TypeVar, Tuple, Optional
+from typing import Iterable, List, TypeVar, Tuple, Optional
 
 from django.db import models
 
@@ -49,7 +49,7 @@ def get_unique_fields(model: type[models.Model]) -> Optional[Tuple[str, ...]]:
     return None
 
 
-def deduplicate_for_bulk(items: List[T], model: type[models.Model]) -> List[T]:
+def deduplicate_for_bulk(items: Iterable[T], model: type[models.Model]) -> List[T]:
     """
     根据模型唯一约束对数据去重
     
@@ -57,7 +57,8 @@ def deduplicate_for_bulk(items: List[T], model: type[models.Model]) -> List[T]:
     保留最后一条记录（后面的数据通常是更新的）。
     
     Args:
-        items: 待去重的数据列表（DTO 或 Model 对象）
+        items: 待去重的数据（DTO 或 Model 对象）；可以是生成器，只遍历一次，
+            重复记录不会在内存中保留
         model: Django 模型类（用于读取唯一约束）
         
     Returns:
@@ -74,7 +75,7 @@ def deduplicate_for_bulk(items: List[T], model: type[models.Model]) -> List[T]:
     if unique_fields is None:
         # 模型没有唯一约束，无需去重
         logger.debug(f"{model.__name__} 没有唯一约束，跳过去重")
-        return items
+        return items if isinstance(items, list) else list(items)
     
     # 处理外键字段名（target -> target_id）
     def make_key(item: T) -> tuple:
@@ -89,13 +90,15 @@ def deduplicate_for_bulk(items: List[T], model: type[models.Model]) -> List[T]:
     
     # 使用字典去重，保留最后一条
     seen = {}
+    total = 0
     for item in items:
         key = make_key(item)
         seen[key] = item
+        total += 1
     
     unique_items = list(seen.values())
     
-    if len(unique_items) < len(items):
-        logger.debug(f"{model.__name__} 去重: {len(items)} -> {len(unique_items)} 条")
+    if len(unique_items) < total:
+        logger.debug(f"{model.__name__} 去重: {total} -> {len(unique_items)} 条")
     
     return unique_items
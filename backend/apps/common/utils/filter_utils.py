@@ -26,7 +26,8 @@
 import re
 import logging
 from dataclasses import dataclass
-from typing import List, Dict, Optional, Union
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple, Union
 from enum import Enum
 
 from django.db.models import QuerySet, Q, F, Func, CharField
@@ -172,25 +173,33 @@ class QueryBuilder:
         Returns:
             过滤后的 QuerySet
         """
+        array_fuzzy_fields, combined_q = cls.compile(filter_groups, field_mapping, json_array_fields)
+        return cls.apply_compiled(queryset, array_fuzzy_fields, combined_q)
+    
+    @classmethod
+    def compile(
+        cls,
+        filter_groups: List[FilterGroup],
+        field_mapping: Dict[str, str],
+        json_array_fields: List[str] = None
+    ) -> Tuple[Tuple[str, ...], Optional[Q]]:
+        """将过滤条件编译为与 QuerySet 无关的结果
+        
+        Returns:
+            (需要 annotate 的数组模糊搜索字段, 组合后的 Q 对象或 None)
+        """
         if not filter_groups:
-            return queryset
+            return (), None
         
         json_array_fields = json_array_fields or []
         
-        # 收集需要 annotate 的数组模糊搜索字段
-        array_fuzzy_fields = set()
-        
-        # 第一遍：检查是否有数组模糊匹配
+        # 收集需要 annotate 的数组模糊搜索字段（保持首次出现顺序）
+        array_fuzzy_fields = {}
         for group in filter_groups:
             f = group.filter
             db_field = field_mapping.get(f.field)
             if db_field and db_field in json_array_fields and f.operator == '=':
-                array_fuzzy_fields.add(db_field)
-        
-        # 对数组模糊搜索字段做 annotate
-        for field in array_fuzzy_fields:
-            annotate_name = f'{field}_text'
-            queryset = queryset.annotate(**{annotate_name: ArrayToString(F(field))})
+                array_fuzzy_fields[db_field] = None
         
         # 构建 Q 对象
         combined_q = None
@@ -212,7 +221,7 @@ class QueryBuilder:
             if q is None:
                 continue
             
-            # 组合 Q 对象
+            # 组合 Q 对象（& / | 返回新对象，不修改已有 Q）
             if combined_q is None:
                 combined_q = q
             elif group.logical_op == LogicalOp.OR:
@@ -220,6 +229,21 @@ class QueryBuilder:
             else:  # AND
                 combined_q = combined_q & q
         
+        return tuple(array_fuzzy_fields), combined_q
+    
+    @classmethod
+    def apply_compiled(
+        cls,
+        queryset: QuerySet,
+        array_fuzzy_fields: Tuple[str, ...],
+        combined_q: Optional[Q]
+    ) -> QuerySet:
+        """将 compile 的结果应用到 QuerySet"""
+        # 对数组模糊搜索字段做 annotate
+        for field in array_fuzzy_fields:
+            annotate_name = f'{field}_text'
+            queryset = queryset.annotate(**{annotate_name: ArrayToString(F(field))})
+        
         if combined_q is not None:
             return queryset.filter(combined_q)
         return queryset
@@ -277,6 +301,30 @@ class QueryBuilder:
         return ~Q(**{f'{field}__exact': value})
 
 
+@lru_cache(maxsize=1024)
+def _compile_filters(
+    query_string: str,
+    field_mapping_items: Tuple[Tuple[str, str], ...],
+    json_array_fields: Tuple[str, ...]
+) -> Tuple[Tuple[str, ...], Optional[Q]]:
+    """解析并编译过滤语法（按参数缓存）
+    
+    仪表盘等场景会反复以相同的过滤字符串轮询，缓存后解析和 Q 构建只做一次。
+    返回的 Q 对象在多个 QuerySet 间共享，调用方不得修改（filter() 不会修改传入的 Q）。
+    """
+    filter_groups = QueryParser.parse(query_string)
+    if not filter_groups:
+        logger.debug(f"未解析到有效过滤条件: {query_string}")
+        return (), None
+    
+    logger.debug(f"解析过滤条件: {filter_groups}")
+    return QueryBuilder.compile(
+        filter_groups,
+        dict(field_mapping_items),
+        json_array_fields=list(json_array_fields)
+    )
+
+
 def apply_filters(
     queryset: QuerySet,
     query_string: str,
@@ -313,18 +361,12 @@ def apply_filters(
         return queryset
     
     try:
-        filter_groups = QueryParser.parse(query_string)
-        if not filter_groups:
-            logger.debug(f"未解析到有效过滤条件: {query_string}")
-            return queryset
-        
-        logger.debug(f"解析过滤条件: {filter_groups}")
-        return QueryBuilder.build_query(
-            queryset, 
-            filter_groups, 
-            field_mapping,
-            json_array_fields=json_array_fields
+        array_fuzzy_fields, combined_q = _compile_filters(
+            query_string,
+            tuple(sorted(field_mapping.items())),
+            tuple(json_array_fields or ())
         )
+        return QueryBuilder.apply_compiled(queryset, array_fuzzy_fields, combined_q)
     
     except Exception as e:
         logger.warning(f"过滤解析错误: {e}, query: {query_string}")
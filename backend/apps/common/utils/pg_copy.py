@@ -0,0 +1,237 @@
+"""
+PostgreSQL COPY 批量写入工具
+
+通过 COPY 协议把数据流式写入临时暂存表，再用一条
+INSERT ... SELECT ... ON CONFLICT 合并到目标表。
+
+相比 bulk_create：
+- 不构建 Model 实例，不做逐字段参数绑定
+- 数据库往返次数从 ⌈N/batch_size⌉ 降为常数次
+
+注意：
+- 仅支持 PostgreSQL（使用 psycopg2 的 copy_expert）
+- 使用 COPY TEXT 格式，NULL 与空字符串可以区分
+- 同一批数据中唯一键不能重复（ON CONFLICT DO UPDATE 限制），调用方需先去重，
+  或传入 distinct=True 由数据库在合并时按唯一键去重
+- 暂存表由 CREATE TABLE AS 创建，不继承 NOT NULL 约束，NULL 在合并时按模型默认值填充
+"""
+
+import io
+import logging
+from typing import Any, Iterable, Optional, Sequence
+
+from django.db import connection, models, transaction
+
+logger = logging.getLogger(__name__)
+
+# 每次 COPY 写入暂存表的行数（控制 StringIO 缓冲区大小）
+COPY_CHUNK_SIZE = 5000
+
+# COPY TEXT 格式的 NULL 标记
+_COPY_NULL = '\\N'
+
+# COPY TEXT 格式需要转义的字符
+_COPY_ESCAPE_TABLE = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+})
+
+
+def _format_array_element(value: Any) -> str:
+    """格式化 PostgreSQL 数组字面量中的单个元素"""
+    if value is None:
+        return 'NULL'
+    text = str(value).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{text}"'
+
+
+def format_copy_value(value: Any) -> str:
+    """
+    将 Python 值格式化为 COPY TEXT 格式的字段
+
+    - None -> \\N
+    - bool -> t / f
+    - list/tuple -> PostgreSQL 数组字面量 {"a","b"}
+    - 其他 -> str()，并转义反斜杠、制表符和换行
+    """
+    if value is None:
+        return _COPY_NULL
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (list, tuple)):
+        value = '{' + ','.join(_format_array_element(v) for v in value) + '}'
+    return str(value).translate(_COPY_ESCAPE_TABLE)
+
+
+def _iter_copy_chunks(rows: Iterable[Sequence[Any]], chunk_size: int) -> Iterable[io.StringIO]:
+    """将数据行按 chunk_size 编码为 COPY TEXT 缓冲区"""
+    buffer = io.StringIO()
+    count = 0
+    for row in rows:
+        buffer.write('\t'.join(format_copy_value(v) for v in row))
+        buffer.write('\n')
+        count += 1
+        if count >= chunk_size:
+            buffer.seek(0)
+            yield buffer
+            buffer = io.StringIO()
+            count = 0
+    if count:
+        buffer.seek(0)
+        yield buffer
+
+
+def copy_upsert(
+    model: type[models.Model],
+    rows: Iterable[Sequence[Any]],
+    columns: Sequence[str],
+    unique_columns: Sequence[str],
+    update_columns: Optional[Sequence[str]] = None,
+    chunk_size: int = COPY_CHUNK_SIZE,
+    distinct: bool = False,
+    skip_unchanged: bool = False,
+) -> int:
+    """
+    使用 COPY + INSERT ... ON CONFLICT 批量写入
+
+    流程：
+    1. CREATE TEMP TABLE（结构取自目标表的 columns 列，ON COMMIT DROP）
+    2. COPY ... FROM STDIN 分块写入暂存表
+    3. INSERT INTO 目标表 SELECT ... FROM 暂存表 ON CONFLICT (...) DO UPDATE / DO NOTHING
+
+    未在 columns 中提供的 auto_now / auto_now_add 字段会自动填充为 NOW()；
+    NOT NULL 且有默认值的列，传入 None 时使用模型默认值（如 '' 或 []）。
+
+    Args:
+        model: 目标 Django 模型类
+        rows: 数据行迭代器，每行是与 columns 顺序一致的元组
+        columns: 数据库列名列表（如 'target_id'，而不是 'target'）
+        unique_columns: 冲突检测列（必须对应目标表上的唯一约束）
+        update_columns: 冲突时更新的列；为空则 DO NOTHING
+        chunk_size: 每次 COPY 的行数
+        distinct: 是否在合并时按 unique_columns 去重（SELECT DISTINCT ON），
+            调用方无需在 Python 端构建去重集合；重复键保留任意一行
+        skip_unchanged: 冲突时仅当 update_columns 的值确有变化才更新
+            （DO UPDATE ... WHERE (...) IS DISTINCT FROM (...)），
+            未变化的行不产生新的行版本和 WAL，也不计入返回值
+
+    Returns:
+        int: INSERT 实际影响的行数（插入 + 更新）
+    """
+    affected, _ = _copy_upsert(
+        model, rows, columns, unique_columns, update_columns, chunk_size,
+        distinct=distinct, skip_unchanged=skip_unchanged
+    )
+    return affected
+
+
+def copy_upsert_returning(
+    model: type[models.Model],
+    rows: Iterable[Sequence[Any]],
+    columns: Sequence[str],
+    unique_columns: Sequence[str],
+    returning: Sequence[str],
+    update_columns: Optional[Sequence[str]] = None,
+    chunk_size: int = COPY_CHUNK_SIZE,
+    distinct: bool = False,
+) -> list[tuple]:
+    """
+    与 copy_upsert 相同，但通过 RETURNING 返回受影响行的指定列
+
+    典型用法是 returning=('url', 'target_id', 'id')，写入后直接得到主键，
+    无需再逐条按唯一键查询。
+
+    注意：DO NOTHING 时因冲突被跳过的行不会出现在结果中。
+
+    Returns:
+        list[tuple]: 每个受影响行的 returning 列值
+    """
+    _, returned = _copy_upsert(
+        model, rows, columns, unique_columns, update_columns, chunk_size,
+        returning=returning, distinct=distinct
+    )
+    return returned
+
+
+def _copy_upsert(
+    model: type[models.Model],
+    rows: Iterable[Sequence[Any]],
+    columns: Sequence[str],
+    unique_columns: Sequence[str],
+    update_columns: Optional[Sequence[str]],
+    chunk_size: int,
+    returning: Optional[Sequence[str]] = None,
+    distinct: bool = False,
+    skip_unchanged: bool = False,
+) -> tuple[int, list[tuple]]:
+    """copy_upsert / copy_upsert_returning 的公共实现"""
+    table = model._meta.db_table
+    staging = f'_stg_{table}'
+    column_list = ', '.join(columns)
+
+    fields_by_column = {field.column: field for field in model._meta.concrete_fields}
+
+    # NOT NULL 且有默认值的列：暂存表中的 NULL 在合并时替换为模型默认值，
+    # 调用方无需在 Python 端逐行做 `or ''` 归一化
+    select_expressions = []
+    select_params = []
+    for col in columns:
+        field = fields_by_column.get(col)
+        if field is not None and not field.null and field.has_default():
+            select_expressions.append(f'COALESCE({col}, %s)')
+            select_params.append(field.get_default())
+        else:
+            select_expressions.append(col)
+
+    # 未显式提供的自动时间字段，由数据库填充
+    auto_now_columns = [
+        field.column
+        for field in model._meta.concrete_fields
+        if (getattr(field, 'auto_now_add', False) or getattr(field, 'auto_now', False))
+        and field.column not in columns
+    ]
+    insert_columns = ', '.join([*columns, *auto_now_columns])
+    select_columns = ', '.join([*select_expressions, *(['NOW()'] * len(auto_now_columns))])
+
+    if update_columns:
+        set_clause = ', '.join(f'{col} = EXCLUDED.{col}' for col in update_columns)
+        conflict_action = f'DO UPDATE SET {set_clause}'
+        if skip_unchanged:
+            current = ', '.join(f'{table}.{col}' for col in update_columns)
+            excluded = ', '.join(f'EXCLUDED.{col}' for col in update_columns)
+            conflict_action += f' WHERE ({current}) IS DISTINCT FROM ({excluded})'
+    else:
+        conflict_action = 'DO NOTHING'
+
+    returning_clause = f' RETURNING {", ".join(returning)}' if returning else ''
+    distinct_clause = f'DISTINCT ON ({", ".join(unique_columns)}) ' if distinct else ''
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            # 同一事务内可能多次调用，先清理上一次的暂存表
+            cursor.execute(f'DROP TABLE IF EXISTS {staging}')
+            cursor.execute(
+                f'CREATE TEMP TABLE {staging} ON COMMIT DROP AS '
+                f'SELECT {column_list} FROM {table} WITH NO DATA'
+            )
+
+            for buffer in _iter_copy_chunks(rows, chunk_size):
+                cursor.copy_expert(
+                    f'COPY {staging} ({column_list}) FROM STDIN',
+                    buffer
+                )
+
+            cursor.execute(
+                f'INSERT INTO {table} ({insert_columns}) '
+                f'SELECT {distinct_clause}{select_columns} FROM {staging} '
+                f'ON CONFLICT ({", ".join(unique_columns)}) {conflict_action}'
+                f'{returning_clause}',
+                select_params
+            )
+            affected = cursor.rowcount
+            returned = cursor.fetchall() if returning else []
+
+    logger.debug(f"COPY upsert {table}: {affected} 条")
+    return affected, returned
@@ -1,7 +1,9 @@
 """域名、IP、端口、URL 和目标验证工具函数"""
 import ipaddress
 import logging
-from urllib.parse import urlparse
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, List
+from urllib.parse import urlparse, urlsplit
 
 import validators
 
@@ -243,30 +245,123 @@ def is_url_match_target(url: str, target_name: str, target_type: str) -> bool:
         if not hostname:
             return False
         
-        hostname = hostname.lower()
-        target_name = target_name.lower()
-        
-        if target_type == 'domain':
-            # 域名类型：hostname 等于 target_name 或以 .target_name 结尾
-            return hostname == target_name or hostname.endswith('.' + target_name)
+        return make_target_matcher(target_name, target_type)(hostname)
+    except Exception:
+        return False
+
+
+@lru_cache(maxsize=256)
+def make_target_matcher(target_name: str, target_type: str) -> Callable[[str], bool]:
+    """
+    构建 hostname 是否匹配目标的判断函数
+    
+    目标相关的预处理（小写化、后缀拼接、CIDR 解析）只做一次，
+    适合对大量 URL 逐个判断；按 (target_name, target_type) 缓存，
+    is_url_match_target 逐条调用时也不会重复构建。
+    
+    Args:
+        target_name: 目标名称（域名、IP 或 CIDR）
+        target_type: 目标类型 ('domain', 'ip', 'cidr')
         
-        elif target_type == 'ip':
-            # IP 类型：hostname 必须完全等于 target_name
-            return hostname == target_name
+    Returns:
+        Callable[[str], bool]: 接收小写 hostname，返回是否匹配
+    """
+    target_name = target_name.lower()
+    
+    if target_type == 'domain':
+        # 域名类型：hostname 等于 target_name 或以 .target_name 结尾
+        suffix = '.' + target_name
+        return lambda hostname: hostname == target_name or hostname.endswith(suffix)
+    
+    if target_type == 'ip':
+        # IP 类型：hostname 必须完全等于 target_name
+        return lambda hostname: hostname == target_name
+    
+    if target_type == 'cidr':
+        # CIDR 类型：hostname 必须是 IP 且在 CIDR 范围内
+        try:
+            network = ipaddress.ip_network(target_name, strict=False)
+        except ValueError:
+            return lambda hostname: False
         
-        elif target_type == 'cidr':
-            # CIDR 类型：hostname 必须是 IP 且在 CIDR 范围内
+        def match_cidr(hostname: str) -> bool:
             try:
-                ip = ipaddress.ip_address(hostname)
-                network = ipaddress.ip_network(target_name, strict=False)
-                return ip in network
+                return ipaddress.ip_address(hostname) in network
             except ValueError:
                 # hostname 不是有效 IP
                 return False
         
-        return False
-    except Exception:
-        return False
+        return match_cidr
+    
+    return lambda hostname: False
+
+
+def iter_target_urls(
+    urls: Iterable[object],
+    target_name: str,
+    target_type: str,
+    max_length: int = 2000
+) -> Iterator[str]:
+    """
+    逐个产出格式有效且匹配目标的 URL（去空白，不去重）
+    
+    流式版本，不在内存中保留 URL 集合；适合直接写入数据库、由数据库去重的场景。
+    
+    Args:
+        urls: URL 列表（非字符串元素会被忽略）
+        target_name: 目标名称（域名、IP 或 CIDR）
+        target_type: 目标类型 ('domain', 'ip', 'cidr')
+        max_length: URL 最大长度，默认 2000
+        
+    Yields:
+        str: 有效且匹配目标的 URL
+    """
+    matches = make_target_matcher(target_name, target_type)
+    # 同一批 URL 大多共享少量主机名，按主机名缓存判断结果（CIDR 需逐个解析 IP）
+    host_matches = {}
+    
+    for url in urls:
+        if not isinstance(url, str):
+            continue
+        url = url.strip()
+        if not url or len(url) > max_length or not url.startswith(('http://', 'https://')):
+            continue
+        try:
+            # hostname 属性已转为小写
+            hostname = urlsplit(url).hostname
+        except ValueError:
+            continue
+        if not hostname:
+            continue
+        matched = host_matches.get(hostname)
+        if matched is None:
+            matched = host_matches[hostname] = matches(hostname)
+        if matched:
+            yield url
+
+
+def filter_target_urls(
+    urls: Iterable[object],
+    target_name: str,
+    target_type: str,
+    max_length: int = 2000
+) -> List[str]:
+    """
+    过滤出格式有效且匹配目标的 URL（去空白、去重，保持原顺序）
+    
+    结果与逐个调用 is_valid_url + is_url_match_target 相同，
+    但每个 URL 只解析一次，目标匹配条件只构建一次。
+    
+    Args:
+        urls: URL 列表（非字符串元素会被忽略）
+        target_name: 目标名称（域名、IP 或 CIDR）
+        target_type: 目标类型 ('domain', 'ip', 'cidr')
+        max_length: URL 最大长度，默认 2000
+        
+    Returns:
+        List[str]: 有效且匹配目标的 URL
+    """
+    return list(dict.fromkeys(iter_target_urls(urls, target_name, target_type, max_length)))
 
 
 def detect_input_type(input_str: str) -> str:
@@ -3,9 +3,13 @@
 """
 
 import logging
+import os
+from functools import lru_cache
 from pathlib import Path
 
 import requests
+from django.core.cache import cache
+from packaging.version import InvalidVersion, Version
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -20,23 +24,35 @@ GITHUB_REPO = "yyhuni/xingrin"
 GITHUB_API_URL = f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest"
 GITHUB_RELEASES_URL = f"https://github.com/{GITHUB_REPO}/releases"
 
+# 最新发布信息缓存（default 缓存，Redis 中各进程共享）：{'etag': ..., 'data': ...}，data 为 None 表示仓库尚无发布
+RELEASE_CACHE_KEY = 'github:release'
+RELEASE_CACHE_TIMEOUT = 3600
+# 在该时间内直接使用缓存，不访问 GitHub（多个用户同时检查更新只请求一次）
+RELEASE_FRESH_KEY = 'github:release:fresh'
+RELEASE_FRESH_TIMEOUT = 300
 
+
+# 版本文件候选路径（容器内 / 开发环境仓库根目录）
+VERSION_FILE_PATHS = (
+    Path('/app/VERSION'),
+    Path(__file__).parent.parent.parent.parent.parent / 'VERSION',
+)
+
+
+@lru_cache(maxsize=1)
 def get_current_version() -> str:
-    """读取当前版本号"""
-    import os
+    """
+    读取当前版本号
 
+    版本号在进程生命周期内不变，首次读取后缓存，之后的请求不再访问环境变量和文件。
+    """
     # 方式1：从环境变量读取（Docker 容器中推荐）
     version = os.environ.get('IMAGE_TAG', '')
     if version:
         return version
 
     # 方式2：从文件读取（开发环境）
-    possible_paths = [
-        Path('/app/VERSION'),
-        Path(__file__).parent.parent.parent.parent.parent / 'VERSION',
-    ]
-
-    for path in possible_paths:
+    for path in VERSION_FILE_PATHS:
         try:
             return path.read_text(encoding='utf-8').strip()
         except (FileNotFoundError, OSError):
@@ -49,27 +65,54 @@ def compare_versions(current: str, latest: str) -> bool:
     """
     比较版本号，判断是否有更新
 
+    按 PEP 440 解析（忽略前缀 v），预发布版本低于正式版本（1.0.0-rc1 < 1.0.0），
+    无法解析的版本号视为无更新。
+
     Returns:
         True 表示有更新可用
     """
-    def parse_version(v: str) -> tuple:
-        v = v.lstrip('v')
-        parts = v.split('.')
-        result = []
-        for part in parts:
-            if '-' in part:
-                num, _ = part.split('-', 1)
-                result.append(int(num))
-            else:
-                result.append(int(part))
-        return tuple(result)
-
     try:
-        return parse_version(latest) > parse_version(current)
-    except (ValueError, AttributeError):
+        return Version(latest.lstrip('v')) > Version(current.lstrip('v'))
+    except (InvalidVersion, AttributeError):
         return False
 
 
+def fetch_latest_release() -> dict | None:
+    """
+    获取 GitHub 最新发布信息
+
+    - RELEASE_FRESH_TIMEOUT 内直接返回缓存
+    - 之后带 If-None-Match 条件请求，304 时复用缓存的发布信息（不消耗 GitHub 限流额度）
+
+    Returns:
+        发布信息字典；仓库尚无发布（404）时返回 None
+
+    Raises:
+        requests.RequestException: 请求 GitHub 失败
+    """
+    cached = cache.get(RELEASE_CACHE_KEY)
+    if cached is not None and cache.get(RELEASE_FRESH_KEY):
+        return cached['data']
+
+    headers = {'Accept': 'application/vnd.github.v3+json'}
+    if cached is not None and cached.get('etag'):
+        headers['If-None-Match'] = cached['etag']
+
+    response = requests.get(GITHUB_API_URL, headers=headers, timeout=10)
+
+    if response.status_code == 304 and cached is not None:
+        release = cached
+    elif response.status_code == 404:
+        release = {'etag': response.headers.get('ETag'), 'data': None}
+    else:
+        response.raise_for_status()
+        release = {'etag': response.headers.get('ETag'), 'data': response.json()}
+
+    cache.set(RELEASE_CACHE_KEY, release, timeout=RELEASE_CACHE_TIMEOUT)
+    cache.set(RELEASE_FRESH_KEY, True, timeout=RELEASE_FRESH_TIMEOUT)
+    return release['data']
+
+
 class VersionView(APIView):
     """获取当前系统版本"""
 
@@ -98,13 +141,9 @@ class CheckUpdateView(APIView):
         current_version = get_current_version()
 
         try:
-            response = requests.get(
-                GITHUB_API_URL,
-                headers={'Accept': 'application/vnd.github.v3+json'},
-                timeout=10
-            )
+            release_data = fetch_latest_release()
 
-            if response.status_code == 404:
+            if release_data is None:
                 return success_response(data={
                     'current_version': current_version,
                     'latest_version': current_version,
@@ -113,9 +152,6 @@ class CheckUpdateView(APIView):
                     'release_notes': None,
                 })
 
-            response.raise_for_status()
-            release_data = response.json()
-
             latest_version = release_data.get('tag_name', current_version)
             has_update = compare_versions(current_version, latest_version)
 
@@ -10,10 +10,10 @@
 可重复执行：如果数据库已有数据则跳过，只在空库时导入。
 """
 
-import json
 import logging
 from pathlib import Path
 
+import orjson
 import yaml
 from django.conf import settings
 from django.core.management.base import BaseCommand
@@ -131,12 +131,12 @@ class Command(BaseCommand):
 
             # 读取并解析文件（支持 JSON 和 YAML）
             try:
-                with open(src_path, "r", encoding="utf-8") as f:
-                    if file_format == "yaml":
+                if file_format == "yaml":
+                    with open(src_path, "r", encoding="utf-8") as f:
                         file_data = yaml.safe_load(f)
-                    else:
-                        file_data = json.load(f)
-            except (json.JSONDecodeError, yaml.YAMLError, OSError) as exc:
+                else:
+                    file_data = orjson.loads(src_path.read_bytes())
+            except (orjson.JSONDecodeError, yaml.YAMLError, OSError) as exc:
                 self.stdout.write(self.style.ERROR(
                     f"[{fp_type}] 读取指纹文件失败: {exc}"
                 ))
@@ -180,7 +180,10 @@ class Command(BaseCommand):
         
         支持的格式：
         - 数组格式: [...] 或 {"key": [...]}
-        - 对象格式: {...} 或 {"key": {...}} -> 转换为 [{"name": k, ...v}]
+        - 对象格式: {...} 或 {"key": {...}} -> 逐条产出 {"name": k, ...v}
+        
+        Returns:
+            指纹列表或迭代器；没有数据时返回空列表
         """
         # 获取目标数据
         if data_key is None:
@@ -198,8 +201,10 @@ class Command(BaseCommand):
             # 已经是数组格式，直接返回
             return target
         elif isinstance(target, dict):
-            # 对象格式，转换为数组 [{"name": key, ...value}]
-            return [{"name": name, **data} if isinstance(data, dict) else {"name": name}
-                    for name, data in target.items()]
+            # 对象格式，逐条转换为 {"name": key, ...value}（生成器，由 Service 按批取出，不再构建完整列表）
+            if not target:
+                return []
+            return ({"name": name, **data} if isinstance(data, dict) else {"name": name}
+                    for name, data in target.items())
         
         return []
@@ -89,7 +89,7 @@ def _register_scheduled_jobs(scheduler: BackgroundScheduler):
     )
     logger.info("  - 已注册: 扫描结果清理（每天 03:00）")
     
-    # 注意：搜索物化视图刷新已迁移到 pg_ivm 增量维护，无需定时任务
+    # 注意：资产搜索直接查询 website / endpoint 原表，无需刷新物化视图
 
 
 def _trigger_scheduled_scans():
@@ -62,14 +62,10 @@ class ARLFingerprintService(BaseFingerprintService):
                 ...
             ]
         """
-        fingerprints = self.model.objects.all()
-        return [
-            {
-                'name': fp.name,
-                'rule': fp.rule,
-            }
-            for fp in fingerprints
-        ]
+        # 字段名与导出格式一致，.values() 直接得到导出的字典，不构建 Model 实例
+        return list(
+            self.model.objects.values('name', 'rule').iterator(chunk_size=self.EXPORT_CHUNK_SIZE)
+        )
     
     def export_to_yaml(self, output_path: str) -> int:
         """
@@ -3,18 +3,72 @@
 提供通用的批量操作和缓存逻辑，供 EHole/Goby/Wappalyzer 等子类继承
 """
 
-import json
 import logging
-from typing import Any
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+import orjson
+from django.db import transaction
+from django.db.models import Count, Max
 
 logger = logging.getLogger(__name__)
 
+# 导出 JSON 的缩进单位，与 orjson.OPT_INDENT_2 一致
+_INDENT = b'  '
+
+
+def iter_json_array(items: Iterable, depth: int = 0) -> Iterator[bytes]:
+    """
+    逐项输出 JSON 数组（2 空格缩进）
+    
+    拼接结果与该数组位于第 depth 层时 orjson.dumps(..., option=OPT_INDENT_2) 的输出一致，
+    但无需先构建完整列表。
+    
+    Args:
+        items: 数组元素迭代器
+        depth: 数组所在的嵌套层级（顶层为 0）
+        
+    Yields:
+        bytes: JSON 片段
+    """
+    pad = b'\n' + _INDENT * (depth + 1)
+    first = True
+    for item in items:
+        # JSON 字符串中的换行已被转义，直接替换换行即可整体加深缩进
+        yield (b'[' if first else b',') + pad + orjson.dumps(item, option=orjson.OPT_INDENT_2).replace(b'\n', pad)
+        first = False
+    yield b'[]' if first else b'\n' + _INDENT * depth + b']'
+
+
+def iter_json_object(pairs: Iterable[tuple[str, Any]], depth: int = 0) -> Iterator[bytes]:
+    """
+    逐个键值对输出 JSON 对象（2 空格缩进），规则同 iter_json_array
+    
+    Args:
+        pairs: (key, value) 迭代器
+        depth: 对象所在的嵌套层级（顶层为 0）
+        
+    Yields:
+        bytes: JSON 片段
+    """
+    pad = b'\n' + _INDENT * (depth + 1)
+    first = True
+    for key, value in pairs:
+        yield (
+            (b'{' if first else b',') + pad + orjson.dumps(key) + b': '
+            + orjson.dumps(value, option=orjson.OPT_INDENT_2).replace(b'\n', pad)
+        )
+        first = False
+    yield b'{}' if first else b'\n' + _INDENT * depth + b'}'
+
 
 class BaseFingerprintService:
     """指纹管理基类 Service，提供通用的批量操作和缓存逻辑"""
     
     model = None  # 子类必须指定
     BATCH_SIZE = 1000  # 每批处理数量
+    EXPORT_CHUNK_SIZE = 2000  # 导出时每次从数据库游标读取的行数
     
     def validate_fingerprint(self, item: dict) -> bool:
         """
@@ -28,7 +82,7 @@ class BaseFingerprintService:
         """
         raise NotImplementedError("子类必须实现 validate_fingerprint 方法")
     
-    def validate_fingerprints(self, raw_data: list) -> tuple[list, list]:
+    def validate_fingerprints(self, raw_data: list) -> tuple[list, int]:
         """
         批量校验指纹数据
         
@@ -36,15 +90,11 @@ class BaseFingerprintService:
             raw_data: 原始指纹数据列表
             
         Returns:
-            tuple: (valid_items, invalid_items)
-        """
-        valid, invalid = [], []
-        for item in raw_data:
-            if self.validate_fingerprint(item):
-                valid.append(item)
-            else:
-                invalid.append(item)
-        return valid, invalid
+            tuple: (valid_items, invalid_count)，无效数据只需计数，不保留
+        """
+        validate = self.validate_fingerprint
+        valid = [item for item in raw_data if validate(item)]
+        return valid, len(raw_data) - len(valid)
     
     def to_model_data(self, item: dict) -> dict:
         """
@@ -75,28 +125,35 @@ class BaseFingerprintService:
         created = self.model.objects.bulk_create(objects, ignore_conflicts=True)
         return len(created)
     
-    def batch_create_fingerprints(self, raw_data: list) -> dict:
+    def batch_create_fingerprints(self, raw_data: Iterable[dict]) -> dict:
         """
         完整流程：分批校验 + 批量创建
         
+        raw_data 可以是列表或迭代器（如逐条产出的生成器），按 BATCH_SIZE 逐批取出处理，
+        不要求调用方先构建完整列表。
+        
         Args:
-            raw_data: 原始指纹数据列表
+            raw_data: 原始指纹数据（列表或迭代器）
             
         Returns:
             dict: {'created': int, 'failed': int}
         """
         total_created = 0
         total_failed = 0
+        total = 0
         
-        for i in range(0, len(raw_data), self.BATCH_SIZE):
-            batch = raw_data[i:i + self.BATCH_SIZE]
-            valid, invalid = self.validate_fingerprints(batch)
-            total_created += self.bulk_create(valid)
-            total_failed += len(invalid)
+        # 所有批次在同一事务中提交，只做一次 WAL 刷盘；任一批失败时整体回滚
+        items = iter(raw_data)
+        with transaction.atomic():
+            while batch := list(islice(items, self.BATCH_SIZE)):
+                valid, invalid_count = self.validate_fingerprints(batch)
+                total_created += self.bulk_create(valid)
+                total_failed += invalid_count
+                total += len(batch)
         
         logger.info(
             "批量创建指纹完成: created=%d, failed=%d, total=%d",
-            total_created, total_failed, len(raw_data)
+            total_created, total_failed, total
         )
         return {'created': total_created, 'failed': total_failed}
     
@@ -109,6 +166,18 @@ class BaseFingerprintService:
         """
         raise NotImplementedError("子类必须实现 get_export_data 方法")
     
+    def iter_export_json(self) -> Iterator[bytes]:
+        """
+        逐块输出导出的 JSON（2 空格缩进），供 StreamingHttpResponse 使用
+        
+        默认一次性序列化 get_export_data()；子类可覆盖为边读游标边输出，
+        拼接结果应与默认实现一致。
+        
+        Yields:
+            bytes: JSON 片段
+        """
+        yield orjson.dumps(self.get_export_data(), option=orjson.OPT_INDENT_2)
+    
     def export_to_file(self, output_path: str) -> int:
         """
         导出所有指纹到 JSON 文件
@@ -120,8 +189,7 @@ class BaseFingerprintService:
             int: 导出的指纹数量
         """
         data = self.get_export_data()
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False)
+        Path(output_path).write_bytes(orjson.dumps(data))
         count = len(data.get('fingerprint', []))
         logger.info("导出指纹文件: %s, 数量: %d", output_path, count)
         return count
@@ -138,7 +206,8 @@ class BaseFingerprintService:
         - 删除记录 → count 变化
         - 清空全部 → count 变为 0
         """
-        count = self.model.objects.count()
-        latest = self.model.objects.order_by('-created_at').first()
-        latest_ts = int(latest.created_at.timestamp()) if latest else 0
-        return f"{count}_{latest_ts}"
+        # 数量与最新时间在一次聚合查询中取得
+        stats = self.model.objects.aggregate(count=Count('id'), latest=Max('created_at'))
+        latest = stats['latest']
+        latest_ts = int(latest.timestamp()) if latest else 0
+        return f"{stats['count']}_{latest_ts}"
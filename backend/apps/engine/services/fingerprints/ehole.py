@@ -3,8 +3,12 @@
 实现 EHole 格式指纹的校验、转换和导出逻辑
 """
 
+from typing import Iterator
+
+import orjson
+
 from apps.engine.models import EholeFingerprint
-from .base import BaseFingerprintService
+from .base import BaseFingerprintService, iter_json_array
 
 
 class EholeFingerprintService(BaseFingerprintService):
@@ -67,18 +71,29 @@ class EholeFingerprintService(BaseFingerprintService):
                 "version": "1000_1703836800"
             }
         """
-        fingerprints = self.model.objects.all()
-        data = []
-        for fp in fingerprints:
-            data.append({
-                'cms': fp.cms,
-                'method': fp.method,
-                'location': fp.location,
-                'keyword': fp.keyword,
-                'isImportant': fp.is_important,  # 转回 JSON 格式
-                'type': fp.type,
-            })
         return {
-            'fingerprint': data,
+            'fingerprint': list(self._iter_export_items()),
             'version': self.get_fingerprint_version(),
         }
+    
+    def iter_export_json(self) -> Iterator[bytes]:
+        """逐块输出导出 JSON，结构与 get_export_data 一致"""
+        yield b'{\n  "fingerprint": '
+        yield from iter_json_array(self._iter_export_items(), depth=1)
+        yield b',\n  "version": ' + orjson.dumps(self.get_fingerprint_version()) + b'\n}'
+    
+    def _iter_export_items(self) -> Iterator[dict]:
+        """逐条产出 EHole 格式的指纹"""
+        # 只取导出字段，直接从游标读取元组，不构建 Model 实例
+        rows = self.model.objects.values_list(
+            'cms', 'method', 'location', 'keyword', 'is_important', 'type'
+        ).iterator(chunk_size=self.EXPORT_CHUNK_SIZE)
+        for cms, method, location, keyword, is_important, fp_type in rows:
+            yield {
+                'cms': cms,
+                'method': method,
+                'location': location,
+                'keyword': keyword,
+                'isImportant': is_important,  # 转回 JSON 格式
+                'type': fp_type,
+            }
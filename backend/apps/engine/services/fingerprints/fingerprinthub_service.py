@@ -3,8 +3,10 @@
 实现 FingerPrintHub 格式指纹的校验、转换和导出逻辑
 """
 
+from typing import Iterator
+
 from apps.engine.models import FingerPrintHubFingerprint
-from .base import BaseFingerprintService
+from .base import BaseFingerprintService, iter_json_array
 
 
 class FingerPrintHubFingerprintService(BaseFingerprintService):
@@ -89,22 +91,30 @@ class FingerPrintHubFingerprintService(BaseFingerprintService):
                 ...
             ]
         """
-        fingerprints = self.model.objects.all()
-        data = []
-        for fp in fingerprints:
+        return list(self._iter_export_items())
+    
+    def iter_export_json(self) -> Iterator[bytes]:
+        """逐块输出导出 JSON 数组"""
+        return iter_json_array(self._iter_export_items())
+    
+    def _iter_export_items(self) -> Iterator[dict]:
+        """逐条产出 FingerPrintHub 格式的指纹"""
+        rows = self.model.objects.values_list(
+            'fp_id', 'name', 'author', 'tags', 'severity', 'metadata', 'http', 'source_file'
+        ).iterator(chunk_size=self.EXPORT_CHUNK_SIZE)
+        for fp_id, name, author, tags, severity, metadata, http, source_file in rows:
             item = {
-                'id': fp.fp_id,
+                'id': fp_id,
                 'info': {
-                    'name': fp.name,
-                    'author': fp.author,
-                    'tags': fp.tags,
-                    'severity': fp.severity,
-                    'metadata': fp.metadata,
+                    'name': name,
+                    'author': author,
+                    'tags': tags,
+                    'severity': severity,
+                    'metadata': metadata,
                 },
-                'http': fp.http,
+                'http': http,
             }
             # 只有当 source_file 非空时才添加该字段
-            if fp.source_file:
-                item['_source_file'] = fp.source_file
-            data.append(item)
-        return data
+            if source_file:
+                item['_source_file'] = source_file
+            yield item
@@ -3,8 +3,10 @@
 实现 Fingers 格式指纹的校验、转换和导出逻辑
 """
 
+from typing import Iterator
+
 from apps.engine.models import FingersFingerprint
-from .base import BaseFingerprintService
+from .base import BaseFingerprintService, iter_json_array
 
 
 class FingersFingerprintService(BaseFingerprintService):
@@ -64,20 +66,22 @@ class FingersFingerprintService(BaseFingerprintService):
                 ...
             ]
         """
-        fingerprints = self.model.objects.all()
-        data = []
-        for fp in fingerprints:
-            item = {
-                'name': fp.name,
-                'link': fp.link,
-                'rule': fp.rule,
-                'tag': fp.tag,
-            }
-            # 只有当 focus 为 True 时才添加该字段（保持与原始格式一致）
-            if fp.focus:
-                item['focus'] = fp.focus
-            # 只有当 default_port 非空时才添加该字段
-            if fp.default_port:
-                item['default_port'] = fp.default_port
-            data.append(item)
-        return data
+        return list(self._iter_export_items())
+    
+    def iter_export_json(self) -> Iterator[bytes]:
+        """逐块输出导出 JSON 数组"""
+        return iter_json_array(self._iter_export_items())
+    
+    def _iter_export_items(self) -> Iterator[dict]:
+        """逐条产出 Fingers 格式的指纹"""
+        fingerprints = self.model.objects.values(
+            'name', 'link', 'rule', 'tag', 'focus', 'default_port'
+        ).iterator(chunk_size=self.EXPORT_CHUNK_SIZE)
+        for item in fingerprints:
+            # 只有当 focus 为 True 时才保留该字段（保持与原始格式一致）
+            if not item['focus']:
+                del item['focus']
+            # 只有当 default_port 非空时才保留该字段
+            if not item['default_port']:
+                del item['default_port']
+            yield item
@@ -3,8 +3,10 @@
 实现 Goby 格式指纹的校验、转换和导出逻辑
 """
 
+from typing import Iterator
+
 from apps.engine.models import GobyFingerprint
-from .base import BaseFingerprintService
+from .base import BaseFingerprintService, iter_json_array
 
 
 class GobyFingerprintService(BaseFingerprintService):
@@ -76,12 +78,13 @@ class GobyFingerprintService(BaseFingerprintService):
                 ...
             ]
         """
-        fingerprints = self.model.objects.all()
-        return [
-            {
-                'name': fp.name,
-                'logic': fp.logic,
-                'rule': fp.rule,
-            }
-            for fp in fingerprints
-        ]
+        return list(self._iter_export_items())
+    
+    def iter_export_json(self) -> Iterator[bytes]:
+        """逐块输出导出 JSON 数组"""
+        return iter_json_array(self._iter_export_items())
+    
+    def _iter_export_items(self) -> Iterator[dict]:
+        """逐条产出 Goby 格式的指纹"""
+        # 字段名与导出格式一致，.values() 直接得到导出的字典，不构建 Model 实例
+        return self.model.objects.values('name', 'logic', 'rule').iterator(chunk_size=self.EXPORT_CHUNK_SIZE)
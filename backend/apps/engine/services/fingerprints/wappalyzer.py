@@ -3,8 +3,10 @@
 实现 Wappalyzer 格式指纹的校验、转换和导出逻辑
 """
 
+from typing import Iterator
+
 from apps.engine.models import WappalyzerFingerprint
-from .base import BaseFingerprintService
+from .base import BaseFingerprintService, iter_json_object
 
 
 class WappalyzerFingerprintService(BaseFingerprintService):
@@ -12,6 +14,21 @@ class WappalyzerFingerprintService(BaseFingerprintService):
     
     model = WappalyzerFingerprint
     
+    # 导出字段（Model 字段名 -> JSON 字段名），按原始格式的字段顺序排列
+    EXPORT_FIELDS = (
+        ('cats', 'cats'),
+        ('cookies', 'cookies'),
+        ('headers', 'headers'),
+        ('script_src', 'scriptSrc'),  # Model: script_src -> JSON: scriptSrc
+        ('js', 'js'),
+        ('implies', 'implies'),
+        ('meta', 'meta'),
+        ('html', 'html'),
+        ('description', 'description'),
+        ('website', 'website'),
+        ('cpe', 'cpe'),
+    )
+    
     def validate_fingerprint(self, item: dict) -> bool:
         """
         校验单条 Wappalyzer 指纹
@@ -69,31 +86,24 @@ class WappalyzerFingerprintService(BaseFingerprintService):
                 }
             }
         """
-        fingerprints = self.model.objects.all()
-        apps = {}
+        return {'apps': dict(self._iter_export_apps())}
+    
+    def iter_export_json(self) -> Iterator[bytes]:
+        """逐块输出导出 JSON，结构与 get_export_data 一致"""
+        yield b'{\n  "apps": '
+        yield from iter_json_object(self._iter_export_apps(), depth=1)
+        yield b'\n}'
+    
+    def _iter_export_apps(self) -> Iterator[tuple[str, dict]]:
+        """逐条产出 (应用名称, Wappalyzer 格式的规则)"""
+        # 只取导出字段，直接从游标读取字典，不构建 Model 实例
+        fingerprints = self.model.objects.values(
+            'name', *(field for field, _ in self.EXPORT_FIELDS)
+        ).iterator(chunk_size=self.EXPORT_CHUNK_SIZE)
         for fp in fingerprints:
-            app_data = {}
-            if fp.cats:
-                app_data['cats'] = fp.cats
-            if fp.cookies:
-                app_data['cookies'] = fp.cookies
-            if fp.headers:
-                app_data['headers'] = fp.headers
-            if fp.script_src:
-                app_data['scriptSrc'] = fp.script_src  # Model: script_src -> JSON: scriptSrc
-            if fp.js:
-                app_data['js'] = fp.js
-            if fp.implies:
-                app_data['implies'] = fp.implies
-            if fp.meta:
-                app_data['meta'] = fp.meta
-            if fp.html:
-                app_data['html'] = fp.html
-            if fp.description:
-                app_data['description'] = fp.description
-            if fp.website:
-                app_data['website'] = fp.website
-            if fp.cpe:
-                app_data['cpe'] = fp.cpe
-            apps[fp.name] = app_data
-        return {'apps': apps}
+            # 只导出非空字段
+            yield fp['name'], {
+                json_key: fp[field]
+                for field, json_key in self.EXPORT_FIELDS
+                if fp[field]
+            }
@@ -1,5 +1,6 @@
 """ARL 指纹管理 ViewSet"""
 
+import orjson
 import yaml
 from django.http import HttpResponse
 from rest_framework.decorators import action
@@ -93,9 +94,8 @@ class ARLFingerprintViewSet(BaseFingerprintViewSet):
                 fingerprints = yaml.safe_load(content)
             else:
                 # JSON 格式
-                import json
-                fingerprints = json.loads(content)
-        except (yaml.YAMLError, json.JSONDecodeError) as e:
+                fingerprints = orjson.loads(content)
+        except (yaml.YAMLError, orjson.JSONDecodeError) as e:
             raise ValidationError(f'无效的文件格式: {e}')
         
         if not isinstance(fingerprints, list):
@@ -6,7 +6,8 @@
 import json
 import logging
 
-from django.http import HttpResponse
+import orjson
+from django.http import StreamingHttpResponse
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -174,10 +175,10 @@ class BaseFingerprintViewSet(viewsets.ModelViewSet):
         """
         content = content.strip()
         
-        # 尝试标准 JSON 解析
+        # 尝试标准 JSON 解析（orjson 的 JSONDecodeError 是 json.JSONDecodeError 的子类）
         try:
-            return json.loads(content)
-        except json.JSONDecodeError:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
             pass
         
         # 尝试 JSONL 格式（每行一个 JSON 对象）
@@ -188,8 +189,8 @@ class BaseFingerprintViewSet(viewsets.ModelViewSet):
             if not line:
                 continue
             try:
-                result.append(json.loads(line))
-            except json.JSONDecodeError as e:
+                result.append(orjson.loads(line))
+            except orjson.JSONDecodeError as e:
                 raise json.JSONDecodeError(f'第 {i + 1} 行解析失败: {e.msg}', e.doc, e.pos)
         
         if not result:
@@ -232,10 +233,11 @@ class BaseFingerprintViewSet(viewsets.ModelViewSet):
         导出指纹（前端下载）
         GET /api/engine/fingerprints/{type}/export/
         
-        返回：JSON 文件下载
+        返回：JSON 文件下载（边读数据库边输出，不在内存中构建完整文件）
         """
-        data = self.get_service().get_export_data()
-        content = json.dumps(data, ensure_ascii=False, indent=2)
-        response = HttpResponse(content, content_type='application/json')
+        response = StreamingHttpResponse(
+            self.get_service().iter_export_json(),
+            content_type='application/json'
+        )
         response['Content-Disposition'] = f'attachment; filename="{self.get_export_filename()}"'
         return response
@@ -16,6 +16,7 @@ from prefect import task
 from apps.scan.utils import execute_stream
 from apps.asset.dtos.snapshot import WebsiteSnapshotDTO
 from apps.asset.repositories.snapshot import DjangoWebsiteSnapshotRepository
+from apps.asset.search_cache import invalidate_search_cache_on_commit
 
 logger = logging.getLogger(__name__)
 
@@ -138,6 +139,9 @@ def bulk_merge_website_fields(
                 except Exception as e:
                     logger.warning("创建 WebSite 记录失败 (url=%s): %s", url, e)
     
+    if updated_count or created_count:
+        invalidate_search_cache_on_commit()
+    
     return {
         'updated_count': updated_count,
         'created_count': created_count
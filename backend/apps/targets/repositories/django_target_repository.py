@@ -10,6 +10,7 @@ from django.db import transaction, IntegrityError, OperationalError, DatabaseErr
 from django.utils import timezone
 
 from ..models import Target
+from apps.asset.search_cache import invalidate_search_cache_on_commit
 from apps.common.decorators import auto_ensure_db_connection
 from apps.common.utils import deduplicate_for_bulk
 
@@ -208,6 +209,9 @@ class DjangoTargetRepository:
                 
                 logger.debug(f"批次删除完成: {len(batch_ids)} 个目标，删除 {count} 条记录")
             
+            # 目标下的站点/端点/漏洞随 CASCADE 删除，使资产搜索缓存失效
+            invalidate_search_cache_on_commit()
+            
             # 由于使用数据库 CASCADE，无法获取详细统计
             deleted_details = {
                 'targets': len(target_ids),
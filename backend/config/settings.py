@@ -216,6 +216,11 @@ REST_FRAMEWORK = {
     },
 }
 
+# camelCase 渲染器的基类：使用 orjson 序列化（见 apps/common/renderers.py）
+JSON_CAMEL_CASE = {
+    'RENDERER_CLASS': 'apps.common.renderers.ORJSONRenderer',
+}
+
 # ==================== CORS 配置 ====================
 # 允许所有来源（前后端分离项目，安全性由认证系统保障）
 CORS_ALLOW_ALL_ORIGINS = os.getenv('CORS_ALLOW_ALL_ORIGINS', 'True').lower() == 'true'
@@ -267,6 +272,26 @@ CHANNEL_LAYERS = {
     },
 }
 
+# 缓存配置
+# - default：Redis 共享缓存，Server 各进程共用（如 GitHub 发布信息），Worker 不使用
+# - search：资产搜索结果缓存，仅 Server 读写（Worker 无法直连 Redis，
+#   版本号保存在 PostgreSQL 序列中，Worker 写入资产后同样能使缓存失效）
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': f'redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}',
+        'KEY_PREFIX': 'xingrin',
+    },
+    'search': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': f'redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}',
+        # 独立的键前缀，与 default 缓存的键互不冲突
+        'KEY_PREFIX': 'xingrin:search',
+        # 写入资产时递增版本号使缓存失效，过期时间用于回收旧版本的缓存键
+        'TIMEOUT': int(os.getenv('SEARCH_CACHE_TIMEOUT', '60')),
+    },
+}
+
 # ==================== 日志配置 ====================
 # 日志配置说明：
 # 1. 开发环境（DEBUG=True）：
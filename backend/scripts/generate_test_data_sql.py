@@ -261,11 +261,6 @@ class TestDataGenerator:
         """清除所有测试数据"""
         cur = self.conn.cursor()
         
-        # 先删除 IMMV（避免 pg_ivm 的 anyarray bug）
-        print("  删除 IMMV...")
-        cur.execute("DROP TABLE IF EXISTS asset_search_view CASCADE")
-        self.conn.commit()
-        
         tables = [
             # 指纹表
             'ehole_fingerprint', 'goby_fingerprint', 'wappalyzer_fingerprint',
@@ -283,25 +278,6 @@ class TestDataGenerator:
             cur.execute(f"DELETE FROM {table}")
         self.conn.commit()
         
-        # 重建 IMMV
-        print("  重建 IMMV...")
-        cur.execute("""
-            SELECT pgivm.create_immv('asset_search_view', $$
-                SELECT 
-                    w.id,
-                    w.url,
-                    w.host,
-                    w.title,
-                    w.tech,
-                    w.status_code,
-                    w.response_headers,
-                    w.response_body,
-                    w.created_at,
-                    w.target_id
-                FROM website w
-            $$)
-        """)
-        self.conn.commit()
         print("  ✓ 数据清除完成\n")
 
     def create_workers(self) -> list: